@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from cats.adapters.orm import order_history, worker_history
+from cats.adapters.repository import copy_worker
+from cats.domain.constants import Market, OrderStatus, OrderType, WorkerStatus
+from cats.domain.models.order import Order
+from cats.domain.models.worker import Worker
+
+
+def get_period(time: datetime) -> str:
+    """Month the history rows of `time` are partitioned into."""
+    return time.strftime("%Y-%m")
+
+
+class AbstractArchive(ABC):
+    """
+    History of finished workers. Archived workers are removed from the
+    repository, so loading active workers never pulls their orders.
+    """
+
+    @abstractmethod
+    def add(self, worker: Worker, archived_at: datetime):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, worker_id: str) -> Worker:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_workers(
+        self, market: Optional[Market] = None, period: Optional[str] = None
+    ) -> List[Worker]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_orders(
+        self, worker_id: Optional[str] = None, period: Optional[str] = None
+    ) -> List[Order]:
+        raise NotImplementedError
+
+
+class InMemoryArchive(AbstractArchive):
+    def __init__(self):
+        self._workers: Dict[str, Tuple[str, Worker]] = dict()
+
+    def add(self, worker: Worker, archived_at: datetime):
+        self._workers[worker.worker_id] = (get_period(archived_at), copy_worker(worker))
+
+    def get(self, worker_id: str) -> Worker:
+        return self._workers[worker_id][1]
+
+    def list_workers(
+        self, market: Optional[Market] = None, period: Optional[str] = None
+    ) -> List[Worker]:
+        return [
+            worker
+            for worker_period, worker in self._workers.values()
+            if (market is None or worker.market == market)
+            and (period is None or worker_period == period)
+        ]
+
+    def list_orders(
+        self, worker_id: Optional[str] = None, period: Optional[str] = None
+    ) -> List[Order]:
+        workers = [self.get(worker_id)] if worker_id else self.list_workers()
+        return sorted(
+            (
+                order
+                for worker in workers
+                for order in worker.orders
+                if period is None or get_period(order.ordered_time) == period
+            ),
+            key=lambda order: order.ordered_time,
+        )
+
+
+class SqlAlchemyArchive(AbstractArchive):
+    """History tables, read with plain queries instead of the ORM mappers."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, worker: Worker, archived_at: datetime):
+        self.session.execute(
+            insert(worker_history).values(
+                worker_id=worker.worker_id,
+                market=str(getattr(worker.market, "value", worker.market)),
+                budget=str(worker.budget or ""),
+                exchange=worker.exchange,
+                venues=worker.venues,
+                paper=worker.paper,
+                strategy=worker.strategy,
+                archived_at=archived_at,
+                period=get_period(archived_at),
+            )
+        )
+        if worker.orders:
+            self.session.execute(
+                insert(order_history),
+                [
+                    dict(
+                        order_id=order.order_id,
+                        worker_id=worker.worker_id,
+                        type=int(order.type),
+                        status=int(order.status),
+                        price=order.price,
+                        ordered_volume=order.ordered_volume,
+                        executed_volume=order.executed_volume,
+                        paid_fee=order.paid_fee,
+                        ordered_time=order.ordered_time,
+                        exchange=order.exchange,
+                        period=get_period(order.ordered_time),
+                    )
+                    for order in worker.orders
+                ],
+            )
+
+    def get(self, worker_id: str) -> Worker:
+        row = self.session.execute(
+            select(worker_history).where(worker_history.c.worker_id == worker_id)
+        ).one()
+        return self._make_worker(row, self.list_orders(worker_id=worker_id))
+
+    def list_workers(
+        self, market: Optional[Market] = None, period: Optional[str] = None
+    ) -> List[Worker]:
+        query = select(worker_history)
+        if market is not None:
+            market_value = str(getattr(market, "value", market))
+            query = query.where(worker_history.c.market == market_value)
+        if period is not None:
+            query = query.where(worker_history.c.period == period)
+        rows = self.session.execute(query).all()
+        orders: Dict[str, List[Order]] = {row.worker_id: [] for row in rows}
+        if orders:
+            order_rows = self.session.execute(
+                select(order_history).where(order_history.c.worker_id.in_(orders))
+            )
+            for order_row in order_rows:
+                orders[order_row.worker_id].append(self._make_order(order_row))
+        return [self._make_worker(row, orders[row.worker_id]) for row in rows]
+
+    def list_orders(
+        self, worker_id: Optional[str] = None, period: Optional[str] = None
+    ) -> List[Order]:
+        query = select(order_history).order_by(order_history.c.ordered_time)
+        if worker_id is not None:
+            query = query.where(order_history.c.worker_id == worker_id)
+        if period is not None:
+            query = query.where(order_history.c.period == period)
+        return [self._make_order(row) for row in self.session.execute(query)]
+
+    @staticmethod
+    def _make_worker(row, orders: List[Order]) -> Worker:
+        return Worker(
+            worker_id=row.worker_id,
+            market=Market(row.market),
+            status=WorkerStatus.FINISHED,
+            budget=row.budget or "",
+            exchange=row.exchange,
+            venues=row.venues or "",
+            paper=bool(row.paper),
+            strategy=row.strategy,
+            orders=set(orders),
+        )
+
+    @staticmethod
+    def _make_order(row) -> Order:
+        return Order(
+            order_id=row.order_id,
+            type=OrderType(row.type),
+            status=OrderStatus(row.status),
+            price=row.price,
+            ordered_volume=row.ordered_volume,
+            executed_volume=row.executed_volume,
+            paid_fee=row.paid_fee,
+            ordered_time=row.ordered_time,
+            exchange=row.exchange,
+        )
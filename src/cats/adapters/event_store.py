@@ -0,0 +1,152 @@
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from cats.adapters.orm import worker_events, worker_snapshots
+from cats.domain.constants import SNAPSHOT_EVENTS
+from cats.domain.events import (
+    Event,
+    WorkerState,
+    event_from_dict,
+    event_to_dict,
+    get_events,
+    rebuild,
+)
+from cats.domain.models.worker import Worker
+
+
+class AbstractEventStore(ABC):
+    snapshot_events: int = SNAPSHOT_EVENTS
+
+    @abstractmethod
+    def append(self, events: List[Event]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, worker_id: str, after_version: int = 0) -> List[Event]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_version(self, worker_id: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_snapshot(self, worker_id: str) -> Optional[WorkerState]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_snapshot(self, state: WorkerState):
+        raise NotImplementedError
+
+    def record(self, before: WorkerState, worker: Worker) -> List[Event]:
+        """Appends the events from the state `before` to the worker."""
+        events = get_events(before, worker)
+        if not events:
+            return events
+        # Versions are only read for workers which changed.
+        version = self.get_version(worker.worker_id)
+        if not version and self.get_snapshot(worker.worker_id) is None:
+            # Events of a worker recorded for the first time apply to the
+            # state it had before them.
+            self.save_snapshot(replace(before, version=0))
+        events = [
+            replace(event, version=version + index)
+            for index, event in enumerate(events, start=1)
+        ]
+        self.append(events)
+        latest = events[-1].version
+        if latest // self.snapshot_events > version // self.snapshot_events:
+            self.save_snapshot(WorkerState.of(worker, latest))
+        return events
+
+    def rebuild(self, worker_id: str) -> WorkerState:
+        snapshot = self.get_snapshot(worker_id)
+        after_version = snapshot.version if snapshot else 0
+        return rebuild(worker_id, snapshot, self.load(worker_id, after_version))
+
+
+class InMemoryEventStore(AbstractEventStore):
+    def __init__(self):
+        self._events: Dict[str, List[Event]] = defaultdict(list)
+        self._snapshots: Dict[str, WorkerState] = dict()
+
+    def append(self, events: List[Event]):
+        for event in events:
+            self._events[event.worker_id].append(event)
+
+    def load(self, worker_id: str, after_version: int = 0) -> List[Event]:
+        return [e for e in self._events[worker_id] if e.version > after_version]
+
+    def get_version(self, worker_id: str) -> int:
+        events = self._events[worker_id]
+        return events[-1].version if events else 0
+
+    def get_snapshot(self, worker_id: str) -> Optional[WorkerState]:
+        return self._snapshots.get(worker_id)
+
+    def save_snapshot(self, state: WorkerState):
+        self._snapshots[state.worker_id] = state
+
+
+class SqlAlchemyEventStore(AbstractEventStore):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def append(self, events: List[Event]):
+        self.session.execute(
+            insert(worker_events),
+            [
+                dict(
+                    worker_id=event.worker_id,
+                    version=event.version,
+                    type=type(event).__name__,
+                    occurred_at=event.occurred_at,
+                    data=json.dumps(event_to_dict(event)),
+                )
+                for event in events
+            ],
+        )
+
+    def load(self, worker_id: str, after_version: int = 0) -> List[Event]:
+        rows = self.session.execute(
+            select(worker_events.c.data)
+            .where(worker_events.c.worker_id == worker_id)
+            .where(worker_events.c.version > after_version)
+            .order_by(worker_events.c.version)
+        )
+        return [event_from_dict(json.loads(data)) for data, in rows]
+
+    def get_version(self, worker_id: str) -> int:
+        version = self.session.execute(
+            select(func.max(worker_events.c.version)).where(
+                worker_events.c.worker_id == worker_id
+            )
+        ).scalar()
+        return version or 0
+
+    def get_snapshot(self, worker_id: str) -> Optional[WorkerState]:
+        data = self.session.execute(
+            select(worker_snapshots.c.data).where(
+                worker_snapshots.c.worker_id == worker_id
+            )
+        ).scalar()
+        return WorkerState.from_dict(json.loads(data)) if data else None
+
+    def save_snapshot(self, state: WorkerState):
+        self.session.execute(
+            delete(worker_snapshots).where(
+                worker_snapshots.c.worker_id == state.worker_id
+            )
+        )
+        self.session.execute(
+            insert(worker_snapshots).values(
+                worker_id=state.worker_id,
+                version=state.version,
+                data=json.dumps(state.to_dict()),
+            )
+        )
@@ -7,13 +7,31 @@ from sqlalchemy import (
     Float,
     DateTime,
     Integer,
+    Boolean,
     ForeignKey,
+    Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import mapper, relationship
+from sqlalchemy.types import TypeDecorator
 
 from cats.domain.models.order import Order
 from cats.domain.models.worker import Worker
-from cats.domain.values import Price
+from cats.domain.values import BudgetLadder, Price
+
+
+class BudgetType(TypeDecorator):
+    """A `BudgetLadder` kept in its "10000:20000:30000" form."""
+
+    impl = String(100)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(value)
+
+    def process_result_value(self, value, dialect):
+        return BudgetLadder.parse(value or "")
+
 
 metadata = MetaData()
 
@@ -28,6 +46,7 @@ orders = Table(
     Column("executed_volume", Float, nullable=False),
     Column("paid_fee", Float, nullable=False),
     Column("ordered_time", DateTime, nullable=False),
+    Column("exchange", String(20)),
 )
 
 prices = Table(
@@ -46,8 +65,17 @@ workers = Table(
     Column("worker_id", String(50), primary_key=True),
     Column("market", String(10), nullable=False),
     Column("status", SmallInteger, nullable=False),
-    Column("budget", String(100)),
+    Column("budget", BudgetType),
     Column("exchange", String(20)),
+    Column("venues", String(100)),
+    Column("price_unit", SmallInteger),
+    Column("price_counts", Integer),
+    Column("tick_interval", Float),
+    Column("adaptive_tick", Boolean),
+    Column("failures", Integer),
+    Column("quarantined_until", DateTime),
+    Column("paper", Boolean),
+    Column("strategy", String(30)),
 )
 
 order_list = Table(
@@ -66,6 +94,79 @@ price_list = Table(
     Column("worker_id", ForeignKey("workers.worker_id")),
 )
 
+# Append-only log of worker events and the latest snapshot of each worker,
+# see cats.domain.events. They are not mapped to domain classes.
+worker_events = Table(
+    "worker_events",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("worker_id", String(50), nullable=False, index=True),
+    Column("version", Integer, nullable=False),
+    Column("type", String(30), nullable=False),
+    Column("occurred_at", DateTime, nullable=False),
+    Column("data", Text, nullable=False),
+    UniqueConstraint("worker_id", "version"),
+)
+
+worker_snapshots = Table(
+    "worker_snapshots",
+    metadata,
+    Column("worker_id", String(50), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("data", Text, nullable=False),
+)
+
+# History of finished workers and their orders, kept out of the tables above
+# that workers are loaded from. Rows carry the month they belong to, which the
+# tables can be range partitioned on, as it is part of their primary keys.
+worker_history = Table(
+    "worker_history",
+    metadata,
+    Column("worker_id", String(50), primary_key=True),
+    Column("market", String(10), nullable=False),
+    Column("budget", String(100)),
+    Column("exchange", String(20)),
+    Column("venues", String(100)),
+    Column("paper", Boolean),
+    Column("strategy", String(30)),
+    Column("archived_at", DateTime, nullable=False),
+    Column("period", String(7), primary_key=True, index=True),
+)
+
+order_history = Table(
+    "order_history",
+    metadata,
+    Column("order_id", String(255), primary_key=True),
+    Column("worker_id", String(50), nullable=False, index=True),
+    Column("type", SmallInteger, nullable=False),
+    Column("status", SmallInteger, nullable=False),
+    Column("price", Float, nullable=False),
+    Column("ordered_volume", Float, nullable=False),
+    Column("executed_volume", Float, nullable=False),
+    Column("paid_fee", Float, nullable=False),
+    Column("ordered_time", DateTime, nullable=False),
+    Column("exchange", String(20)),
+    Column("period", String(7), primary_key=True, index=True),
+)
+
+# Read model of trading results, see cats.domain.reports.
+worker_reports = Table(
+    "worker_reports",
+    metadata,
+    Column("worker_id", String(50), primary_key=True),
+    Column("market", String(10), nullable=False, index=True),
+    Column("status", SmallInteger, nullable=False),
+    Column("bought", Float, nullable=False),
+    Column("sold", Float, nullable=False),
+    Column("fees", Float, nullable=False),
+    Column("bought_volume", Float, nullable=False),
+    Column("sold_volume", Float, nullable=False),
+    Column("fills", Integer, nullable=False),
+    Column("exposure", Float, nullable=False),
+    Column("realized_pnl", Float, nullable=False),
+    Column("updated_at", DateTime),
+)
+
 
 def start_mappers():
     orders_mapper = mapper(Order, orders)
@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from cats.adapters.orm import worker_reports
+from cats.domain.reports import MarketReport, WorkerReport, summarize
+
+
+class AbstractReportStore(ABC):
+    @abstractmethod
+    def save(self, report: WorkerReport):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, worker_id: str) -> Optional[WorkerReport]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_workers(self, market: Optional[str] = None) -> List[WorkerReport]:
+        raise NotImplementedError
+
+    def list_markets(self) -> List[MarketReport]:
+        return summarize(self.list_workers())
+
+
+class InMemoryReportStore(AbstractReportStore):
+    def __init__(self):
+        self._reports: Dict[str, WorkerReport] = dict()
+
+    def save(self, report: WorkerReport):
+        self._reports[report.worker_id] = report
+
+    def get(self, worker_id: str) -> Optional[WorkerReport]:
+        return self._reports.get(worker_id)
+
+    def list_workers(self, market: Optional[str] = None) -> List[WorkerReport]:
+        return [
+            report
+            for report in self._reports.values()
+            if market is None or report.market == market
+        ]
+
+
+class SqlAlchemyReportStore(AbstractReportStore):
+    """
+    Reports in the worker_reports table. Reads touch only this table, so they
+    can be served from a replica and never wait on the trading writes.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def save(self, report: WorkerReport):
+        self.session.execute(
+            delete(worker_reports).where(
+                worker_reports.c.worker_id == report.worker_id
+            )
+        )
+        self.session.execute(insert(worker_reports).values(**asdict(report)))
+
+    def get(self, worker_id: str) -> Optional[WorkerReport]:
+        row = self.session.execute(
+            select(worker_reports).where(worker_reports.c.worker_id == worker_id)
+        ).one_or_none()
+        return WorkerReport(**row._mapping) if row else None
+
+    def list_workers(self, market: Optional[str] = None) -> List[WorkerReport]:
+        query = select(worker_reports).order_by(worker_reports.c.worker_id)
+        if market is not None:
+            query = query.where(worker_reports.c.market == market)
+        return [WorkerReport(**row._mapping) for row in self.session.execute(query)]
+
+    def list_markets(self) -> List[MarketReport]:
+        columns = [
+            func.sum(worker_reports.c[f.name]).label(f.name)
+            for f in fields(MarketReport)
+            if f.name not in ("market", "workers")
+        ]
+        rows = self.session.execute(
+            select(
+                worker_reports.c.market,
+                func.count().label("workers"),
+                *columns,
+            )
+            .group_by(worker_reports.c.market)
+            .order_by(worker_reports.c.market)
+        )
+        return [MarketReport(**row._mapping) for row in rows]
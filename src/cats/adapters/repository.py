@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, Iterable, List, Set
 
 from sqlalchemy.orm import Session
 
@@ -16,6 +18,10 @@ class AbstractRepository(ABC):
     def get(self, worker_id: str) -> Worker:
         raise NotImplementedError
 
+    @abstractmethod
+    def remove(self, worker_id: str):
+        raise NotImplementedError
+
     @abstractmethod
     def check_duplicate(self, market: Market) -> bool:
         raise NotImplementedError
@@ -24,6 +30,21 @@ class AbstractRepository(ABC):
     def list_by_status(self, status: WorkerStatus) -> List[Worker]:
         raise NotImplementedError
 
+    def add_all(self, workers: Iterable[Worker]):
+        for worker in workers:
+            self.add(worker)
+
+    def find_duplicates(self, markets: Iterable[Market]) -> Set[str]:
+        return {
+            _market_value(market)
+            for market in set(markets)
+            if self.check_duplicate(market=market)
+        }
+
+    def save_all(self, workers: Iterable[Worker]):
+        """Adds the workers or overwrites the stored ones with the same ids."""
+        self.add_all(workers)
+
 
 class SqlAlchemyRepository(AbstractRepository):
     def __init__(self, session: Session):
@@ -35,6 +56,12 @@ class SqlAlchemyRepository(AbstractRepository):
     def get(self, worker_id: str) -> Worker:
         return self.session.query(Worker).filter_by(worker_id=worker_id).one()
 
+    def remove(self, worker_id: str):
+        worker = self.get(worker_id)
+        for item in [*worker.orders, *worker.prices]:
+            self.session.delete(item)
+        self.session.delete(worker)
+
     def check_duplicate(self, market: Market) -> bool:
         rows = (
             self.session.query(Worker)
@@ -46,3 +73,106 @@ class SqlAlchemyRepository(AbstractRepository):
     def list_by_status(self, status: WorkerStatus) -> List[Worker]:
         rows = self.session.query(Worker).filter_by(status=status).all()
         return rows
+
+    def add_all(self, workers: Iterable[Worker]):
+        self.session.add_all(workers)
+
+    def find_duplicates(self, markets: Iterable[Market]) -> Set[str]:
+        values = {_market_value(market) for market in markets}
+        if not values:
+            return set()
+        rows = (
+            self.session.query(Worker.market)
+            .filter(
+                Worker.market.in_(values),  # type: ignore
+                Worker.status == WorkerStatus.WATCHING,
+            )
+            .distinct()
+            .all()
+        )
+        return {_market_value(row.market) for row in rows}
+
+    def save_all(self, workers: Iterable[Worker]):
+        for worker in workers:
+            self.session.merge(worker)
+
+
+class InMemoryRepository(AbstractRepository):
+    """
+    Workers in a dict, indexed by market and by status. Workers change their
+    status themselves, so the status index is brought up to date by `reindex`
+    on every commit, and lookups skip workers which left the status since.
+    """
+
+    def __init__(self, workers: Iterable[Worker] = ()):
+        self._workers: Dict[str, Worker] = dict()
+        self._by_market: Dict[str, Dict[str, Worker]] = defaultdict(dict)
+        self._by_status: Dict[int, Dict[str, Worker]] = defaultdict(dict)
+        # Status each worker is indexed under.
+        self._statuses: Dict[str, int] = dict()
+        self.add_all(workers)
+
+    def add(self, worker: Worker):
+        previous = self._workers.get(worker.worker_id)
+        if previous is not None:
+            self.remove(previous.worker_id)
+        self._workers[worker.worker_id] = worker
+        self._by_market[_market_value(worker.market)][worker.worker_id] = worker
+        self._index_status(worker)
+
+    def remove(self, worker_id: str):
+        worker = self._workers.pop(worker_id)
+        del self._by_market[_market_value(worker.market)][worker_id]
+        del self._by_status[self._statuses.pop(worker_id)][worker_id]
+
+    def get(self, worker_id: str) -> Worker:
+        return self._workers[worker_id]
+
+    def check_duplicate(self, market: Market) -> bool:
+        return any(
+            worker.status == WorkerStatus.WATCHING
+            for worker in self._by_market[_market_value(market)].values()
+        )
+
+    def list_by_status(self, status: WorkerStatus) -> List[Worker]:
+        return [
+            worker
+            for worker in self._by_status[int(status)].values()
+            if worker.status == status
+        ]
+
+    def list_all(self) -> List[Worker]:
+        return list(self._workers.values())
+
+    def reindex(self):
+        for worker_id, worker in self._workers.items():
+            if int(worker.status) != self._statuses[worker_id]:
+                del self._by_status[self._statuses[worker_id]][worker_id]
+                self._index_status(worker)
+
+    def snapshot(self) -> Dict[str, Worker]:
+        """Copies of the workers, which later changes do not affect."""
+        return {worker_id: copy_worker(w) for worker_id, w in self._workers.items()}
+
+    def restore(self, snapshot: Dict[str, Worker]):
+        for worker_id in list(self._workers):
+            self.remove(worker_id)
+        self.add_all(copy_worker(worker) for worker in snapshot.values())
+
+    def _index_status(self, worker: Worker):
+        self._statuses[worker.worker_id] = int(worker.status)
+        self._by_status[int(worker.status)][worker.worker_id] = worker
+
+
+def copy_worker(worker: Worker) -> Worker:
+    # Prices are immutable and shared, the API client is not copied.
+    return replace(
+        worker,
+        orders={replace(order) for order in worker.orders},
+        prices=list(worker.prices),
+        _api=None,
+    )
+
+
+def _market_value(market: object) -> str:
+    return str(getattr(market, "value", market))
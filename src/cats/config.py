@@ -1,15 +1,101 @@
 import os
+from functools import lru_cache
 
 
-def get_postgres_uri():
-    host = os.environ.get("DB_HOST", "localhost")
+def get_postgres_uri(host=None):
+    host = host or os.environ.get("DB_HOST", "localhost")
     port = 54321 if host == "localhost" else 5432
     password = os.environ.get("DB_PASSWORD", "abc123")
     user, db_name = "cats", "cats"
     return f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
 
 
+def get_engine_options():
+    statement_timeout = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+    options = dict(
+        pool_pre_ping=True,
+        # psycopg2 sends executemany() as batched INSERT .. VALUES statements.
+        executemany_mode="values_plus_batch",
+        connect_args=dict(application_name=os.environ.get("DB_APP_NAME", "cats")),
+    )
+    if is_pgbouncer_mode():
+        # PgBouncer pools the connections and rejects startup options, so the
+        # statement timeout is set per transaction in make_engine().
+        from sqlalchemy.pool import NullPool
+
+        options.update(poolclass=NullPool)
+    else:
+        options["connect_args"]["options"] = f"-c statement_timeout={statement_timeout}"
+        options.update(
+            pool_size=int(os.environ.get("DB_POOL_SIZE", 10)),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+            pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+            pool_use_lifo=True,
+        )
+    return options
+
+
+def is_pgbouncer_mode():
+    return os.environ.get("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+
+def make_engine(uri=None, **options):
+    # Imported here so that importing the config does not import SQLAlchemy.
+    from sqlalchemy import create_engine, event
+
+    engine = create_engine(
+        uri or get_postgres_uri(), **{**get_engine_options(), **options}
+    )
+    if is_pgbouncer_mode():
+        statement_timeout = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout}")
+
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    return make_engine()
+
+
+@lru_cache(maxsize=None)
+def get_read_engine():
+    """Engine of the read replica, the primary one without DB_REPLICA_HOST."""
+    host = os.environ.get("DB_REPLICA_HOST")
+    return make_engine(get_postgres_uri(host)) if host else get_engine()
+
+
 def get_api_url():
     host = os.environ.get("API_HOST", "localhost")
     port = 5005 if host == "localhost" else 80
     return f"http://{host}:{port}"
+
+
+def get_upbit_host():
+    return os.environ.get("UPBIT_HOST", "https://api.upbit.com/v1")
+
+
+def get_bithumb_host():
+    return os.environ.get("BITHUMB_HOST", "https://api.bithumb.com")
+
+
+def get_coinone_host():
+    return os.environ.get("COINONE_HOST", "https://api.coinone.co.kr")
+
+
+def get_budget_cap():
+    """
+    KRW all workers of a runner process may have at stake, None for no cap.
+    Each process enforces its own cap.
+    """
+    cap = os.environ.get("BUDGET_CAP")
+    return int(cap) if cap else None
+
+
+def get_recording_path():
+    """File the exchange traffic of workers is recorded to, None to not record."""
+    return os.environ.get("RECORD_EXCHANGE_PATH") or None
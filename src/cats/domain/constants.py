@@ -4,6 +4,28 @@ DEFAULT_BUDGET = "10000:20000:30000"
 SELL_RATE = 1.1
 ADDITIONAL_BUY_RATE = 0.9
 MIN_ORDER_BUDGET = 10000
+DEFAULT_PRICE_COUNTS = 24
+# Candles fetched per page when a worker only fetches the new candles.
+INCREMENTAL_PRICE_COUNTS = 3
+DEFAULT_TICK_INTERVAL = 1.0
+# Adaptive ticks run at the tick interval when the trade price is this far
+# from the nearest decision price, and scale linearly with the distance.
+ADAPTIVE_TICK_DISTANCE = 0.01
+MIN_TICK_FACTOR = 0.25
+MAX_TICK_FACTOR = 4.0
+# Workers with live orders are ticked at least this often.
+MAX_ORDER_TICK_INTERVAL = 1.0
+# Seconds an orderbook snapshot is used to price orders.
+ORDERBOOK_TTL = 1.0
+# Seconds the candles of a market are used before new minutes are fetched.
+CANDLE_TTL = 1.0
+# Workers are quarantined after this many consecutive failures, for a period
+# doubling with every further failure.
+QUARANTINE_FAILURES = 5
+QUARANTINE_SECONDS = 60
+MAX_QUARANTINE_SECONDS = 3600
+# A snapshot of worker state is saved every this many events.
+SNAPSHOT_EVENTS = 100
 
 
 class WorkerStatus(IntEnum):
@@ -0,0 +1,233 @@
+"""
+Events of worker state. Every change of the status, budget, balance and orders
+of a worker is recorded as an event, so its state at any point can be rebuilt
+from the latest snapshot and the events after it.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Type, TYPE_CHECKING
+
+from cats.domain.constants import OrderStatus, OrderType, WorkerStatus
+from cats.domain.models.order import Order
+
+if TYPE_CHECKING:
+    from cats.domain.models.worker import Worker
+
+
+@dataclass(frozen=True)
+class Event:
+    worker_id: str
+    # Position of the event in the events of its worker, from 1.
+    version: int
+    occurred_at: datetime
+
+
+@dataclass(frozen=True)
+class OrderPlaced(Event):
+    order_id: str
+    type: int
+    price: float
+    ordered_volume: float
+    ordered_time: datetime
+
+
+@dataclass(frozen=True)
+class OrderFilled(Event):
+    """The order was (partially) filled or cancelled."""
+
+    order_id: str
+    status: int
+    executed_volume: float
+    paid_fee: float
+
+
+@dataclass(frozen=True)
+class BudgetSpent(Event):
+    spent: float
+    budget: str
+
+
+@dataclass(frozen=True)
+class BalanceChanged(Event):
+    balance: float
+
+
+@dataclass(frozen=True)
+class StatusChanged(Event):
+    previous: int
+    status: int
+
+
+EVENT_TYPES: Dict[str, Type[Event]] = {
+    cls.__name__: cls
+    for cls in (OrderPlaced, OrderFilled, BudgetSpent, BalanceChanged, StatusChanged)
+}
+
+
+@dataclass
+class WorkerState:
+    """State of a worker after `version` events. Snapshots store this."""
+
+    worker_id: str
+    version: int = 0
+    status: int = WorkerStatus.WATCHING
+    budget: str = ""
+    balance: float = 0.0
+    orders: Dict[str, Order] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, worker: Worker, version: int = 0) -> WorkerState:
+        return cls(
+            worker_id=worker.worker_id,
+            version=version,
+            status=int(worker.status),
+            budget=str(worker.budget or ""),
+            balance=worker.balance or 0.0,
+            orders={order.order_id: replace(order) for order in worker.orders},
+        )
+
+    def apply(self, event: Event) -> None:
+        if isinstance(event, OrderPlaced):
+            self.orders[event.order_id] = Order(
+                order_id=event.order_id,
+                type=OrderType(event.type),
+                status=OrderStatus.WAIT,
+                price=event.price,
+                ordered_volume=event.ordered_volume,
+                executed_volume=0.0,
+                paid_fee=0.0,
+                ordered_time=event.ordered_time,
+            )
+        elif isinstance(event, OrderFilled):
+            order = self.orders[event.order_id]
+            order.status = OrderStatus(event.status)
+            order.executed_volume = event.executed_volume
+            order.paid_fee = event.paid_fee
+        elif isinstance(event, BudgetSpent):
+            self.budget = event.budget
+        elif isinstance(event, BalanceChanged):
+            self.balance = event.balance
+        elif isinstance(event, StatusChanged):
+            self.status = event.status
+        self.version = event.version
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["orders"] = [_encode(asdict(order)) for order in self.orders.values()]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> WorkerState:
+        orders = [Order(**_decode(Order, order)) for order in data["orders"]]
+        for order in orders:
+            order.type = OrderType(order.type)
+            order.status = OrderStatus(order.status)
+        return cls(
+            worker_id=data["worker_id"],
+            version=data["version"],
+            status=data["status"],
+            budget=data["budget"],
+            balance=data["balance"],
+            orders={order.order_id: order for order in orders},
+        )
+
+
+def rebuild(
+    worker_id: str, snapshot: Optional[WorkerState], events: Iterable[Event]
+) -> WorkerState:
+    state = WorkerState(worker_id=worker_id)
+    if snapshot:
+        orders = {key: replace(order) for key, order in snapshot.orders.items()}
+        state = replace(snapshot, orders=orders)
+    for event in events:
+        state.apply(event)
+    return state
+
+
+def get_events(
+    before: WorkerState, worker: Worker, occurred_at: Optional[datetime] = None
+) -> List[Event]:
+    """Events from the state `before` to the current state of the worker."""
+    occurred_at = occurred_at or datetime.now()
+    changes: List[Dict[str, Any]] = list()
+    for order in sorted(worker.orders, key=lambda order: order.ordered_time):
+        previous = before.orders.get(order.order_id)
+        if previous is None:
+            changes.append(
+                dict(
+                    cls=OrderPlaced,
+                    order_id=order.order_id,
+                    type=int(order.type),
+                    price=order.price,
+                    ordered_volume=order.ordered_volume,
+                    ordered_time=order.ordered_time,
+                )
+            )
+        fill = (order.status, order.executed_volume, order.paid_fee)
+        previous_fill = (
+            (previous.status, previous.executed_volume, previous.paid_fee)
+            if previous is not None
+            else (OrderStatus.WAIT, 0.0, 0.0)
+        )
+        if fill != previous_fill:
+            changes.append(
+                dict(
+                    cls=OrderFilled,
+                    order_id=order.order_id,
+                    status=int(order.status),
+                    executed_volume=order.executed_volume,
+                    paid_fee=order.paid_fee,
+                )
+            )
+    budget = str(worker.budget or "")
+    if budget != before.budget:
+        spent = _sum_budget(before.budget) - _sum_budget(budget)
+        changes.append(dict(cls=BudgetSpent, spent=spent, budget=budget))
+    if (worker.balance or 0.0) != before.balance:
+        changes.append(dict(cls=BalanceChanged, balance=worker.balance or 0.0))
+    if int(worker.status) != before.status:
+        changes.append(
+            dict(cls=StatusChanged, previous=before.status, status=int(worker.status))
+        )
+    return [
+        change.pop("cls")(
+            worker_id=worker.worker_id,
+            version=before.version + index,
+            occurred_at=occurred_at,
+            **change,
+        )
+        for index, change in enumerate(changes, start=1)
+    ]
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    data = _encode(asdict(event))
+    data["event"] = type(event).__name__
+    return data
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    data = dict(data)
+    cls = EVENT_TYPES[data.pop("event")]
+    return cls(**_decode(cls, data))
+
+
+def _sum_budget(budget: str) -> float:
+    return sum(float(unit) for unit in budget.split(":") if unit)
+
+
+def _encode(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in data.items()
+    }
+
+
+def _decode(cls: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    dates = {f.name for f in fields(cls) if f.type in ("datetime", datetime)}
+    return {
+        key: datetime.fromisoformat(value) if key in dates else value
+        for key, value in data.items()
+    }
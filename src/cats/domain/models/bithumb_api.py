@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+from cats import config
+from cats.domain.constants import Market, PriceUnit, OrderType, OrderStatus
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+    KST,
+    TickTable,
+    now_kst,
+)
+from cats.domain.models.order import Order
+from cats.domain.models.transport import HttpTransport, get_transport
+from cats.domain.values import Orderbook, Price, Quote
+
+DEFAULT_BITHUMB_ACCESS_KEY = os.getenv("BITHUMB_ACCESS_KEY", "access-key")
+DEFAULT_BITHUMB_SECRET_KEY = os.getenv("BITHUMB_SECRET_KEY", "secret-key")
+# Requests per second of each Bithumb rate limit group.
+BITHUMB_RATE_LIMITS = dict(order=10.0, default=15.0, quotation=20.0)
+BITHUMB_TICK_SIZES = TickTable(
+    [
+        (1000000, 1000.0),
+        (500000, 500.0),
+        (100000, 100.0),
+        (50000, 50.0),
+        (10000, 10.0),
+        (5000, 5.0),
+        (1000, 1.0),
+        (100, 0.1),
+        (10, 0.01),
+        (1, 0.001),
+        (0, 0.0001),
+    ]
+)
+BITHUMB_SIDES = dict(
+    bid=OrderType.BUY,
+    ask=OrderType.SELL,
+)
+BITHUMB_STATES = dict(
+    Pending=OrderStatus.WAIT,
+    Completed=OrderStatus.DONE,
+    Cancel=OrderStatus.CANCEL,
+)
+
+
+class BithumbExchangeAPI(AbstractExchangeAPI):
+    fee_rate = 0.0025
+    min_order_amount = 5000.0
+    sides = BITHUMB_SIDES
+    states = BITHUMB_STATES
+
+    def __init__(
+        self,
+        market: Market,
+        access_key: str = DEFAULT_BITHUMB_ACCESS_KEY,
+        secret_key: str = DEFAULT_BITHUMB_SECRET_KEY,
+        host: Optional[str] = None,
+    ):
+        super().__init__(market)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.host = host or config.get_bithumb_host()
+
+        self.intervals = {
+            PriceUnit.MINUTE: "1m",
+            PriceUnit.HOUR: "1h",
+            PriceUnit.DAY: "24h",
+        }
+
+    @property
+    def transport(self) -> HttpTransport:
+        return get_transport(self.host, BITHUMB_RATE_LIMITS, account=self.access_key)
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.BUY, price=price
+        )
+        return self._place_order("bid", budget / valid_price, valid_price)
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.SELL, price=price
+        )
+        return self._place_order("ask", volume, valid_price)
+
+    def cancel_order(self, order_id: str) -> str:
+        detail = self._private("/info/order_detail", order_id=order_id)
+        self._private(
+            "/trade/cancel",
+            group="order",
+            order_id=order_id,
+            type=detail["data"]["type"],
+        )
+        return order_id
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        orders = list()
+        for order_id in order_ids:
+            detail = self._private("/info/order_detail", order_id=order_id)
+            orders.append(self._make_order(order_id, detail["data"]))
+        return orders
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        if price_unit not in self.intervals:
+            raise APIError(f"Invalid price unit.({price_unit})")
+        res = self.transport.request(
+            "GET",
+            f"/public/candlestick/{self.market}_KRW/{self.intervals[price_unit]}",
+            group="quotation",
+        )
+        self._raise_for_status(res)
+        # Candles are returned from the oldest one.
+        prices = [self._make_price(candle) for candle in reversed(res["data"])]
+        if to:
+            prices = [price for price in prices if price.date_time <= to]
+        return prices[:counts]
+
+    def get_balance(self) -> float:
+        res = self._private("/info/balance", currency=self.market)
+        return float(res["data"][f"available_{self.market.lower()}"])
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        res = self.transport.request(
+            "GET",
+            f"/public/orderbook/{self.market}_KRW",
+            group="quotation",
+            params=dict(count=depth),
+        )
+        self._raise_for_status(res)
+        return Orderbook(
+            date_time=_from_timestamp(int(res["data"]["timestamp"]) / 1000),
+            bids=_make_levels(res["data"]["bids"], depth),
+            asks=_make_levels(res["data"]["asks"], depth),
+        )
+
+    def get_quote(self) -> Quote:
+        return self.get_orderbook(depth=1).to_quote()
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return BITHUMB_TICK_SIZES.round(order_type, price)
+
+    def _place_order(self, side: str, volume: float, price: float) -> Order:
+        # Bithumb accepts up to 4 decimal places for order units.
+        volume = float(f"{volume:.4f}")
+        res = self._private(
+            "/trade/place",
+            group="order",
+            units=volume,
+            price=price,
+            type=side,
+        )
+        return Order(
+            order_id=res["order_id"],
+            type=self.sides[side],
+            status=OrderStatus.WAIT,
+            price=price,
+            ordered_volume=volume,
+            executed_volume=0.0,
+            paid_fee=0.0,
+            ordered_time=now_kst(),
+        )
+
+    def _private(self, endpoint: str, group: str = "default", **params: Any):
+        params = dict(
+            endpoint=endpoint,
+            order_currency=self.market,
+            payment_currency="KRW",
+            **params,
+        )
+        body = urlencode(params)
+        headers = self._make_authorize_header(endpoint, body)
+        res = self.transport.request(
+            "POST", endpoint, group=group, data=body, headers=headers
+        )
+        self._raise_for_status(res)
+        return res
+
+    def _make_authorize_header(self, endpoint: str, body: str) -> Dict[str, str]:
+        nonce = str(int(time.time() * 1000))
+        message = f"{endpoint}\0{body}\0{nonce}".encode()
+        signature = hmac.new(
+            self.secret_key.encode(), message, hashlib.sha512
+        ).hexdigest()
+        return {
+            "Api-Key": self.access_key,
+            "Api-Sign": base64.b64encode(signature.encode()).decode(),
+            "Api-Nonce": nonce,
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+
+    @staticmethod
+    def _raise_for_status(res: Dict[str, Any]) -> None:
+        if res.get("status") != "0000":
+            raise APIError(str(res))
+
+    def _make_order(self, order_id: str, order: Dict[str, Any]) -> Order:
+        price = float(order["order_price"])
+        contracts = order.get("contract") or []
+        paid_fee = 0.0
+        for contract in contracts:
+            fee = float(contract["fee"])
+            # Fee of a bid order is paid in the coin.
+            paid_fee += fee * price if contract["fee_currency"] != "KRW" else fee
+        return Order(
+            order_id=order_id,
+            type=self.sides[order["type"]],
+            status=self.states[order["order_status"]],
+            price=price,
+            ordered_volume=float(order["order_qty"]),
+            executed_volume=sum(float(contract["units"]) for contract in contracts),
+            paid_fee=paid_fee,
+            ordered_time=_from_timestamp(int(order["order_date"]) / 1000000),
+        )
+
+    @staticmethod
+    def _make_price(candle: List[Any]) -> Price:
+        # [timestamp(ms), open, close, high, low, volume]
+        return Price(
+            date_time=_from_timestamp(int(candle[0]) / 1000),
+            high_price=float(candle[3]),
+            low_price=float(candle[4]),
+            trade_price=float(candle[2]),
+        )
+
+
+def _from_timestamp(timestamp: float) -> datetime:
+    return datetime.utcfromtimestamp(timestamp) + KST
+
+
+def _make_levels(levels: List[Dict[str, str]], depth: int):
+    return tuple(
+        (float(level["price"]), float(level["quantity"])) for level in levels[:depth]
+    )
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from cats import config
+from cats.domain.constants import Market, PriceUnit, OrderType, OrderStatus
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+    KST,
+    TickTable,
+    now_kst,
+)
+from cats.domain.models.order import Order
+from cats.domain.models.transport import HttpTransport, get_transport
+from cats.domain.values import Orderbook, Price, Quote
+
+DEFAULT_COINONE_ACCESS_KEY = os.getenv("COINONE_ACCESS_KEY", "access-key")
+DEFAULT_COINONE_SECRET_KEY = os.getenv("COINONE_SECRET_KEY", "secret-key")
+# Requests per second of each Coinone rate limit group.
+COINONE_RATE_LIMITS = dict(order=10.0, default=10.0, quotation=10.0)
+COINONE_TICK_SIZES = TickTable(
+    [
+        (1000000, 1000.0),
+        (500000, 500.0),
+        (100000, 100.0),
+        (50000, 50.0),
+        (10000, 10.0),
+        (5000, 5.0),
+        (1000, 1.0),
+        (100, 0.1),
+        (10, 0.01),
+        (1, 0.001),
+        (0, 0.0001),
+    ]
+)
+COINONE_SIDES = dict(
+    bid=OrderType.BUY,
+    ask=OrderType.SELL,
+)
+COINONE_STATES = dict(
+    live=OrderStatus.WAIT,
+    partially_filled=OrderStatus.WAIT,
+    filled=OrderStatus.DONE,
+    cancelled=OrderStatus.CANCEL,
+    partially_cancelled=OrderStatus.CANCEL,
+)
+
+
+class CoinoneExchangeAPI(AbstractExchangeAPI):
+    fee_rate = 0.002
+    min_order_amount = 5000.0
+    sides = COINONE_SIDES
+    states = COINONE_STATES
+
+    def __init__(
+        self,
+        market: Market,
+        access_key: str = DEFAULT_COINONE_ACCESS_KEY,
+        secret_key: str = DEFAULT_COINONE_SECRET_KEY,
+        host: Optional[str] = None,
+    ):
+        super().__init__(market)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.host = host or config.get_coinone_host()
+
+        self.intervals = {
+            PriceUnit.MINUTE: "1m",
+            PriceUnit.HOUR: "1h",
+            PriceUnit.DAY: "1d",
+        }
+
+    @property
+    def transport(self) -> HttpTransport:
+        return get_transport(self.host, COINONE_RATE_LIMITS, account=self.access_key)
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.BUY, price=price
+        )
+        return self._place_order("bid", budget / valid_price, valid_price)
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.SELL, price=price
+        )
+        return self._place_order("ask", volume, valid_price)
+
+    def cancel_order(self, order_id: str) -> str:
+        info = self._query_order(order_id)["info"]
+        self._private(
+            "/v2/order/cancel/",
+            group="order",
+            order_id=order_id,
+            price=info["price"],
+            qty=info["qty"],
+            is_ask=1 if info["type"] == "ask" else 0,
+        )
+        return order_id
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        return [self._make_order(self._query_order(order_id)) for order_id in order_ids]
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        if price_unit not in self.intervals:
+            raise APIError(f"Invalid price unit.({price_unit})")
+        params: Dict[str, Any] = dict(interval=self.intervals[price_unit], size=counts)
+        if to:
+            utc = (to - KST).replace(tzinfo=timezone.utc)
+            params["timestamp"] = int(utc.timestamp() * 1000)
+        res = self.transport.request(
+            "GET",
+            f"/public/v2/chart/KRW/{self.market}",
+            group="quotation",
+            params=params,
+        )
+        self._raise_for_result(res)
+        return [self._make_price(candle) for candle in res["chart"]][:counts]
+
+    def get_balance(self) -> float:
+        res = self._private("/v2/account/balance/")
+        return float(res[self.market.lower()]["avail"])
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        res = self.transport.request(
+            "GET",
+            f"/public/v2/orderbook/KRW/{self.market}",
+            group="quotation",
+            params=dict(size=depth),
+        )
+        self._raise_for_result(res)
+        return Orderbook(
+            date_time=_from_timestamp(int(res["timestamp"]) / 1000),
+            bids=_make_levels(res["bids"], depth),
+            asks=_make_levels(res["asks"], depth),
+        )
+
+    def get_quote(self) -> Quote:
+        return self.get_orderbook(depth=1).to_quote()
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return COINONE_TICK_SIZES.round(order_type, price)
+
+    def _place_order(self, side: str, volume: float, price: float) -> Order:
+        volume = float(f"{volume:.4f}")
+        path = "/v2/order/limit_buy/" if side == "bid" else "/v2/order/limit_sell/"
+        res = self._private(path, group="order", price=price, qty=volume)
+        return Order(
+            order_id=res["orderId"],
+            type=self.sides[side],
+            status=OrderStatus.WAIT,
+            price=price,
+            ordered_volume=volume,
+            executed_volume=0.0,
+            paid_fee=0.0,
+            ordered_time=now_kst(),
+        )
+
+    def _query_order(self, order_id: str) -> Dict[str, Any]:
+        return self._private("/v2/order/query_order/", order_id=order_id)
+
+    def _private(self, path: str, group: str = "default", **params: Any):
+        payload = dict(
+            access_token=self.access_key,
+            nonce=int(time.time() * 1000),
+            currency=self.market,
+            **params,
+        )
+        encoded_payload = base64.b64encode(json.dumps(payload).encode())
+        headers = self._make_authorize_header(encoded_payload)
+        res = self.transport.request(
+            "POST", path, group=group, data=encoded_payload, headers=headers
+        )
+        self._raise_for_result(res)
+        return res
+
+    def _make_authorize_header(self, encoded_payload: bytes) -> Dict[str, str]:
+        signature = hmac.new(
+            self.secret_key.upper().encode(), encoded_payload, hashlib.sha512
+        ).hexdigest()
+        return {
+            "Content-Type": "application/json",
+            "X-COINONE-PAYLOAD": encoded_payload.decode(),
+            "X-COINONE-SIGNATURE": signature,
+        }
+
+    @staticmethod
+    def _raise_for_result(res: Dict[str, Any]) -> None:
+        if res.get("result") != "success":
+            raise APIError(str(res))
+
+    def _make_order(self, order: Dict[str, Any]) -> Order:
+        info = order["info"]
+        ordered_volume = float(info["qty"])
+        return Order(
+            order_id=info["orderId"],
+            type=self.sides[info["type"]],
+            status=self.states[order["status"]],
+            price=float(info["price"]),
+            ordered_volume=ordered_volume,
+            executed_volume=ordered_volume - float(info["remainQty"]),
+            paid_fee=float(info["fee"]),
+            ordered_time=_from_timestamp(int(info["timestamp"])),
+        )
+
+    @staticmethod
+    def _make_price(candle: Dict[str, Any]) -> Price:
+        return Price(
+            date_time=_from_timestamp(int(candle["timestamp"]) / 1000),
+            high_price=float(candle["high"]),
+            low_price=float(candle["low"]),
+            trade_price=float(candle["close"]),
+        )
+
+
+def _from_timestamp(timestamp: float) -> datetime:
+    return datetime.utcfromtimestamp(timestamp) + KST
+
+
+def _make_levels(levels: List[Dict[str, str]], depth: int):
+    return tuple(
+        (float(level["price"]), float(level["qty"])) for level in levels[:depth]
+    )
@@ -1,31 +1,41 @@
 from __future__ import annotations
 
-import hashlib
-import os
-import uuid
+import importlib
+import itertools
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import List, Optional, Dict
-from urllib.parse import urlencode
-from uuid import uuid4
-
-import jwt  # type: ignore
-import requests  # type: ignore
-from arrow import Arrow
-from faker import Faker
+from bisect import bisect_right
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, List, Optional, Dict, Tuple
 
 from cats.domain.models.order import Order
-from cats.domain.constants import Market, PriceUnit, OrderType, OrderStatus
-from cats.domain.values import Price
+from cats.domain.constants import Market, PriceUnit, OrderType
+from cats.domain.values import Orderbook, Price, PriceColumns, Quote
 
 
 class APIError(Exception):
     pass
 
 
+class RetryableAPIError(APIError):
+    """A transient failure of the exchange, such as a network error."""
+
+
+DEFAULT_ORDERBOOK_DEPTH = 15
+
+
 class AbstractExchangeAPI(ABC):
+    fee_rate: float = 0.0
+    # KRW an order must be worth at least.
+    min_order_amount: float = 0.0
+    # Candles a single get_prices call of the exchange returns at most.
+    max_candles: int = 200
+    # Candles of every unit are built from the same trades, so they can be
+    # resampled from minute candles.
+    resamplable_candles: bool = True
+
     def __init__(self, market: Market):
-        self.market: str = market.value
+        self.market: str = Market(market).value
 
     @abstractmethod
     def buy_order(self, price: float, budget: int) -> Order:
@@ -49,6 +59,10 @@ class AbstractExchangeAPI(ABC):
     ) -> List[Price]:
         raise NotImplementedError
 
+    def sell_orders(self, price: float, volume: float) -> List[Order]:
+        """Sells `volume`, in one order unless it is held on several venues."""
+        return [self.sell_order(price, volume)]
+
     @abstractmethod
     def get_balance(self) -> float:
         raise NotImplementedError
@@ -57,292 +71,238 @@ class AbstractExchangeAPI(ABC):
     def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
         raise NotImplementedError
 
-
-DEFAULT_UPBIT_ACCESS_KEY = os.getenv("UPBIT_ACCESS_KEY", "access-key")
-DEFAULT_UPBIT_SECRET_KEY = os.getenv("UPBIT_SECRET_KEY", "secret-key")
-
-
-class UpbitExchangeAPI(AbstractExchangeAPI):
-    def __init__(
+    def iter_prices(
         self,
-        market: Market,
-        access_key: str = DEFAULT_UPBIT_ACCESS_KEY,
-        secret_key: str = DEFAULT_UPBIT_SECRET_KEY,
-    ):
-        super().__init__(market)
-        self.market = f"KRW-{market}"
-        self.access_key = access_key
-        self.secret_key = secret_key
-        self.host = "https://api.upbit.com/v1"
-
-        self.sides = dict(
-            bid=OrderType.BUY,
-            ask=OrderType.SELL,
+        price_unit: PriceUnit,
+        to: Optional[datetime] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[List[Price]]:
+        """Pages of candles at or before `to`, from the latest one."""
+        page_size = min(page_size or self.max_candles, self.max_candles)
+        while True:
+            page = self.get_prices(price_unit=price_unit, counts=page_size, to=to)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            to = page[-1].date_time - PRICE_UNIT_DELTAS[price_unit]
+
+    def get_price_history(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        prices: List[Price] = list()
+        for page in self.iter_prices(price_unit, to, page_size=counts):
+            prices.extend(page)
+            if len(prices) >= counts:
+                break
+        return prices[:counts]
+
+    def get_prices_since(
+        self,
+        price_unit: PriceUnit,
+        since: datetime,
+        to: Optional[datetime] = None,
+        page_size: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Price]:
+        """Candles newer than `since`, at most `limit` of the latest ones."""
+        prices: List[Price] = list()
+        for page in self.iter_prices(price_unit, to, page_size=page_size):
+            prices.extend(price for price in page if price.date_time > since)
+            if page[-1].date_time <= since or (limit and len(prices) >= limit):
+                break
+        return prices[:limit] if limit else prices
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        """`get_prices` as columns. Adapters parse responses into them directly."""
+        return PriceColumns.from_prices(self.get_prices(price_unit, counts, to))
+
+    def get_quote(self) -> Quote:
+        prices = self.get_prices(price_unit=PriceUnit.MINUTE, counts=1)
+        if not prices:
+            raise APIError("No prices to quote.")
+        return Quote(
+            date_time=prices[0].date_time,
+            bid_price=prices[0].trade_price,
+            ask_price=prices[0].trade_price,
         )
-        self.states = dict(
-            wait=OrderStatus.WAIT,
-            done=OrderStatus.DONE,
-            cancel=OrderStatus.CANCEL,
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        # Exchanges without an orderbook endpoint have a single level book.
+        quote = self.get_quote()
+        return Orderbook(
+            date_time=quote.date_time,
+            bids=((quote.bid_price, 0.0),),
+            asks=((quote.ask_price, 0.0),),
         )
 
+
+class ExchangeAPIWrapper(AbstractExchangeAPI):
+    """Delegates every call to the wrapped API. Subclasses override the calls
+    they change."""
+
+    def __init__(self, api: AbstractExchangeAPI):
+        self.api = api
+        self.market = api.market
+        self.fee_rate = api.fee_rate
+        self.min_order_amount = api.min_order_amount
+        self.max_candles = api.max_candles
+
     def buy_order(self, price: float, budget: int) -> Order:
-        valid_price = self.make_valid_order_price(
-            order_type=OrderType.BUY, price=price
-        )
-        order = self._post_orders("bid", budget / valid_price, price)
-        if "error" in order:
-            raise APIError(str(order))
-        return self._make_order(order)
+        return self.api.buy_order(price, budget)
 
     def sell_order(self, price: float, volume: float) -> Order:
-        valid_price = self.make_valid_order_price(
-            order_type=OrderType.SELL, price=price
-        )
-        order = self._post_orders("ask", volume, valid_price)
-        if "error" in order:
-            raise APIError(str(order))
-        return self._make_order(order)
+        return self.api.sell_order(price, volume)
 
     def cancel_order(self, order_id: str) -> str:
-        order = self._delete_order(order_id)
-        if "error" in order:
-            raise APIError(str(order))
-        return order["uuid"]
+        return self.api.cancel_order(order_id)
 
     def get_orders(self, order_ids: List[str]) -> List[Order]:
-        wait_orders = self._get_orders_by_uuids(order_ids, ["wait"])
-        if "error" in wait_orders:
-            raise APIError(str(wait_orders))
-        cancel_or_done_orders = self._get_orders_by_uuids(
-            order_ids, ["cancel", "done"]
-        )
-        if "error" in cancel_or_done_orders:
-            raise APIError(str(cancel_or_done_orders))
-        orders = wait_orders + cancel_or_done_orders
-        return [self._make_order(order) for order in orders]
+        return self.api.get_orders(order_ids)
 
     def get_prices(
         self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
     ) -> List[Price]:
-        if price_unit == PriceUnit.MINUTE:
-            prices = self._candles_minutes(unit=1, count=counts)
-        elif price_unit == PriceUnit.HOUR:
-            prices = self._candles_minutes(unit=60, count=counts)
-        elif price_unit == PriceUnit.DAY:
-            prices = self._candles_days(count=counts)
-        else:
-            raise APIError(f"Invalid price unit.({price_unit})")
-        return [self._make_price(price) for price in prices]
+        return self.api.get_prices(price_unit, counts, to)
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        return self.api.get_price_columns(price_unit, counts, to)
 
     def get_balance(self) -> float:
-        chance = self._orders_chance()
-        if "error" in chance:
-            raise APIError(str(chance))
-        return float(chance["ask_account"]["balance"]) - float(
-            chance["ask_account"]["locked"]
-        )
+        return self.api.get_balance()
 
     def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
-        if price >= 2000000:  # 1000
-            bias = 1000.0
-        elif price >= 1000000:  # 500
-            bias = 500.0
-        elif price >= 500000:  # 100
-            bias = 100.0
-        elif price >= 100000:  # 50
-            bias = 50.0
-        elif price >= 10000:  # 10
-            bias = 10.0
-        elif price >= 1000:  # 5
-            bias = 5.0
-        elif price >= 100:  # 1
-            bias = 1.0
-        elif price >= 10:  # 0.1
-            bias = 0.1
-        else:  # 0.01
-            bias = 0.01
-
-        if order_type == OrderType.BUY:
-            return price - (price % bias)
-        elif order_type == OrderType.SELL:
-            return price + (bias - (price % bias))
-        else:
-            raise APIError
-
-    def _make_authorize_header(self, query_string: bytes) -> Dict[str, str]:
-        m = hashlib.sha512()
-        m.update(query_string)
-        query_hash = m.hexdigest()
-
-        payload = {
-            "access_key": self.access_key,
-            "nonce": str(uuid.uuid4()),
-            "query_hash": query_hash,
-            "query_hash_alg": "SHA512",
-        }
-        jwt_token = jwt.encode(payload, self.secret_key).decode("utf-8")
-        authorize_token = f"Bearer {jwt_token}"
-        return {"Authorization": authorize_token}
-
-    def _post_orders(self, side: str, volume: float, price: float):
-        url = f"{self.host}/orders/"
-        query_params = dict(
-            market=self.market,
-            side=side,
-            volume=volume,
-            price=price,
-            ord_type="limit",
-        )
-        query_string = urlencode(query_params).encode()
-        headers = self._make_authorize_header(query_string)
-        res = requests.post(url, params=query_params, headers=headers)
-        return res.json()
-
-    def _delete_order(self, order_id: str):
-        url = f"{self.host}/order/"
-        query_params = dict(
-            uuid=order_id,
-        )
-        query_string = urlencode(query_params).encode()
-        headers = self._make_authorize_header(query_string)
-        res = requests.delete(url, params=query_params, headers=headers)
-        return res.json()
-
-    def _get_orders_by_uuids(self, uuids: List[str], states: List[str]):
-        url = f"{self.host}/orders/"
-        query_params = dict(
-            market=self.market,
-            limit=100,
-        )
-        basic_query_string = urlencode(query_params)
-        uuids_query_string = None
-        if uuids:
-            uuids_query_string = "&".join([f"uuids[]={uuid}" for uuid in uuids])
-            query_params["uuids[]"] = uuids
-        states_query_string = "&".join([f"states[]={state}" for state in states])
-        query_params["states[]"] = states
-        if uuids_query_string:
-            query_string = f"{basic_query_string}&{uuids_query_string}&{states_query_string}".encode()
-        else:
-            query_string = f"{basic_query_string}&{states_query_string}".encode()
-        headers = self._make_authorize_header(query_string)
-        res = requests.get(url, params=query_params, headers=headers)
-        return res.json()
-
-    def _candles_minutes(self, unit: int, count: int):
-        url = f"{self.host}/candles/minutes/{unit}"
-        query_params = dict(
-            market=self.market,
-            count=count,
-        )
-        res = requests.get(url, params=query_params)
-        return res.json()
-
-    def _candles_days(self, count: int):
-        url = f"{self.host}/candles/days/"
-        query_params = dict(
-            market=self.market,
-            count=count,
-        )
-        res = requests.get(url, params=query_params)
-        return res.json()
-
-    def _orders_chance(self):
-        url = f"{self.host}/orders/chance"
-        query_params = dict(market=self.market)
-        query_string = urlencode(query_params).encode()
-        headers = self._make_authorize_header(query_string)
-        res = requests.get(url, params=query_params, headers=headers)
-        return res.json()
-
-    def _make_order(self, order: Dict[str, str]) -> Order:
-        return Order(
-            order_id=order["uuid"],
-            type=self.sides[order["side"]],
-            status=self.states[order["state"]],
-            price=float(order["price"]),
-            ordered_volume=float(order["volume"]),
-            executed_volume=float(order["executed_volume"]),
-            paid_fee=float(order["paid_fee"]),
-            ordered_time=datetime.fromisoformat(order["created_at"]),
-        )
+        return self.api.make_valid_order_price(order_type, price)
 
-    def _make_price(self, price: Dict[str, str]) -> Price:
-        return Price(
-            date_time=datetime.fromisoformat(price["candle_date_time_kst"]),
-            high_price=float(price["high_price"]),
-            low_price=float(price["low_price"]),
-            trade_price=float(price["trade_price"]),
-        )
+    def get_quote(self) -> Quote:
+        return self.api.get_quote()
 
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self.api.get_orderbook(depth)
 
-class FakeExchangeAPI(AbstractExchangeAPI):
-    def __init__(self, market: Market):
-        super().__init__(market)
-        self.fee_rate: float = 0.0005
-        self._orders: List[Order] = list()
+    def __getattr__(self, name: str) -> Any:
+        # Exposes adapter specific attributes such as transport.
+        if name == "api":
+            raise AttributeError(name)
+        return getattr(self.api, name)
 
-    def buy_order(self, price: float, budget: int) -> Order:
-        order = Order(
-            order_id=str(uuid4()),
-            type=OrderType.BUY,
-            status=OrderStatus.WAIT,
-            price=price,
-            ordered_volume=(budget * (1 - self.fee_rate)) / price,
-            executed_volume=0.0,
-            paid_fee=0.0,
-            ordered_time=datetime.now(),
-        )
-        self._orders.append(order)
-        return order
 
-    def sell_order(self, price: float, volume: float) -> Order:
-        order = Order(
-            order_id=str(uuid4()),
-            type=OrderType.SELL,
-            status=OrderStatus.WAIT,
-            price=price,
-            ordered_volume=volume,
-            executed_volume=0.0,
-            paid_fee=0.0,
-            ordered_time=datetime.now(),
-        )
-        self._orders.append(order)
-        return order
+def unwrap(api: AbstractExchangeAPI) -> AbstractExchangeAPI:
+    while isinstance(api, ExchangeAPIWrapper):
+        api = api.api
+    return api
 
-    def cancel_order(self, order_id: str) -> str:
-        pass
 
-    def get_orders(self, order_ids: List[str]) -> List[Order]:
-        orders = [order for order in self._orders if order.order_id in order_ids]
-        results = list()
-        for order in orders:
-            if order.status == OrderStatus.WAIT:
-                order.status = OrderStatus.DONE
-            results.append(order)
-        return results
+_venue_ids = itertools.count()
 
-    def get_prices(
-        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
-    ) -> List[Price]:
-        time_units: Dict[PriceUnit, str] = {
-            PriceUnit.MINUTE: "minutes",
-            PriceUnit.HOUR: "hours",
-            PriceUnit.DAY: "days",
-        }
-        now = Arrow.now().floor(time_units[price_unit])  # type: ignore
-        return [
-            Price(
-                date_time=now.shift(**{time_units[price_unit]: -i}).datetime,
-                high_price=Faker().pyfloat(),
-                low_price=Faker().pyfloat(),
-                trade_price=Faker().pyfloat(),
-            )
-            for i in range(counts)
-        ]
 
-    def get_balance(self) -> float:
-        return Faker().pyfloat()
+def get_venue_key(api: AbstractExchangeAPI) -> Tuple[Any, ...]:
+    """Identifies the exchange account an API talks to."""
+    host = getattr(api, "host", None)
+    if not host:
+        # APIs without a host keep their state in the process. They are told
+        # apart by a number that, unlike id(), is not reused once they are
+        # collected, so caches never serve them the state of a dead one.
+        if "_venue_id" not in api.__dict__:
+            api.__dict__["_venue_id"] = next(_venue_ids)
+        return ("local", api.__dict__["_venue_id"])
+    return (type(unwrap(api)).__name__, host, getattr(api, "access_key", ""))
 
-    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
-        pass
+
+# (minimum price, tick size) pairs in descending order of price.
+TickSizes = List[Tuple[float, float]]
+# Buy prices are rounded down and sell prices up, to the nearest tick.
+ROUNDINGS = {OrderType.BUY: ROUND_FLOOR, OrderType.SELL: ROUND_CEILING}
+
+
+class TickTable:
+    """
+    Tick sizes of an exchange by price band. Prices are rounded in whole tick
+    units with decimals, so valid prices are never moved by float error.
+    """
+
+    def __init__(self, tick_sizes: TickSizes):
+        bands = sorted(tick_sizes)
+        self.minimums = [float(minimum) for minimum, _ in bands]
+        self.ticks = [Decimal(str(tick)) for _, tick in bands]
+
+    def get_tick_size(self, price: float) -> Decimal:
+        index = bisect_right(self.minimums, price) - 1
+        if index < 0:
+            raise APIError(f"Invalid order price.({price})")
+        return self.ticks[index]
+
+    def round(self, order_type: OrderType, price: float) -> float:
+        if order_type not in ROUNDINGS:
+            raise APIError(f"Invalid order type.({order_type})")
+        tick = self.get_tick_size(price)
+        units = (Decimal(repr(price)) / tick).to_integral_value(ROUNDINGS[order_type])
+        return float(units * tick)
+
+    def round_many(self, order_type: OrderType, prices: Iterable[float]) -> List[float]:
+        return [self.round(order_type, price) for price in prices]
+
+    def is_valid(self, price: float) -> bool:
+        return Decimal(repr(price)) % self.get_tick_size(price) == 0
+
+    def validate_many(self, prices: Iterable[float]) -> List[bool]:
+        return [self.is_valid(price) for price in prices]
+
+
+def round_to_tick_size(
+    order_type: OrderType, price: float, tick_sizes: TickSizes
+) -> float:
+    return TickTable(tick_sizes).round(order_type, price)
+
+
+PRICE_UNIT_DELTAS: Dict[PriceUnit, timedelta] = {
+    PriceUnit.MINUTE: timedelta(minutes=1),
+    PriceUnit.HOUR: timedelta(hours=1),
+    PriceUnit.DAY: timedelta(days=1),
+}
+
+
+def floor_datetime(date_time: datetime, price_unit: PriceUnit) -> datetime:
+    floored = date_time.replace(second=0, microsecond=0)
+    if price_unit in (PriceUnit.HOUR, PriceUnit.DAY):
+        floored = floored.replace(minute=0)
+    if price_unit == PriceUnit.DAY:
+        floored = floored.replace(hour=0)
+    return floored
+
+
+# Exchange times are kept as naive KST, the time zone of every supported venue.
+KST = timedelta(hours=9)
+
+
+def to_kst(date_time: datetime) -> datetime:
+    """Naive KST time of `date_time`. Naive times are taken as KST already."""
+    if date_time.tzinfo is None:
+        return date_time
+    return date_time.astimezone(timezone.utc).replace(tzinfo=None) + KST
+
+
+def now_kst() -> datetime:
+    return datetime.utcnow() + KST
+
+
+# Exchange APIs live in their own modules so that importing this module does
+# not import their HTTP, JWT and simulation dependencies.
+_MOVED_NAMES = dict(
+    DEFAULT_UPBIT_ACCESS_KEY="cats.domain.models.upbit_api",
+    DEFAULT_UPBIT_SECRET_KEY="cats.domain.models.upbit_api",
+    UPBIT_RATE_LIMITS="cats.domain.models.upbit_api",
+    UpbitExchangeAPI="cats.domain.models.upbit_api",
+    FakeExchangeAPI="cats.domain.models.fake_exchange_api",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MOVED_NAMES:
+        return getattr(importlib.import_module(_MOVED_NAMES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Type, Union, TYPE_CHECKING
+
+from cats.domain.constants import Exchange
+
+if TYPE_CHECKING:
+    from cats.domain.models.exchange_api import AbstractExchangeAPI
+
+ENTRY_POINT_GROUP = "cats.exchange_apis"
+
+# Exchange APIs are registered as "module:ClassName" paths and imported on
+# first use, so clients of unused exchanges are never imported.
+BUILTIN_EXCHANGE_APIS: Dict[str, str] = {
+    Exchange.UPBIT: "cats.domain.models.upbit_api:UpbitExchangeAPI",
+    Exchange.BITHUMB: "cats.domain.models.bithumb_api:BithumbExchangeAPI",
+    Exchange.COINONE: "cats.domain.models.coinone_api:CoinoneExchangeAPI",
+    Exchange.FAKE: "cats.domain.models.fake_exchange_api:FakeExchangeAPI",
+}
+
+ExchangeAPIPath = Union[str, "Type[AbstractExchangeAPI]"]
+
+
+class UnsupportedExchange(KeyError):
+    pass
+
+
+class ExchangeAPIRegistry:
+    def __init__(self, paths: Dict[str, ExchangeAPIPath]):
+        self._paths: Dict[str, ExchangeAPIPath] = {_key(k): v for k, v in paths.items()}
+        self._classes: Dict[str, Type[AbstractExchangeAPI]] = dict()
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def register(self, exchange: str, path: ExchangeAPIPath) -> None:
+        with self._lock:
+            self._paths[_key(exchange)] = path
+            self._classes.pop(_key(exchange), None)
+
+    @contextmanager
+    def override(self, paths: Dict[str, ExchangeAPIPath]) -> Iterator[None]:
+        """Serves `paths` instead of the registered APIs inside the block."""
+        with self._lock:
+            previous = dict(self._paths)
+            self._paths.update({_key(k): v for k, v in paths.items()})
+            self._classes.clear()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paths = previous
+                self._classes.clear()
+
+    def __getitem__(self, exchange: str) -> Type[AbstractExchangeAPI]:
+        exchange = _key(exchange)
+        cls = self._classes.get(exchange)
+        if cls is not None:
+            return cls
+        with self._lock:
+            if exchange not in self._paths and not self._entry_points_loaded:
+                self._load_entry_points()
+            if exchange not in self._paths:
+                raise UnsupportedExchange(exchange)
+            cls = _resolve(self._paths[exchange])
+            self._classes[exchange] = cls
+            return cls
+
+    def __contains__(self, exchange: object) -> bool:
+        try:
+            self[exchange]  # type: ignore
+        except UnsupportedExchange:
+            return False
+        return True
+
+    def _load_entry_points(self) -> None:
+        from importlib.metadata import entry_points
+
+        eps = entry_points()
+        group = (
+            eps.select(group=ENTRY_POINT_GROUP)  # type: ignore
+            if hasattr(eps, "select")
+            else eps.get(ENTRY_POINT_GROUP, [])
+        )
+        for ep in group:
+            self._paths.setdefault(ep.name, ep.value)
+        self._entry_points_loaded = True
+
+
+def _key(exchange: object) -> str:
+    return str(getattr(exchange, "value", exchange))
+
+
+def _resolve(path: ExchangeAPIPath) -> Type[AbstractExchangeAPI]:
+    if not isinstance(path, str):
+        return path
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+exchange_apis = ExchangeAPIRegistry(BUILTIN_EXCHANGE_APIS)
+
+
+def register_exchange_api(exchange: str, path: ExchangeAPIPath) -> None:
+    exchange_apis.register(exchange, path)
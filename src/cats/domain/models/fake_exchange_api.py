@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, List, Optional, Dict, Sequence, Tuple
+from uuid import uuid4
+
+from cats.domain.constants import Market, PriceUnit, OrderType, OrderStatus
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+    RetryableAPIError,
+    PRICE_UNIT_DELTAS,
+    floor_datetime,
+)
+from cats.domain.models.fill_model import FillModel
+from cats.domain.models.order import Order
+from cats.domain.values import Orderbook, Price
+
+# Relative spread between the best bid and ask of fake orderbooks.
+FAKE_SPREAD = 0.001
+
+
+class FakeExchangeAPI(AbstractExchangeAPI):
+    # Every unit walks on its own.
+    resamplable_candles = False
+
+    def __init__(
+        self,
+        market: Market,
+        seed: Optional[int] = None,
+        initial_price: float = 10000.0,
+        volatility: float = 0.01,
+        initial_balance: float = 0.0,
+        fill_delay: float = 0.0,
+        fill_ratio: float = 1.0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        history: Optional[Sequence[Price]] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        super().__init__(market)
+        self.fee_rate: float = 0.0005
+        self.initial_price = initial_price
+        self.volatility = volatility
+        self.fill_model = FillModel(fill_delay=fill_delay, fill_ratio=fill_ratio)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.clock = clock
+
+        seed = zlib.crc32(self.market.encode()) if seed is None else seed
+        self._random = random.Random(seed)
+        self._error_random = random.Random(seed + 1)
+        self._orders: Dict[str, Order] = dict()
+        self._balance = initial_balance
+
+        self._origin = self.clock()
+        self._walks: Dict[PriceUnit, Tuple[List[Price], List[Price]]] = dict()
+        self._history: Optional[List[Price]] = (
+            sorted(history, reverse=True) if history is not None else None
+        )
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        self._simulate_call()
+        return self._add_order(
+            order_type=OrderType.BUY,
+            price=price,
+            volume=(budget * (1 - self.fee_rate)) / price,
+        )
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        self._simulate_call()
+        return self._add_order(order_type=OrderType.SELL, price=price, volume=volume)
+
+    def cancel_order(self, order_id: str) -> str:
+        self._simulate_call()
+        order = self._orders.get(order_id)
+        if order is None:
+            raise APIError(f"Order not found.({order_id})")
+        if order.status == OrderStatus.WAIT:
+            order.status = OrderStatus.CANCEL
+        return order_id
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        self._simulate_call()
+        orders = [self._orders[i] for i in order_ids if i in self._orders]
+        now = self.clock()
+        for order in orders:
+            if order.status == OrderStatus.WAIT:
+                self._fill_order(order, now)
+        return orders
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        self._simulate_call()
+        to = to or self.clock()
+        if self._history is not None:
+            return [p for p in self._history if p.date_time <= to][:counts]
+
+        delta = PRICE_UNIT_DELTAS[price_unit]
+        origin = floor_datetime(self._origin, price_unit)
+        latest = floor_datetime(to, price_unit)
+        # offset > 0 means candles after the origin, offset <= 0 before it.
+        offset = (latest - origin) // delta
+        return [self._get_walk_price(price_unit, offset - i) for i in range(counts)]
+
+    def get_balance(self) -> float:
+        self._simulate_call()
+        return self._balance - self.get_locked_balance()
+
+    def get_locked_balance(self) -> float:
+        return sum(
+            order.ordered_volume - order.executed_volume
+            for order in self._orders.values()
+            if order.type == OrderType.SELL and order.status == OrderStatus.WAIT
+        )
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        # A book of unit sized levels around the latest minute candle.
+        price = self.get_prices(price_unit=PriceUnit.MINUTE, counts=1)[0]
+        half_spread = price.trade_price * FAKE_SPREAD / 2
+        step = price.trade_price * FAKE_SPREAD
+        return Orderbook(
+            date_time=self.clock(),
+            bids=tuple(
+                (price.trade_price - half_spread - step * i, 1.0) for i in range(depth)
+            ),
+            asks=tuple(
+                (price.trade_price + half_spread + step * i, 1.0) for i in range(depth)
+            ),
+        )
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return price
+
+    def _simulate_call(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._error_random.random() < self.error_rate:
+            raise RetryableAPIError("Injected fake exchange error.")
+
+    def _add_order(self, order_type: OrderType, price: float, volume: float) -> Order:
+        order = Order(
+            order_id=str(uuid4()),
+            type=order_type,
+            status=OrderStatus.WAIT,
+            price=price,
+            ordered_volume=volume,
+            executed_volume=0.0,
+            paid_fee=0.0,
+            ordered_time=self.clock(),
+        )
+        self._orders[order.order_id] = order
+        return order
+
+    def _fill_order(self, order: Order, now: datetime) -> None:
+        volume = self.fill_model.fill(order, now, self.fee_rate)
+        self._balance += volume if order.type == OrderType.BUY else -volume
+
+    def _get_walk_price(self, price_unit: PriceUnit, offset: int) -> Price:
+        if price_unit not in self._walks:
+            self._walks[price_unit] = (list(), list())
+            self._extend_walk(price_unit, self._walks[price_unit][0], -1, 256)
+        past, future = self._walks[price_unit]
+        # past[0] is the origin candle and past[i] is i units before it,
+        # future[j] is j + 1 units after it.
+        if offset <= 0:
+            walk, index, step = past, -offset, -1
+        else:
+            walk, index, step = future, offset - 1, 1
+        if index >= len(walk):
+            size = max(index + 1, 2 * len(walk))
+            self._extend_walk(price_unit, walk, step, size)
+        return walk[index]
+
+    def _extend_walk(
+        self, price_unit: PriceUnit, walk: List[Price], step: int, size: int
+    ) -> None:
+        past, future = self._walks[price_unit]
+        delta = PRICE_UNIT_DELTAS[price_unit] * step
+        if walk:
+            last = walk[-1]
+        elif past:
+            last = past[0]
+        else:
+            last = Price(
+                date_time=floor_datetime(self._origin, price_unit) - delta,
+                high_price=self.initial_price,
+                low_price=self.initial_price,
+                trade_price=self.initial_price,
+            )
+        gauss, volatility = self._random.gauss, self.volatility
+        date_time, close = last.date_time, last.trade_price
+        for _ in range(size - len(walk)):
+            date_time += delta
+            close = max(close * (1 + gauss(0.0, volatility)), 0.01)
+            walk.append(
+                Price(
+                    date_time=date_time,
+                    high_price=close * (1 + abs(gauss(0.0, volatility / 2))),
+                    low_price=close * (1 - abs(gauss(0.0, volatility / 2))),
+                    trade_price=close,
+                )
+            )
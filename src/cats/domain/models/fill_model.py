@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from cats.domain.constants import OrderStatus, OrderType
+from cats.domain.models.order import Order
+from cats.domain.values import Quote
+
+
+@dataclass
+class FillModel:
+    """
+    How simulated exchanges fill limit orders. An order waits `fill_delay`
+    seconds, then every check fills `fill_ratio` of its volume while the
+    market is at or better than its price.
+    """
+
+    fill_delay: float = 0.0
+    fill_ratio: float = 1.0
+
+    def fill(
+        self,
+        order: Order,
+        now: datetime,
+        fee_rate: float,
+        quote: Optional[Quote] = None,
+    ) -> float:
+        """Fills the order and returns the volume filled now."""
+        if order.status != OrderStatus.WAIT:
+            return 0.0
+        if (now - order.ordered_time).total_seconds() < self.fill_delay:
+            return 0.0
+        if quote is not None and not is_marketable(order, quote):
+            return 0.0
+        remains = order.ordered_volume - order.executed_volume
+        volume = min(remains, order.ordered_volume * self.fill_ratio)
+        order.executed_volume += volume
+        order.paid_fee += volume * order.price * fee_rate
+        if order.executed_volume >= order.ordered_volume * (1 - 1e-9):
+            order.executed_volume = order.ordered_volume
+            order.status = OrderStatus.DONE
+        return volume
+
+
+def is_marketable(order: Order, quote: Quote) -> bool:
+    if order.type == OrderType.BUY:
+        return quote.ask_price <= order.price
+    return quote.bid_price >= order.price
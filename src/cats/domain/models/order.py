@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 from cats.domain.constants import OrderType, OrderStatus
 
@@ -16,6 +17,7 @@ class Order:
     executed_volume: float
     paid_fee: float
     ordered_time: datetime
+    exchange: Optional[str] = None
 
     def __eq__(self, other: Order) -> bool:  # type: ignore
         if isinstance(other, Order):
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from cats.domain.constants import Market, OrderType, PriceUnit
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+)
+from cats.domain.models.order import Order
+from cats.domain.values import Orderbook, Price, Quote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUOTE_TTL = 1.0
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    decided_at: datetime
+    market: str
+    order_type: OrderType
+    venue: str
+    price: float
+    # Fee adjusted price of every venue with rate headroom.
+    candidates: Dict[str, float]
+    skipped: Tuple[str, ...]
+
+
+class OrderRouter(AbstractExchangeAPI):
+    """
+    Routes each order of a market to the venue with the best fee adjusted
+    quote among the venues with order rate headroom.
+    """
+
+    def __init__(
+        self,
+        market: Market,
+        venues: Dict[str, AbstractExchangeAPI],
+        quote_ttl: float = DEFAULT_QUOTE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+        max_decisions: int = 1000,
+    ):
+        if not venues:
+            raise ValueError("At least one venue is required.")
+        super().__init__(market)
+        self.venues = venues
+        self.primary = next(iter(venues))
+        self.quote_ttl = quote_ttl
+        self.clock = clock
+        self.decisions: Deque[RoutingDecision] = deque(maxlen=max_decisions)
+        self._quotes: Dict[str, Tuple[float, Quote]] = dict()
+        self._order_venues: Dict[str, str] = dict()
+        self._lock = threading.Lock()
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        venue = self._route(OrderType.BUY, price)
+        return self._remember(venue, self.venues[venue].buy_order(price, budget))
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        """Sells on the best venue holding the whole `volume`."""
+        balances = self._get_balances()
+        venue = self._route(
+            OrderType.SELL,
+            price,
+            [venue for venue, balance in balances.items() if balance < volume],
+        )
+        return self._remember(venue, self.venues[venue].sell_order(price, volume))
+
+    def sell_orders(self, price: float, volume: float) -> List[Order]:
+        """
+        Sells `volume` from the best venue on, each selling what it holds, as
+        the coins of a worker may be split across venues. A venue whose share
+        is below its minimum order is left out.
+
+        Once an order is placed the orders are returned even when a later venue
+        fails, or the worker would never learn of the placed ones.
+        """
+        balances = self._get_balances()
+        empty = [venue for venue, balance in balances.items() if balance <= 0]
+        orders: List[Order] = list()
+        error: Optional[Exception] = None
+        for venue in self._rank(OrderType.SELL, price, empty):
+            if volume <= 0:
+                break
+            api = self.venues[venue]
+            sold = min(balances[venue], volume)
+            if sold * price < api.min_order_amount:
+                continue
+            try:
+                order = api.sell_order(price, sold)
+            except Exception as e:
+                logger.warning(
+                    "sell failed market=%s venue=%s error=%r", self.market, venue, e
+                )
+                error = e
+                continue
+            orders.append(self._remember(venue, order))
+            volume -= sold
+        if not orders:
+            if error is not None:
+                raise error
+            raise APIError(f"Volume is below the minimum order.({volume})")
+        return orders
+
+    def cancel_order(self, order_id: str) -> str:
+        venue = self._order_venues.get(order_id)
+        if venue:
+            return self.venues[venue].cancel_order(order_id)
+        for api in self.venues.values():
+            try:
+                return api.cancel_order(order_id)
+            except APIError:
+                continue
+        raise APIError(f"Order not found in any venue.({order_id})")
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        by_venue: Dict[str, List[str]] = dict()
+        unknown = list()
+        for order_id in order_ids:
+            venue = self._order_venues.get(order_id)
+            if venue:
+                by_venue.setdefault(venue, list()).append(order_id)
+            else:
+                unknown.append(order_id)
+
+        orders = list()
+        for venue, ids in by_venue.items():
+            orders.extend(self._tag(venue, self.venues[venue].get_orders(ids)))
+        for venue, api in self.venues.items():
+            if not unknown:
+                break
+            try:
+                found = self._tag(venue, api.get_orders(unknown))
+            except APIError:
+                continue
+            orders.extend(found)
+            found_ids = {order.order_id for order in found}
+            unknown = [order_id for order_id in unknown if order_id not in found_ids]
+        return orders
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        return self.venues[self.primary].get_prices(price_unit, counts, to)
+
+    def get_balance(self) -> float:
+        return sum(self._get_balances().values())
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return self.venues[self.primary].make_valid_order_price(order_type, price)
+
+    def get_quote(self) -> Quote:
+        return self._get_quote(self.primary)
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self.venues[self.primary].get_orderbook(depth)
+
+    def add_orders(self, orders: Iterable[Order]) -> None:
+        """Routes the calls of orders placed before to the venue they are on."""
+        for order in orders:
+            if order.exchange in self.venues:
+                self._order_venues[order.order_id] = order.exchange
+
+    def _get_balances(self) -> Dict[str, float]:
+        return {venue: api.get_balance() for venue, api in self.venues.items()}
+
+    def _route(
+        self, order_type: OrderType, price: float, excluded: Iterable[str] = ()
+    ) -> str:
+        return self._rank(order_type, price, excluded)[0]
+
+    def _rank(
+        self, order_type: OrderType, price: float, excluded: Iterable[str] = ()
+    ) -> List[str]:
+        """Venues able to take the order, the best first."""
+        candidates: Dict[str, float] = dict()
+        skipped = list()
+        for venue, api in self.venues.items():
+            if (
+                venue in excluded
+                or _get_order_headroom(api) < 1
+                or _is_order_open(api, order_type)
+            ):
+                skipped.append(venue)
+                continue
+            try:
+                quote = self._get_quote(venue)
+            except APIError:
+                skipped.append(venue)
+                continue
+            # A limit order can not be better than its tick rounded price.
+            limit_price = api.make_valid_order_price(order_type, price)
+            if order_type == OrderType.BUY:
+                effective = min(quote.ask_price, limit_price) * (1 + api.fee_rate)
+            else:
+                effective = max(quote.bid_price, limit_price) * (1 - api.fee_rate)
+            candidates[venue] = effective
+
+        if not candidates:
+            raise APIError(f"No venue is available.({self.market})")
+        ranked = sorted(
+            candidates,
+            key=candidates.__getitem__,
+            reverse=order_type == OrderType.SELL,
+        )
+        venue = ranked[0]
+
+        decision = RoutingDecision(
+            decided_at=datetime.now(),
+            market=self.market,
+            order_type=order_type,
+            venue=venue,
+            price=price,
+            candidates=candidates,
+            skipped=tuple(skipped),
+        )
+        self.decisions.append(decision)
+        logger.info(
+            "route market=%s type=%s venue=%s price=%s candidates=%s skipped=%s",
+            decision.market,
+            decision.order_type.name,
+            decision.venue,
+            decision.price,
+            decision.candidates,
+            ",".join(decision.skipped),
+        )
+        return ranked
+
+    def _get_quote(self, venue: str) -> Quote:
+        now = self.clock()
+        with self._lock:
+            cached = self._quotes.get(venue)
+        if cached and now - cached[0] < self.quote_ttl:
+            return cached[1]
+        quote = self.venues[venue].get_quote()
+        with self._lock:
+            self._quotes[venue] = (now, quote)
+        return quote
+
+    def _remember(self, venue: str, order: Order) -> Order:
+        self._order_venues[order.order_id] = venue
+        order.exchange = venue
+        return order
+
+    def _tag(self, venue: str, orders: List[Order]) -> List[Order]:
+        for order in orders:
+            self._order_venues[order.order_id] = venue
+            order.exchange = venue
+        return orders
+
+
+def _get_order_headroom(api: AbstractExchangeAPI) -> float:
+    transport = getattr(api, "transport", None)
+    return transport.available("order") if transport else float("inf")
+
+
+def _is_order_open(api: AbstractExchangeAPI, order_type: OrderType) -> bool:
+    # Venues whose order endpoint circuit is open are shed.
+    is_order_open = getattr(api, "is_order_open", None)
+    return bool(is_order_open and is_order_open(order_type))
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cats.domain.constants import ORDERBOOK_TTL, OrderType
+from cats.domain.models.exchange_api import AbstractExchangeAPI, get_venue_key
+from cats.domain.values import Orderbook
+
+
+class OrderbookCache:
+    """
+    Latest orderbook of every venue and market. A book is polled again once it
+    is older than `ttl` seconds, so workers of a market share one snapshot.
+    """
+
+    def __init__(
+        self, ttl: float = ORDERBOOK_TTL, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self._books: Dict[Tuple[Any, ...], Tuple[float, Orderbook]] = dict()
+        self._lock = threading.Lock()
+
+    def get(self, api: AbstractExchangeAPI) -> Orderbook:
+        key = get_venue_key(api) + (api.market,)
+        now = self.clock()
+        with self._lock:
+            cached = self._books.get(key)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+        book = api.get_orderbook()
+        with self._lock:
+            self._books[key] = (now, book)
+        return book
+
+    def get_limit_price(
+        self,
+        api: AbstractExchangeAPI,
+        order_type: OrderType,
+        limit: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        The best price an order can be filled at now, not worse than `limit`.
+        A buy is priced at the best ask and a sell at the best bid.
+        """
+        book = self.get(api)
+        if order_type == OrderType.BUY:
+            best = book.best_ask
+            return limit if best is None else min(best, limit or best)
+        best = book.best_bid
+        return limit if best is None else max(best, limit or best)
+
+
+orderbooks = OrderbookCache()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from cats.domain.constants import OrderStatus, OrderType
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    ExchangeAPIWrapper,
+)
+from cats.domain.models.fill_model import FillModel
+from cats.domain.models.order import Order
+from cats.domain.models.orderbook import OrderbookCache, orderbooks
+
+PAPER_ORDER_PREFIX = "paper-"
+
+
+class PaperExchangeAPI(ExchangeAPIWrapper):
+    """
+    Trades on paper against live market data. Prices and orderbooks come from
+    the wrapped API, orders and the coin balance are kept here and filled with
+    the same fill model as the fake exchange. No order endpoint is ever called.
+
+    Accounts outlive the sessions of their workers, so the orders kept here
+    are never the ones handed out, which the worker attaches to its session.
+
+    Fills are checked against the shared orderbook cache, so paper workers of
+    a market poll the exchange once per cache ttl however many there are.
+    """
+
+    def __init__(
+        self,
+        api: AbstractExchangeAPI,
+        initial_balance: float = 0.0,
+        fill_model: Optional[FillModel] = None,
+        books: OrderbookCache = orderbooks,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        super().__init__(api)
+        self.fill_model = fill_model or FillModel()
+        self.books = books
+        self.clock = clock
+        self._orders: Dict[str, Order] = dict()
+        self._balance = initial_balance
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        return self._add_order(
+            order_type=OrderType.BUY,
+            price=price,
+            volume=(budget * (1 - self.fee_rate)) / price,
+        )
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        if volume > self.get_balance() * (1 + 1e-9):
+            raise APIError(f"Insufficient paper balance.({volume})")
+        return self._add_order(order_type=OrderType.SELL, price=price, volume=volume)
+
+    def cancel_order(self, order_id: str) -> str:
+        order = self._orders.get(order_id)
+        if order is None:
+            raise APIError(f"Order not found.({order_id})")
+        if order.status == OrderStatus.WAIT:
+            order.status = OrderStatus.CANCEL
+        return order_id
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        orders = [self._orders[i] for i in order_ids if i in self._orders]
+        waiting = [order for order in orders if order.status == OrderStatus.WAIT]
+        if waiting:
+            quote = self.books.get(self.api).to_quote()
+            now = self.clock()
+            for order in waiting:
+                volume = self.fill_model.fill(order, now, self.fee_rate, quote)
+                self._balance += volume if order.type == OrderType.BUY else -volume
+        return [replace(order) for order in orders]
+
+    def get_balance(self) -> float:
+        locked = sum(
+            order.ordered_volume - order.executed_volume
+            for order in self._orders.values()
+            if order.type == OrderType.SELL and order.status == OrderStatus.WAIT
+        )
+        return self._balance - locked
+
+    def restore(self, orders: Iterable[Order]) -> None:
+        """
+        Takes over the paper orders stored by an earlier process. The coin
+        balance is rebuilt from their fills.
+        """
+        for order in orders:
+            if not order.order_id.startswith(PAPER_ORDER_PREFIX):
+                continue
+            if order.order_id in self._orders:
+                continue
+            self._orders[order.order_id] = replace(order)
+            volume = order.executed_volume
+            self._balance += volume if order.type == OrderType.BUY else -volume
+
+    def _add_order(self, order_type: OrderType, price: float, volume: float) -> Order:
+        order = Order(
+            order_id=f"{PAPER_ORDER_PREFIX}{uuid4()}",
+            type=order_type,
+            status=OrderStatus.WAIT,
+            price=price,
+            ordered_volume=volume,
+            executed_volume=0.0,
+            paid_fee=0.0,
+            ordered_time=self.clock(),
+        )
+        self._orders[order.order_id] = order
+        return replace(order)
+
+
+# Paper exchanges of paper workers, by worker id and exchange.
+paper_accounts: Dict[Tuple[Any, ...], PaperExchangeAPI] = dict()
+
+
+def close_paper_accounts(worker_id: str) -> None:
+    """Drops the paper accounts of a finished worker."""
+    for key in list(paper_accounts):
+        if key[0] == worker_id:
+            paper_accounts.pop(key, None)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, Optional, TYPE_CHECKING
+
+from cats import config
+
+if TYPE_CHECKING:
+    from cats.domain.models.worker import Worker
+
+
+class PortfolioAllocator:
+    """
+    Caps the KRW all workers have at stake at once. A worker allocates the
+    budget of every buy order first, and is refused once the cap is reached.
+    The exposure of a worker is updated from its orders after every tick, so
+    finished and cancelled orders free their budget again.
+
+    The cap holds per process. Runners seed it from the stored workers when
+    they start, but the later ticks of other processes are not seen here.
+    """
+
+    def __init__(self, cap: Optional[int] = None):
+        self.cap = cap
+        self._exposures: Dict[str, float] = dict()
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def allocate(self, worker: Worker, amount: int) -> bool:
+        with self._lock:
+            exposure = worker.get_exposure()
+            total = self._total - self._exposures.get(worker.worker_id, 0.0)
+            if self.cap is not None and total + exposure + amount > self.cap:
+                self._set(worker.worker_id, exposure)
+                return False
+            self._set(worker.worker_id, exposure + amount)
+            return True
+
+    def can_allocate(self, worker: Worker, amount: int) -> bool:
+        if self.cap is None:
+            return True
+        with self._lock:
+            total = self._total - self._exposures.get(worker.worker_id, 0.0)
+            return total + worker.get_exposure() + amount <= self.cap
+
+    def seed(self, workers: Iterable[Worker]) -> None:
+        """Learns the exposure of workers before they tick, as after a restart."""
+        with self._lock:
+            for worker in workers:
+                self._set(worker.worker_id, worker.get_exposure())
+
+    def update(self, worker: Worker) -> None:
+        with self._lock:
+            self._set(worker.worker_id, worker.get_exposure())
+
+    def _set(self, worker_id: str, exposure: float) -> None:
+        self._total += exposure - self._exposures.get(worker_id, 0.0)
+        if exposure:
+            self._exposures[worker_id] = exposure
+        else:
+            self._exposures.pop(worker_id, None)
+
+
+portfolio = PortfolioAllocator(cap=config.get_budget_cap())
@@ -0,0 +1,310 @@
+"""
+Recording and replay of exchange traffic. A runner started with
+RECORD_EXCHANGE_PATH writes every exchange call of its workers, with its
+arguments, response and duration, to gzipped JSON lines. `replaying` serves a
+recording back in place of the exchanges, so the same traffic can be run
+through the workers of another code version offline.
+"""
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from cats import config
+from cats.domain.constants import OrderStatus, OrderType, PriceUnit
+from cats.domain.models.exchange_api import (
+    DEFAULT_ORDERBOOK_DEPTH,
+    AbstractExchangeAPI,
+    APIError,
+    ExchangeAPIWrapper,
+    RetryableAPIError,
+)
+from cats.domain.models.exchange_registry import exchange_apis
+from cats.domain.models.order import Order
+from cats.domain.values import Orderbook, Price, PriceColumns, Quote
+
+
+class ReplayExhausted(APIError):
+    """The recording has no more responses for a call."""
+
+
+class Recorder:
+    """Appends calls to a gzip file, shared by the APIs of all workers."""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.started_at = clock()
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingExchangeAPI(ExchangeAPIWrapper):
+    def __init__(self, api: AbstractExchangeAPI, recorder: Recorder, exchange: str):
+        super().__init__(api)
+        self.recorder = recorder
+        self.exchange = str(getattr(exchange, "value", exchange))
+        recorder.write(
+            dict(
+                api=self.exchange,
+                market=self.market,
+                fee_rate=self.fee_rate,
+                min_order_amount=self.min_order_amount,
+                max_candles=self.max_candles,
+                resamplable_candles=api.resamplable_candles,
+            )
+        )
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        return self._record("buy_order", price, budget)
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        return self._record("sell_order", price, volume)
+
+    def cancel_order(self, order_id: str) -> str:
+        return self._record("cancel_order", order_id)
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        return self._record("get_orders", order_ids)
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        return self._record("get_prices", price_unit, counts, to)
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        return self._record("get_price_columns", price_unit, counts, to)
+
+    def get_balance(self) -> float:
+        return self._record("get_balance")
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return self._record("make_valid_order_price", order_type, price)
+
+    def get_quote(self) -> Quote:
+        return self._record("get_quote")
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self._record("get_orderbook", depth)
+
+    def _record(self, method: str, *args: Any) -> Any:
+        entry: Dict[str, Any] = dict(
+            exchange=self.exchange,
+            market=self.market,
+            method=method,
+            args=encode(list(args)),
+            at=self.recorder.clock() - self.recorder.started_at,
+        )
+        started_at = self.recorder.clock()
+        try:
+            result = getattr(self.api, method)(*args)
+        except APIError as e:
+            entry.update(
+                duration=self.recorder.clock() - started_at,
+                error=str(e),
+                retryable=isinstance(e, RetryableAPIError),
+            )
+            self.recorder.write(entry)
+            raise
+        entry.update(duration=self.recorder.clock() - started_at, result=encode(result))
+        self.recorder.write(entry)
+        return result
+
+
+@dataclass
+class Recording:
+    # Fee rate and candle limit of every recorded (exchange, market).
+    apis: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    calls: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = field(
+        default_factory=lambda: defaultdict(deque)
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls, path: str) -> Recording:
+        recording = cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "api" in entry:
+                    recording.apis[(entry["api"], entry["market"])] = entry
+                else:
+                    key = (entry["exchange"], entry["market"], entry["method"])
+                    recording.calls[key].append(entry)
+        return recording
+
+    def pop(self, exchange: str, market: str, method: str) -> Dict[str, Any]:
+        with self.lock:
+            calls = self.calls.get((exchange, market, method))
+            if not calls:
+                raise ReplayExhausted(f"No recorded {method} of {exchange} {market}")
+            return calls.popleft()
+
+    def __len__(self) -> int:
+        return sum(len(calls) for calls in self.calls.values())
+
+
+class ReplayExchangeAPI(AbstractExchangeAPI):
+    """
+    Serves recorded responses in their recorded order, per market and method.
+    With `speed` every call takes its recorded duration divided by `speed`,
+    without it calls return at once.
+    """
+
+    def __init__(
+        self,
+        market: str,
+        recording: Recording,
+        exchange: str,
+        speed: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        super().__init__(market)  # type: ignore
+        self.recording = recording
+        self.exchange = exchange
+        self.speed = speed
+        self.sleep = sleep
+        api = recording.apis.get((exchange, self.market), {})
+        self.fee_rate = api.get("fee_rate", self.fee_rate)
+        self.min_order_amount = api.get("min_order_amount", self.min_order_amount)
+        self.max_candles = api.get("max_candles", self.max_candles)
+        self.resamplable_candles = api.get(
+            "resamplable_candles", self.resamplable_candles
+        )
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        return self._replay("buy_order")
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        return self._replay("sell_order")
+
+    def cancel_order(self, order_id: str) -> str:
+        return self._replay("cancel_order")
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        return self._replay("get_orders")
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        return self._replay("get_prices")
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        return PriceColumns.from_prices(self._replay("get_price_columns"))
+
+    def get_balance(self) -> float:
+        return self._replay("get_balance")
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return self._replay("make_valid_order_price")
+
+    def get_quote(self) -> Quote:
+        return self._replay("get_quote")
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self._replay("get_orderbook")
+
+    def _replay(self, method: str) -> Any:
+        entry = self.recording.pop(self.exchange, self.market, method)
+        if self.speed:
+            self.sleep(entry["duration"] / self.speed)
+        if "error" in entry:
+            error = RetryableAPIError if entry["retryable"] else APIError
+            raise error(entry["error"])
+        return decode(entry["result"])
+
+
+@contextmanager
+def replaying(recording: Recording, speed: Optional[float] = None) -> Iterator[None]:
+    """Workers talk to the recording instead of the recorded exchanges."""
+    apis = {
+        exchange: partial(
+            ReplayExchangeAPI, recording=recording, exchange=exchange, speed=speed
+        )
+        for exchange, _ in recording.apis
+    }
+    with exchange_apis.override(apis):  # type: ignore
+        yield
+
+
+def encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, PriceColumns):
+        value = value.to_prices()
+    if is_dataclass(value):
+        data = {f.name: encode(getattr(value, f.name)) for f in fields(value)}
+        return {"__type__": type(value).__name__, **data}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    data = {key: decode(item) for key, item in value.items() if key != "__type__"}
+    return _DECODERS[value["__type__"]](data)
+
+
+_DECODERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "Order": lambda data: Order(
+        **{
+            **data,
+            "type": OrderType(data["type"]),
+            "status": OrderStatus(data["status"]),
+        }
+    ),
+    "Price": lambda data: Price(**data),
+    "Quote": lambda data: Quote(**data),
+    "Orderbook": lambda data: Orderbook(
+        date_time=data["date_time"],
+        bids=tuple(tuple(level) for level in data["bids"]),
+        asks=tuple(tuple(level) for level in data["asks"]),
+    ),
+}
+
+
+def _get_recorder() -> Optional[Recorder]:
+    path = config.get_recording_path()
+    if not path:
+        return None
+    recorder = Recorder(path)
+    atexit.register(recorder.close)
+    return recorder
+
+
+recorder = _get_recorder()
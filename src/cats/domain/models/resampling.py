@@ -0,0 +1,159 @@
+"""
+Candles of every price unit built from one minute stream. The candles a worker
+asks for are fetched from the exchange once, and from then on only the new
+minute candles of the market are fetched and merged into the candles of every
+unit, including the still open ones.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cats.domain.constants import CANDLE_TTL, INCREMENTAL_PRICE_COUNTS, PriceUnit
+from cats.domain.models.exchange_api import (
+    PRICE_UNIT_DELTAS,
+    AbstractExchangeAPI,
+    ExchangeAPIWrapper,
+    floor_datetime,
+    get_venue_key,
+)
+from cats.domain.models.single_flight import copy_result
+from cats.domain.values import Price, PriceColumns
+
+
+def merge_minute(candles: List[Price], minute: Price, price_unit: PriceUnit) -> None:
+    """
+    Merges a minute candle into `candles` of `price_unit`, latest first. Minutes
+    of closed candles are already in them and are ignored.
+    """
+    delta = PRICE_UNIT_DELTAS[price_unit]
+    latest = candles[0] if candles else None
+    if latest is None:
+        start = floor_datetime(minute.date_time, price_unit)
+    elif minute.date_time >= latest.date_time + delta:
+        # Candles start where the exchange started them, so units longer than
+        # an hour keep the day boundary of the exchange.
+        elapsed = minute.date_time - latest.date_time
+        start = latest.date_time + elapsed // delta * delta
+    elif minute.date_time >= latest.date_time:
+        candles[0] = Price(
+            date_time=latest.date_time,
+            high_price=max(latest.high_price, minute.high_price),
+            low_price=min(latest.low_price, minute.low_price),
+            trade_price=minute.trade_price,
+        )
+        return
+    else:
+        return
+    candles.insert(
+        0,
+        Price(
+            date_time=start,
+            high_price=minute.high_price,
+            low_price=minute.low_price,
+            trade_price=minute.trade_price,
+        ),
+    )
+
+
+@dataclass
+class CandleStore:
+    """Latest candles of one venue and market, per price unit."""
+
+    candles: Dict[PriceUnit, List[Price]] = field(default_factory=dict)
+    # Candles kept per unit, the most any worker asked for.
+    sizes: Dict[PriceUnit, int] = field(default_factory=dict)
+    # Latest minute merged into the candles.
+    cursor: Optional[datetime] = None
+    refreshed_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_minutes(self, minutes: List[Price]) -> None:
+        for minute in sorted(minutes, key=lambda price: price.date_time):
+            for price_unit, candles in self.candles.items():
+                merge_minute(candles, minute, price_unit)
+                del candles[self.sizes[price_unit]:]
+            if self.cursor is None or minute.date_time > self.cursor:
+                self.cursor = minute.date_time
+
+
+class CandleCache:
+    """
+    Candles of every venue and market. New minutes are fetched once they are
+    older than `ttl` seconds, so workers of a market share one minute fetch
+    whatever units they trade on.
+    """
+
+    def __init__(
+        self, ttl: float = CANDLE_TTL, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self._stores: Dict[Tuple[Any, ...], CandleStore] = dict()
+        self._lock = threading.Lock()
+
+    def get_prices(
+        self, api: AbstractExchangeAPI, price_unit: PriceUnit, counts: int
+    ) -> List[Price]:
+        key = get_venue_key(api) + (api.market,)
+        with self._lock:
+            store = self._stores.setdefault(key, CandleStore())
+        now = self.clock()
+        with store.lock:
+            if counts > store.sizes.get(price_unit, 0):
+                # Candles older than the minute stream come from the exchange.
+                store.candles[price_unit] = api.get_prices(price_unit, counts)
+                store.sizes[price_unit] = counts
+                if store.cursor is None:
+                    self._refresh(api, store, now)
+            elif now - store.refreshed_at >= self.ttl:
+                self._refresh(api, store, now)
+            # Every caller gets its own entities, as they are attached to the
+            # session of the caller.
+            return copy_result(store.candles[price_unit][:counts])
+
+    def _refresh(self, api: AbstractExchangeAPI, store: CandleStore, now: float):
+        if store.cursor is None:
+            minutes = api.get_prices(PriceUnit.MINUTE, INCREMENTAL_PRICE_COUNTS)
+        else:
+            # The latest merged minute is fetched again as it may have been
+            # still open.
+            elapsed_minutes = int((now - store.refreshed_at) // 60)
+            minutes = api.get_prices_since(
+                PriceUnit.MINUTE,
+                since=store.cursor - PRICE_UNIT_DELTAS[PriceUnit.MINUTE],
+                page_size=elapsed_minutes + INCREMENTAL_PRICE_COUNTS,
+            )
+        store.add_minutes(minutes)
+        store.refreshed_at = now
+
+
+candles = CandleCache()
+
+
+class ResamplingExchangeAPI(ExchangeAPIWrapper):
+    """
+    Serves the latest candles from `cache`. Pages before a given time are
+    history, and are fetched from the exchange.
+    """
+
+    def __init__(self, api: AbstractExchangeAPI, cache: CandleCache = candles):
+        super().__init__(api)
+        self.cache = cache
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        if to is not None:
+            return self.api.get_prices(price_unit, counts, to)
+        return self.cache.get_prices(self.api, price_unit, counts)
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        if to is not None:
+            return self.api.get_price_columns(price_unit, counts, to)
+        return PriceColumns.from_prices(self.get_prices(price_unit, counts))
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from random import Random
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from cats.domain.constants import OrderType, PriceUnit
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+    ExchangeAPIWrapper,
+    RetryableAPIError,
+)
+from cats.domain.models.order import Order
+from cats.domain.values import Orderbook, Price, PriceColumns, Quote
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error names of exchange responses which are worth retrying.
+RETRYABLE_ERROR_NAMES = ("too_many_requests", "server_error", "timeout")
+# Calls which are safe to repeat when their response is lost.
+IDEMPOTENT_CALLS = (
+    "get_orders",
+    "get_prices",
+    "get_balance",
+    "get_quote",
+    "get_orderbook",
+)
+
+
+class CircuitOpenError(APIError):
+    """The endpoint is failing, so the call was not sent."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (RetryableAPIError, OSError)):
+        return True
+    if isinstance(error, APIError):
+        message = str(error)
+        return any(name in message for name in RETRYABLE_ERROR_NAMES)
+    return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and lets a single
+    trial call through once `reset_timeout` seconds have passed.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._is_open()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._is_open():
+                return False
+            if self.state == self.OPEN:
+                # The reset timeout passed. Only this call tries the endpoint.
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        "circuit open name=%s failures=%s", self.name, self.failures
+                    )
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+    def _is_open(self) -> bool:
+        return (
+            self.state == self.OPEN
+            and self.clock() - self._opened_at < self.reset_timeout
+        )
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 1.0
+    random: Random = field(default_factory=Random)
+    sleep: Callable[[float], None] = time.sleep
+
+    def get_delay(self, attempt: int) -> float:
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = dict()
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(venue: str, endpoint: str) -> CircuitBreaker:
+    # Workers of the same venue share breakers, so a failing endpoint is shed
+    # by every worker at once.
+    with _breakers_lock:
+        key = (venue, endpoint)
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(name=f"{venue}:{endpoint}")
+        return _breakers[key]
+
+
+class ResilientExchangeAPI(ExchangeAPIWrapper):
+    """
+    Guards every endpoint of an exchange API with a circuit breaker and
+    retries the idempotent calls on retryable errors.
+    """
+
+    def __init__(
+        self,
+        api: AbstractExchangeAPI,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Callable[[str, str], CircuitBreaker] = get_circuit_breaker,
+    ):
+        super().__init__(api)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers
+        self.venue = f"{type(api).__name__}:{getattr(api, 'host', '')}"
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        return self._call("buy_order", self.api.buy_order, price, budget)
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        return self._call("sell_order", self.api.sell_order, price, volume)
+
+    def cancel_order(self, order_id: str) -> str:
+        return self._call("cancel_order", self.api.cancel_order, order_id)
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        return self._call("get_orders", self.api.get_orders, order_ids)
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        return self._call("get_prices", self.api.get_prices, price_unit, counts, to)
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        # Same endpoint as get_prices, so the same circuit.
+        return self._call(
+            "get_prices", self.api.get_price_columns, price_unit, counts, to
+        )
+
+    def get_balance(self) -> float:
+        return self._call("get_balance", self.api.get_balance)
+
+    def get_quote(self) -> Quote:
+        return self._call("get_quote", self.api.get_quote)
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self._call("get_orderbook", self.api.get_orderbook, depth)
+
+    def is_open(self, endpoint: str) -> bool:
+        return self.breakers(self.venue, endpoint).is_open()
+
+    def is_order_open(self, order_type: OrderType) -> bool:
+        endpoint = "buy_order" if order_type == OrderType.BUY else "sell_order"
+        return self.is_open(endpoint)
+
+    def _call(self, endpoint: str, func: Callable[..., T], *args: Any) -> T:
+        breaker = self.breakers(self.venue, endpoint)
+        attempts = self.retry_policy.max_attempts if endpoint in IDEMPOTENT_CALLS else 1
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit is open.({breaker.name})")
+            try:
+                result = func(*args)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The endpoint answered, so it is healthy.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    if isinstance(e, APIError):
+                        raise
+                    raise RetryableAPIError(str(e)) from e
+                self.retry_policy.sleep(self.retry_policy.get_delay(attempt))
+            else:
+                breaker.record_success()
+                return result
+        raise RetryableAPIError(f"No attempts left.({breaker.name})")
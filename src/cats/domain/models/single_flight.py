@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, is_dataclass, replace
+from datetime import datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from cats.domain.constants import PriceUnit
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    DEFAULT_ORDERBOOK_DEPTH,
+    ExchangeAPIWrapper,
+    get_venue_key,
+)
+from cats.domain.models.order import Order
+from cats.domain.values import Orderbook, Price, Quote
+
+T = TypeVar("T")
+
+# Keys are (method, ...), so metrics are kept per method.
+Key = Tuple[Hashable, ...]
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    executed: int = 0
+    coalesced: int = 0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Metrics:
+    def __init__(self):
+        self._stats: Dict[Hashable, SingleFlightStats] = dict()
+
+    def stats(self) -> Dict[Hashable, SingleFlightStats]:
+        return {method: replace(stats) for method, stats in self._stats.items()}
+
+    def _count(self, key: Key, coalesced: bool) -> None:
+        stats = self._stats.setdefault(key[0], SingleFlightStats())
+        stats.calls += 1
+        if coalesced:
+            stats.coalesced += 1
+        else:
+            stats.executed += 1
+
+
+class SingleFlight(_Metrics):
+    """Concurrent calls of the same key share one execution and its result."""
+
+    def __init__(self):
+        super().__init__()
+        self._calls: Dict[Key, _Call] = dict()
+        self._lock = threading.Lock()
+
+    def do(self, key: Key, func: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            self._count(key, coalesced=not leader)
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class AsyncSingleFlight(_Metrics):
+    """SingleFlight of coroutines running on one event loop."""
+
+    def __init__(self):
+        super().__init__()
+        self._tasks: Dict[Key, Any] = dict()
+
+    async def do(self, key: Key, func: Callable[[], Awaitable[T]]) -> T:
+        # Imported here as only async adapters need asyncio.
+        import asyncio
+
+        task = self._tasks.get(key)
+        self._count(key, coalesced=task is not None)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # A cancelled caller must not cancel the call of the others.
+        return await asyncio.shield(task)
+
+
+single_flight = SingleFlight()
+
+
+class CoalescingExchangeAPI(ExchangeAPIWrapper):
+    """
+    Coalesces concurrent identical reads of the same venue, account and
+    market. Orders are never coalesced.
+    """
+
+    def __init__(
+        self, api: AbstractExchangeAPI, flight: SingleFlight = single_flight
+    ):
+        super().__init__(api)
+        self.flight = flight
+        self.venue = get_venue_key(api)
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        return self._do(
+            ("get_orders", tuple(order_ids)), lambda: self.api.get_orders(order_ids)
+        )
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        return self._do(
+            ("get_prices", price_unit, counts, to),
+            lambda: self.api.get_prices(price_unit, counts, to),
+        )
+
+    def get_balance(self) -> float:
+        return self._do(("get_balance",), self.api.get_balance)
+
+    def get_quote(self) -> Quote:
+        return self._do(("get_quote",), self.api.get_quote)
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        return self._do(("get_orderbook", depth), lambda: self.api.get_orderbook(depth))
+
+    def _do(self, call: Key, func: Callable[[], T]) -> T:
+        key = (call[0], self.venue, self.market) + call[1:]
+        return copy_result(self.flight.do(key, func))
+
+
+def copy_result(result: Any) -> Any:
+    # Every caller gets its own entities, as they are attached to the session
+    # of the caller.
+    if isinstance(result, list):
+        return [copy_result(item) for item in result]
+    if is_dataclass(result) and not isinstance(result, type):
+        return replace(result)
+    return result
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from cats.domain.constants import OrderStatus, WorkerStatus
+
+if TYPE_CHECKING:
+    from cats.domain.models.worker import Worker
+
+DEFAULT_STRATEGY = "MEAN_REVERSION"
+
+
+@dataclass(frozen=True)
+class Signals:
+    """Decisions of one worker for a tick."""
+
+    buy: bool = False
+    cancel_buy: bool = False
+    cancel_sell: bool = False
+    sell_or_buy: bool = False
+
+
+@dataclass
+class Decisions:
+    """Decision vectors of a batch, one item per worker."""
+
+    buy: List[bool] = field(default_factory=list)
+    cancel_buy: List[bool] = field(default_factory=list)
+    cancel_sell: List[bool] = field(default_factory=list)
+    sell_or_buy: List[bool] = field(default_factory=list)
+
+    def __getitem__(self, index: int) -> Signals:
+        return Signals(
+            buy=self.buy[index],
+            cancel_buy=self.cancel_buy[index],
+            cancel_sell=self.cancel_sell[index],
+            sell_or_buy=self.sell_or_buy[index],
+        )
+
+
+@dataclass
+class WorkerStates:
+    """Market data and positions of many workers as columns, one row each."""
+
+    markets: List[str] = field(default_factory=list)
+    statuses: List[int] = field(default_factory=list)
+    trade_prices: List[Optional[float]] = field(default_factory=list)
+    price_averages: List[Optional[float]] = field(default_factory=list)
+    balances: List[float] = field(default_factory=list)
+    unit_budgets: List[int] = field(default_factory=list)
+    # Price and state of the latest order, None without orders.
+    latest_order_prices: List[Optional[float]] = field(default_factory=list)
+    latest_order_waiting: List[bool] = field(default_factory=list)
+    buy_price_averages: List[Optional[float]] = field(default_factory=list)
+    next_additional_buy_prices: List[Optional[float]] = field(default_factory=list)
+
+    @classmethod
+    def from_workers(cls, workers: Sequence[Worker]) -> WorkerStates:
+        states = cls()
+        for worker in workers:
+            latest_order = worker._get_latest_order()
+            states.markets.append(str(getattr(worker.market, "value", worker.market)))
+            states.statuses.append(int(worker.status))
+            states.trade_prices.append(worker._get_trade_price())
+            states.price_averages.append(worker._calculate_price_average())
+            states.balances.append(worker.balance or 0.0)
+            states.unit_budgets.append(worker._get_available_budget())
+            states.latest_order_prices.append(
+                latest_order.price if latest_order else None
+            )
+            states.latest_order_waiting.append(
+                latest_order is not None and latest_order.status == OrderStatus.WAIT
+            )
+            states.buy_price_averages.append(worker._calculate_buy_price_average())
+            states.next_additional_buy_prices.append(
+                worker._get_next_additional_buy_price()
+            )
+        return states
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+
+class Strategy(ABC):
+    @abstractmethod
+    def evaluate(self, states: WorkerStates) -> Decisions:
+        raise NotImplementedError
+
+
+class MeanReversionStrategy(Strategy):
+    """
+    Buys below the average candle price, sells when the trade price recovers
+    to the average buy price and buys more when it drops further.
+    """
+
+    def evaluate(self, states: WorkerStates) -> Decisions:
+        trades = states.trade_prices
+        buy = [
+            bool(average and trade and trade < average)
+            for trade, average in zip(trades, states.price_averages)
+        ]
+        cancel_buy = [
+            bool(order_price is not None and trade)
+            and status == WorkerStatus.BUYING
+            and waiting
+            and (
+                (balance > 0 and bool(buy_average) and trade >= buy_average)
+                or (balance <= 0 and trade > order_price)
+            )
+            for status, trade, balance, order_price, waiting, buy_average in zip(
+                states.statuses,
+                trades,
+                states.balances,
+                states.latest_order_prices,
+                states.latest_order_waiting,
+                states.buy_price_averages,
+            )
+        ]
+        cancel_sell = [
+            bool(trade and next_price)
+            and status == WorkerStatus.SELLING
+            and trade <= next_price
+            and unit_budget > 0
+            for status, trade, next_price, unit_budget in zip(
+                states.statuses,
+                trades,
+                states.next_additional_buy_prices,
+                states.unit_budgets,
+            )
+        ]
+        sell_or_buy = [
+            order_price is not None and balance > 0
+            for order_price, balance in zip(
+                states.latest_order_prices, states.balances
+            )
+        ]
+        return Decisions(
+            buy=buy,
+            cancel_buy=cancel_buy,
+            cancel_sell=cancel_sell,
+            sell_or_buy=sell_or_buy,
+        )
+
+
+strategies: Dict[str, Strategy] = {DEFAULT_STRATEGY: MeanReversionStrategy()}
+
+
+def register_strategy(name: str, strategy: Strategy) -> None:
+    strategies[name] = strategy
+
+
+def get_strategy(name: Optional[str]) -> Strategy:
+    return strategies[name or DEFAULT_STRATEGY]
+
+
+def evaluate_workers(workers: Sequence[Worker]) -> List[Signals]:
+    """Signals of every worker, from one batch per strategy."""
+    batches: Dict[str, List[int]] = defaultdict(list)
+    for index, worker in enumerate(workers):
+        batches[worker.strategy or DEFAULT_STRATEGY].append(index)
+    signals: List[Signals] = [Signals()] * len(workers)
+    for name, indexes in batches.items():
+        decisions = get_strategy(name).evaluate(
+            WorkerStates.from_workers([workers[i] for i in indexes])
+        )
+        for row, index in enumerate(indexes):
+            signals[index] = decisions[row]
+    return signals
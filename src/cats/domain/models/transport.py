@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+
+from cats.domain.models.exchange_api import RetryableAPIError
+from cats.domain.models.parsing import loads
+from cats.domain.models.rate_limit import RateLimiter
+
+DEFAULT_POOL_MAXSIZE = 20
+DEFAULT_TIMEOUT = 10.0
+
+
+class TransportError(RetryableAPIError):
+    pass
+
+
+class HttpTransport:
+    """Connection pooled and client side rate limited HTTP transport of a host."""
+
+    def __init__(
+        self,
+        host: str,
+        rate_limits: Optional[Dict[str, float]] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.host = host
+        self.timeout = timeout
+        self.limiters: Dict[str, RateLimiter] = {
+            group: RateLimiter(rate=rate) for group, rate in (rate_limits or {}).items()
+        }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def available(self, group: str = "default") -> float:
+        limiter = self.limiters.get(group)
+        return limiter.available() if limiter else float("inf")
+
+    def request(self, method: str, path: str, group: str = "default", **kwargs) -> Any:
+        limiter = self.limiters.get(group)
+        if limiter and not limiter.acquire(timeout=self.timeout):
+            raise TransportError(f"Rate limit wait timed out.({group})")
+        try:
+            res = self.session.request(
+                method, f"{self.host}{path}", timeout=self.timeout, **kwargs
+            )
+            return loads(res.content)
+        except requests.RequestException as e:
+            raise TransportError(f"{method} {path} failed.({e})") from e
+        except ValueError as e:
+            raise TransportError(
+                f"{method} {path} returned no JSON.({res.status_code})"
+            ) from e
+
+
+_transports: Dict[Tuple[str, str], HttpTransport] = dict()
+_transports_lock = threading.Lock()
+
+
+def get_transport(
+    host: str, rate_limits: Optional[Dict[str, float]] = None, account: str = ""
+) -> HttpTransport:
+    # Rate limits are applied per account, so clients of the same host and
+    # account share a connection pool and limiters.
+    with _transports_lock:
+        key = (host, account)
+        if key not in _transports:
+            _transports[key] = HttpTransport(host=host, rate_limits=rate_limits)
+        return _transports[key]
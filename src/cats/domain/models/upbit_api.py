@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict
+from urllib.parse import urlencode
+
+import jwt  # type: ignore
+
+from cats import config
+from cats.domain.constants import Market, PriceUnit, OrderType, OrderStatus
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    APIError,
+    DEFAULT_ORDERBOOK_DEPTH,
+    KST,
+    TickTable,
+    to_kst,
+)
+from cats.domain.models.order import Order
+from cats.domain.models.parsing import parse_candles
+from cats.domain.models.transport import HttpTransport, get_transport
+from cats.domain.values import Orderbook, Price, PriceColumns, Quote
+
+DEFAULT_UPBIT_ACCESS_KEY = os.getenv("UPBIT_ACCESS_KEY", "access-key")
+DEFAULT_UPBIT_SECRET_KEY = os.getenv("UPBIT_SECRET_KEY", "secret-key")
+# Requests per second of each Upbit rate limit group.
+UPBIT_RATE_LIMITS = dict(order=8.0, default=30.0, quotation=10.0)
+UPBIT_MAX_CANDLES = 200
+# Keys of the time, high, low and trade price of Upbit candles.
+UPBIT_CANDLE_KEYS = ("candle_date_time_kst", "high_price", "low_price", "trade_price")
+UPBIT_TICK_SIZES = TickTable(
+    [
+        (2000000, 1000.0),
+        (1000000, 500.0),
+        (500000, 100.0),
+        (100000, 50.0),
+        (10000, 10.0),
+        (1000, 5.0),
+        (100, 1.0),
+        (10, 0.1),
+        (0, 0.01),
+    ]
+)
+
+UPBIT_SIDES = dict(bid=OrderType.BUY, ask=OrderType.SELL)
+UPBIT_STATES = dict(
+    wait=OrderStatus.WAIT, done=OrderStatus.DONE, cancel=OrderStatus.CANCEL
+)
+
+
+class UpbitExchangeAPI(AbstractExchangeAPI):
+    fee_rate = 0.0005
+    min_order_amount = 5000.0
+    max_candles = UPBIT_MAX_CANDLES
+    sides = UPBIT_SIDES
+    states = UPBIT_STATES
+
+    def __init__(
+        self,
+        market: Market,
+        access_key: str = DEFAULT_UPBIT_ACCESS_KEY,
+        secret_key: str = DEFAULT_UPBIT_SECRET_KEY,
+        host: Optional[str] = None,
+    ):
+        super().__init__(market)
+        self.market = f"KRW-{self.market}"
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.host = host or config.get_upbit_host()
+
+    @property
+    def transport(self) -> HttpTransport:
+        return get_transport(self.host, UPBIT_RATE_LIMITS, account=self.access_key)
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.BUY, price=price
+        )
+        order = self._post_orders("bid", budget / valid_price, valid_price)
+        if "error" in order:
+            raise APIError(str(order))
+        return self._make_order(order)
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        valid_price = self.make_valid_order_price(
+            order_type=OrderType.SELL, price=price
+        )
+        order = self._post_orders("ask", volume, valid_price)
+        if "error" in order:
+            raise APIError(str(order))
+        return self._make_order(order)
+
+    def cancel_order(self, order_id: str) -> str:
+        order = self._delete_order(order_id)
+        if "error" in order:
+            raise APIError(str(order))
+        return order["uuid"]
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        wait_orders = self._get_orders_by_uuids(order_ids, ["wait"])
+        if "error" in wait_orders:
+            raise APIError(str(wait_orders))
+        cancel_or_done_orders = self._get_orders_by_uuids(
+            order_ids, ["cancel", "done"]
+        )
+        if "error" in cancel_or_done_orders:
+            raise APIError(str(cancel_or_done_orders))
+        orders = wait_orders + cancel_or_done_orders
+        return [self._make_order(order) for order in orders]
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        if counts > self.max_candles:
+            return self.get_price_history(price_unit, counts, to)
+        return self.get_price_columns(price_unit, counts, to).to_prices()
+
+    def get_price_columns(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> PriceColumns:
+        if counts > self.max_candles:
+            return super().get_price_columns(price_unit, counts, to)
+        if price_unit == PriceUnit.MINUTE:
+            prices = self._candles_minutes(unit=1, count=counts, to=to)
+        elif price_unit == PriceUnit.HOUR:
+            prices = self._candles_minutes(unit=60, count=counts, to=to)
+        elif price_unit == PriceUnit.DAY:
+            prices = self._candles_days(count=counts, to=to)
+        else:
+            raise APIError(f"Invalid price unit.({price_unit})")
+        if "error" in prices:
+            raise APIError(str(prices))
+        return parse_candles(prices, *UPBIT_CANDLE_KEYS)
+
+    def get_balance(self) -> float:
+        chance = self._orders_chance()
+        if "error" in chance:
+            raise APIError(str(chance))
+        return float(chance["ask_account"]["balance"]) - float(
+            chance["ask_account"]["locked"]
+        )
+
+    def get_orderbook(self, depth: int = DEFAULT_ORDERBOOK_DEPTH) -> Orderbook:
+        res = self.transport.request(
+            "GET", "/orderbook", group="quotation", params=dict(markets=self.market)
+        )
+        if "error" in res or not res:
+            raise APIError(str(res))
+        units = res[0]["orderbook_units"][:depth]
+        return Orderbook(
+            date_time=datetime.utcfromtimestamp(res[0]["timestamp"] / 1000) + KST,
+            bids=tuple((float(u["bid_price"]), float(u["bid_size"])) for u in units),
+            asks=tuple((float(u["ask_price"]), float(u["ask_size"])) for u in units),
+        )
+
+    def get_quote(self) -> Quote:
+        return self.get_orderbook(depth=1).to_quote()
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return UPBIT_TICK_SIZES.round(order_type, price)
+
+    def _make_authorize_header(self, query_string: bytes) -> Dict[str, str]:
+        m = hashlib.sha512()
+        m.update(query_string)
+        query_hash = m.hexdigest()
+
+        payload = {
+            "access_key": self.access_key,
+            "nonce": str(uuid.uuid4()),
+            "query_hash": query_hash,
+            "query_hash_alg": "SHA512",
+        }
+        jwt_token = jwt.encode(payload, self.secret_key).decode("utf-8")
+        authorize_token = f"Bearer {jwt_token}"
+        return {"Authorization": authorize_token}
+
+    def _post_orders(self, side: str, volume: float, price: float):
+        query_params = dict(
+            market=self.market,
+            side=side,
+            volume=volume,
+            price=price,
+            ord_type="limit",
+        )
+        query_string = urlencode(query_params).encode()
+        headers = self._make_authorize_header(query_string)
+        return self.transport.request(
+            "POST", "/orders/", group="order", params=query_params, headers=headers
+        )
+
+    def _delete_order(self, order_id: str):
+        query_params = dict(
+            uuid=order_id,
+        )
+        query_string = urlencode(query_params).encode()
+        headers = self._make_authorize_header(query_string)
+        return self.transport.request(
+            "DELETE", "/order/", group="order", params=query_params, headers=headers
+        )
+
+    def _get_orders_by_uuids(self, uuids: List[str], states: List[str]):
+        query_params = dict(
+            market=self.market,
+            limit=100,
+        )
+        basic_query_string = urlencode(query_params)
+        uuids_query_string = None
+        if uuids:
+            uuids_query_string = "&".join([f"uuids[]={uuid}" for uuid in uuids])
+            query_params["uuids[]"] = uuids
+        states_query_string = "&".join([f"states[]={state}" for state in states])
+        query_params["states[]"] = states
+        if uuids_query_string:
+            query_string = (
+                f"{basic_query_string}&{uuids_query_string}&{states_query_string}"
+            ).encode()
+        else:
+            query_string = f"{basic_query_string}&{states_query_string}".encode()
+        headers = self._make_authorize_header(query_string)
+        return self.transport.request(
+            "GET", "/orders/", params=query_params, headers=headers
+        )
+
+    def _candles_minutes(self, unit: int, count: int, to: Optional[datetime] = None):
+        query_params = dict(
+            market=self.market,
+            count=count,
+        )
+        if to:
+            query_params["to"] = _format_to(to)
+        return self.transport.request(
+            "GET", f"/candles/minutes/{unit}", group="quotation", params=query_params
+        )
+
+    def _candles_days(self, count: int, to: Optional[datetime] = None):
+        query_params = dict(
+            market=self.market,
+            count=count,
+        )
+        if to:
+            query_params["to"] = _format_to(to)
+        return self.transport.request(
+            "GET", "/candles/days/", group="quotation", params=query_params
+        )
+
+    def _orders_chance(self):
+        query_params = dict(market=self.market)
+        query_string = urlencode(query_params).encode()
+        headers = self._make_authorize_header(query_string)
+        return self.transport.request(
+            "GET", "/orders/chance", params=query_params, headers=headers
+        )
+
+    def _make_order(self, order: Dict[str, str]) -> Order:
+        return Order(
+            order_id=order["uuid"],
+            type=self.sides[order["side"]],
+            status=self.states[order["state"]],
+            price=float(order["price"]),
+            ordered_volume=float(order["volume"]),
+            executed_volume=float(order["executed_volume"]),
+            paid_fee=float(order["paid_fee"]),
+            ordered_time=to_kst(datetime.fromisoformat(order["created_at"])),
+        )
+
+
+def _format_to(to: datetime) -> str:
+    # Upbit excludes the candle starting at `to`, and reads naive times as UTC.
+    # Candles are in KST, so the cursor is sent with its offset.
+    return f"{(to + timedelta(seconds=1)).isoformat(timespec='seconds')}+09:00"
@@ -1,6 +1,8 @@
 from __future__ import annotations
+from contextlib import suppress
 from dataclasses import dataclass, field
-from typing import Dict, Type, List, Optional, Tuple, Set, Any
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Set, Any
 from uuid import uuid4
 
 from cats.domain.constants import (
@@ -12,192 +14,354 @@ from cats.domain.constants import (
     PriceUnit,
     OrderType,
     SELL_RATE,
-    MIN_ORDER_BUDGET,
     ADDITIONAL_BUY_RATE,
+    DEFAULT_PRICE_COUNTS,
+    INCREMENTAL_PRICE_COUNTS,
+    DEFAULT_TICK_INTERVAL,
+    ADAPTIVE_TICK_DISTANCE,
+    MIN_TICK_FACTOR,
+    MAX_TICK_FACTOR,
+    MAX_ORDER_TICK_INTERVAL,
+    QUARANTINE_FAILURES,
+    QUARANTINE_SECONDS,
+    MAX_QUARANTINE_SECONDS,
 )
 from cats.domain.models.exchange_api import (
     AbstractExchangeAPI,
-    UpbitExchangeAPI,
-    FakeExchangeAPI,
     APIError,
+    PRICE_UNIT_DELTAS,
+    unwrap,
 )
+from cats.domain.models.exchange_registry import exchange_apis
 from cats.domain.models.order import Order
-from cats.domain.values import Price
+from cats.domain.models.order_router import OrderRouter
+from cats.domain.models.orderbook import orderbooks
+from cats.domain.models.paper_exchange_api import (
+    PaperExchangeAPI,
+    close_paper_accounts,
+    paper_accounts,
+)
+from cats.domain.models.portfolio import portfolio
+from cats.domain.models import recording
+from cats.domain.models.resampling import ResamplingExchangeAPI
+from cats.domain.models.single_flight import CoalescingExchangeAPI
+from cats.domain.models.strategy import (
+    DEFAULT_STRATEGY,
+    Decisions,
+    Signals,
+    WorkerStates,
+    get_strategy,
+)
+from cats.domain.models.resilience import (
+    CircuitOpenError,
+    ResilientExchangeAPI,
+    is_retryable,
+)
+from cats.domain.values import BudgetLadder, Price
 
 
-def work(worker: Worker) -> None:
+def work(worker: Worker, signals: Optional[Signals] = None) -> None:
+    """
+    Ticks the worker. With `signals` from a batched evaluation the worker was
+    refreshed by `prepare` and only acts on them.
+    """
+    if worker.is_quarantined():
+        return
     try:
-        if worker.status == WorkerStatus.WATCHING:
+        if signals is not None:
+            worker.execute(signals)
+        elif worker.status == WorkerStatus.WATCHING:
             worker.work_for_watching()
         elif worker.status == WorkerStatus.BUYING:
             worker.work_for_buying()
         elif worker.status == WorkerStatus.SELLING:
             worker.work_for_selling()
-    except APIError:
-        # Todo : Implements API error handling logic
+    except CircuitOpenError:
+        # The endpoint is failing, not the worker.
         pass
+    except APIError as e:
+        worker.record_failure(e)
+    else:
+        if worker.failures:
+            worker.failures = 0
+    portfolio.update(worker)
+    if worker.paper and worker.status == WorkerStatus.FINISHED:
+        close_paper_accounts(worker.worker_id)
+
+
+def prepare(worker: Worker) -> bool:
+    """Refreshes the worker for a batched tick, False if it cannot work now."""
+    if worker.is_quarantined():
+        return False
+    try:
+        worker.refresh()
+    except CircuitOpenError:
+        return False
+    except APIError as e:
+        worker.record_failure(e)
+        return False
+    return True
 
 
-EXCHANGE_APIS: Dict[str, Type[AbstractExchangeAPI]] = {
-    Exchange.UPBIT: UpbitExchangeAPI,
-    Exchange.FAKE: FakeExchangeAPI,
-}
+EXCHANGE_APIS = exchange_apis
 
 
 @dataclass
 class Worker:
     market: Market = Market.ETH
     status: WorkerStatus = WorkerStatus.WATCHING
-    budget: str = DEFAULT_BUDGET
+    budget: BudgetLadder = field(
+        default_factory=lambda: BudgetLadder.parse(DEFAULT_BUDGET)
+    )
     orders: Set[Order] = field(default_factory=set)
     balance: float = 0.0
     prices: List[Price] = field(default_factory=list)
-    worker_id: str = str(uuid4())
+    worker_id: str = field(default_factory=lambda: str(uuid4()))
     exchange: Exchange = Exchange.UPBIT
+    venues: str = ""
+    price_unit: PriceUnit = PriceUnit.HOUR
+    price_counts: int = DEFAULT_PRICE_COUNTS
+    tick_interval: float = DEFAULT_TICK_INTERVAL
+    adaptive_tick: bool = False
+    failures: int = 0
+    quarantined_until: Optional[datetime] = None
+    paper: bool = False
+    strategy: str = DEFAULT_STRATEGY
 
     _api: Optional[AbstractExchangeAPI] = None
 
+    def __post_init__(self):
+        if isinstance(self.budget, str):
+            # An invalid budget is kept as given for validate_worker to reject.
+            with suppress(ValueError):
+                self.budget = BudgetLadder.parse(self.budget)
+
     """
     Main methods
     """
 
     def work_for_watching(self):
         self._update_prices_from_api()
-        if self._is_buy_timing():
+        self._watch(Signals(buy=self._is_buy_timing()))
+
+    def work_for_buying(self):
+        self._update_orders_from_api()
+        self._update_balance_from_api()
+        self._update_prices_from_api()
+        self._buy(
+            Signals(
+                cancel_buy=self._need_to_cancel_buy_order_due_to_trade_price_rising(),
+                sell_or_buy=self._need_to_sell_or_buy_order(),
+            )
+        )
+
+    def work_for_selling(self):
+        self._update_orders_from_api()
+        self._update_balance_from_api()
+        self._update_prices_from_api()
+        self._sell(
+            Signals(
+                cancel_sell=self._need_to_cancel_sell_order_due_to_trade_price_drop(),
+                sell_or_buy=self._need_to_sell_or_buy_order(),
+            )
+        )
+
+    def refresh(self):
+        """Fetches what the next decision of the worker is made on."""
+        if self.status != WorkerStatus.WATCHING:
+            self._update_orders_from_api()
+            self._update_balance_from_api()
+        self._update_prices_from_api()
+
+    def execute(self, signals: Signals):
+        if self.status == WorkerStatus.WATCHING:
+            self._watch(signals)
+        elif self.status == WorkerStatus.BUYING:
+            self._buy(signals)
+        elif self.status == WorkerStatus.SELLING:
+            self._sell(signals)
+
+    def get_tick_interval(self) -> float:
+        interval = self.tick_interval or DEFAULT_TICK_INTERVAL
+        if self.status in (WorkerStatus.BUYING, WorkerStatus.SELLING):
+            # Live orders are followed closely whatever the worker cadence.
+            return min(interval, MAX_ORDER_TICK_INTERVAL)
+        if not self.adaptive_tick:
+            return interval
+        distance = self._get_decision_distance()
+        if distance is None:
+            return interval
+        factor = distance / ADAPTIVE_TICK_DISTANCE
+        return interval * min(max(factor, MIN_TICK_FACTOR), MAX_TICK_FACTOR)
+
+    def is_quarantined(self, now: Optional[datetime] = None) -> bool:
+        if not self.quarantined_until:
+            return False
+        return (now or datetime.now()) < self.quarantined_until
+
+    def record_failure(self, error: BaseException, now: Optional[datetime] = None):
+        # A fatal error quarantines the worker at once.
+        failures = 1 if is_retryable(error) else QUARANTINE_FAILURES
+        self.failures = (self.failures or 0) + failures
+        if self.failures >= QUARANTINE_FAILURES:
+            seconds = QUARANTINE_SECONDS * 2 ** (self.failures - QUARANTINE_FAILURES)
+            self.quarantined_until = (now or datetime.now()) + timedelta(
+                seconds=min(seconds, MAX_QUARANTINE_SECONDS)
+            )
+
+    """
+    Decisions, made by the strategy of the worker
+    """
+
+    def _is_buy_timing(self) -> bool:
+        return self._evaluate().buy[0]
+
+    def _need_to_cancel_buy_order_due_to_trade_price_rising(self) -> bool:
+        return self._evaluate().cancel_buy[0]
+
+    def _need_to_cancel_sell_order_due_to_trade_price_drop(self) -> bool:
+        return self._evaluate().cancel_sell[0]
+
+    def _need_to_sell_or_buy_order(self) -> bool:
+        return self._evaluate().sell_or_buy[0]
+
+    def _evaluate(self) -> Decisions:
+        states = WorkerStates.from_workers([self])
+        return get_strategy(self.strategy).evaluate(states)
+
+    """
+    Execution
+    """
+
+    def _watch(self, signals: Signals):
+        if signals.buy:
+            budget = self._allocate_unit_budget()
+            if not budget:
+                return
             api = self._get_api()
             order = api.buy_order(
-                price=self._get_trade_price(), budget=self._get_unit_budget()
+                price=self._get_order_price(OrderType.BUY, self._get_trade_price()),
+                budget=budget,
             )
             self.orders.add(order)
             self.status = WorkerStatus.BUYING
 
-    def work_for_buying(self):
-        self._update_orders_from_api()
-        self._update_balance_from_api()
-        self._update_prices_from_api()
+    def _buy(self, signals: Signals):
         api = self._get_api()
         latest_order = self._get_latest_order()
         if latest_order is None:
             # implements error handling
             return
 
-        if self._need_to_cancel_buy_order_due_to_trade_price_rising():
+        if signals.cancel_buy:
             api.cancel_order(latest_order.order_id)
-        elif self._need_to_sell_or_buy_order():
+        elif signals.sell_or_buy:
             self._spend_budget(
                 spent_budget=latest_order.executed_volume * latest_order.price
                 + latest_order.paid_fee
             )
             buy_price_average = self._calculate_buy_price_average()
             if buy_price_average:
-                order = api.sell_order(
-                    price=buy_price_average * SELL_RATE, volume=self.balance
+                orders = api.sell_orders(
+                    price=self._get_order_price(
+                        OrderType.SELL, buy_price_average * SELL_RATE, limit=True
+                    ),
+                    volume=self.balance,
                 )
-                self.orders.add(order)
+                self.orders.update(orders)
                 self.status = WorkerStatus.SELLING
         else:
             self.status = WorkerStatus.WATCHING
 
-    def work_for_selling(self):
-        self._update_orders_from_api()
-        self._update_balance_from_api()
-        self._update_prices_from_api()
+    def _sell(self, signals: Signals):
         api = self._get_api()
         latest_order = self._get_latest_order()
         if latest_order is None:
             # implements error handling
             return
 
-        if self._need_to_cancel_sell_order_due_to_trade_price_drop():
-            api.cancel_order(latest_order.order_id)
-        elif self._need_to_sell_or_buy_order():
+        if signals.cancel_sell:
+            # A sell split across venues is cancelled on every venue.
+            waiting_sells = [
+                order
+                for order in self._get_orders_by_status(statuses=(OrderStatus.WAIT,))
+                if order.type == OrderType.SELL
+            ]
+            for order in waiting_sells or [latest_order]:
+                api.cancel_order(order.order_id)
+        elif signals.sell_or_buy:
+            budget = self._allocate_unit_budget()
+            if not budget:
+                # Waits for the other workers to free some of the budget cap.
+                return
             order = api.buy_order(
-                price=self._get_next_additional_buy_price(),
-                budget=self._get_unit_budget(),
+                price=self._get_order_price(
+                    OrderType.BUY, self._get_next_additional_buy_price(), limit=True
+                ),
+                budget=budget,
             )
             self.orders.add(order)
             self.status = WorkerStatus.BUYING
         else:
             self.status = WorkerStatus.FINISHED
 
-    def _is_buy_timing(self) -> bool:
-        price_average = self._calculate_price_average()
-        trade_price = self._get_trade_price()
-        if price_average and trade_price:
-            return True if trade_price < price_average else False
-        return False
-
-    def _need_to_cancel_buy_order_due_to_trade_price_rising(self) -> bool:
-        latest_order = self._get_latest_order()
-        trade_price = self._get_trade_price()
-        buy_price_average = self._calculate_buy_price_average()
-
-        if latest_order and trade_price:
-            is_buying_status = self.status == WorkerStatus.BUYING
-            is_price_rising_for_selling_order = (
-                trade_price >= buy_price_average if buy_price_average else False
-            )
-            is_price_rising_for_returning_watching = trade_price > latest_order.price
-            has_balance = self.balance > 0
-            can_cancel_order = latest_order.status == OrderStatus.WAIT
-            return (
-                is_buying_status
-                and can_cancel_order
-                and (
-                    (has_balance and is_price_rising_for_selling_order)
-                    or (not has_balance and is_price_rising_for_returning_watching)
-                )
-            )
-        return False
-
-    def _need_to_cancel_sell_order_due_to_trade_price_drop(self) -> bool:
-        latest_order = self._get_latest_order()
-        latest_buy_order = self._get_latest_order(order_type=OrderType.BUY)
+    def _get_decision_distance(self) -> Optional[float]:
         trade_price = self._get_trade_price()
-        next_additional_buy_price = self._get_next_additional_buy_price()
-
-        if (
-            latest_order
-            and latest_buy_order
-            and trade_price
-            and next_additional_buy_price
-        ):
-            is_selling_status = self.status == WorkerStatus.SELLING
-            is_price_drop_for_additional_buy = (
-                trade_price <= next_additional_buy_price
-            )
-            has_budget = self._get_unit_budget() > 0
-            return (
-                is_selling_status and is_price_drop_for_additional_buy and has_budget
-            )
-        return False
-
-    def _need_to_sell_or_buy_order(self) -> bool:
+        decision_prices = [price for price in self._get_decision_prices() if price]
+        if not trade_price or not decision_prices:
+            return None
+        distance = min(abs(trade_price - price) for price in decision_prices)
+        return distance / trade_price
+
+    def _get_decision_prices(self) -> List[Optional[float]]:
+        if self.status == WorkerStatus.WATCHING:
+            return [self._calculate_price_average()]
         latest_order = self._get_latest_order()
-
-        if latest_order:
-            is_wait_status_for_latest_order = latest_order == OrderStatus.WAIT
-            has_balance = self.balance > 0
-            return not is_wait_status_for_latest_order and has_balance
-        return False
+        if self.status == WorkerStatus.BUYING:
+            return [
+                latest_order.price if latest_order else None,
+                self._calculate_buy_price_average(),
+            ]
+        if self.status == WorkerStatus.SELLING:
+            return [
+                latest_order.price if latest_order else None,
+                self._get_next_additional_buy_price(),
+            ]
+        return []
 
     """
     Budgets related
     """
 
     def _get_unit_budget(self) -> int:
-        budgets = self.budget.split(":")
-        if budgets and budgets[0] and int(budgets[0]) >= MIN_ORDER_BUDGET:
-            return int(budgets[0])
-        return 0
+        return self.budget.current if self.budget else 0
+
+    def _get_available_budget(self) -> int:
+        """The unit budget, 0 when the portfolio cap leaves no room for it."""
+        budget = self._get_unit_budget()
+        return budget if budget and portfolio.can_allocate(self, budget) else 0
+
+    def _allocate_unit_budget(self) -> int:
+        budget = self._get_unit_budget()
+        return budget if budget and portfolio.allocate(self, budget) else 0
 
     def _spend_budget(self, spent_budget: float):
-        budgets = self.budget.split(":")
-        if int(budgets[0]) - spent_budget > MIN_ORDER_BUDGET:
-            budgets[0] = str(int(budgets[0]) - spent_budget)
-        else:
-            budgets.pop(0)
-        self.budget = ":".join(budgets)
+        self.budget = self.budget.spend(spent_budget)
+
+    def get_exposure(self) -> float:
+        """KRW at stake: open buy orders and the cost of what is held."""
+        if self.status == WorkerStatus.FINISHED:
+            return 0.0
+        exposure = 0.0
+        for order in self.orders:
+            if order.type == OrderType.BUY:
+                exposure += order.price * order.executed_volume + order.paid_fee
+                if order.status == OrderStatus.WAIT:
+                    remaining = order.ordered_volume - order.executed_volume
+                    exposure += order.price * remaining
+            else:
+                exposure -= order.price * order.executed_volume - order.paid_fee
+        return max(exposure, 0.0)
 
     """
     Orders related
@@ -210,7 +374,17 @@ class Worker:
             updated_orders = api.get_orders(
                 order_ids=[order.order_id for order in wait_orders]
             )
-            self.orders.update(set(updated_orders))
+            # Orders are equal by id, so a set update would keep the stale
+            # ones. Known orders are updated in place to keep their identity.
+            known = {order.order_id: order for order in self.orders}
+            for updated in updated_orders:
+                order = known.get(updated.order_id)
+                if order is None:
+                    self.orders.add(updated)
+                elif order is not updated:
+                    order.status = updated.status
+                    order.executed_volume = updated.executed_volume
+                    order.paid_fee = updated.paid_fee
 
     def _get_orders_by_status(self, statuses: Tuple[OrderStatus, ...]) -> List[Order]:
         return [order for order in self.orders if order.status in statuses]
@@ -227,7 +401,7 @@ class Worker:
             else self.orders
         )
         if orders:
-            return max(orders)  # type: ignore
+            return max(orders, key=lambda order: order.ordered_time)
         return None
 
     def _calculate_buy_price_average(self) -> Optional[float]:
@@ -256,7 +430,27 @@ class Worker:
 
     def _update_prices_from_api(self) -> None:
         api = self._get_api()
-        self.prices = api.get_prices(price_unit=PriceUnit.HOUR, counts=24)
+        price_unit = PriceUnit(self.price_unit or PriceUnit.HOUR)
+        counts = self.price_counts or DEFAULT_PRICE_COUNTS
+        if len(self.prices) < counts:
+            self.prices = api.get_prices(price_unit=price_unit, counts=counts)
+            return
+
+        # Only candles from the latest known one are fetched. The latest one is
+        # fetched again as it may have been still open.
+        latest = max(self.prices)  # type: ignore
+        new_prices = api.get_prices_since(
+            price_unit=price_unit,
+            since=latest.date_time - PRICE_UNIT_DELTAS[price_unit],
+            page_size=INCREMENTAL_PRICE_COUNTS,
+            limit=counts,
+        )
+        new_dates = {price.date_time for price in new_prices}
+        prices = new_prices + [
+            price for price in self.prices if price.date_time not in new_dates
+        ]
+        prices.sort(key=lambda price: price.date_time, reverse=True)
+        self.prices = prices[:counts]
 
     def _get_trade_price(self) -> Optional[float]:
         return max(self.prices).trade_price if self.prices else None  # type: ignore
@@ -270,6 +464,22 @@ class Worker:
             return price_sum / (3 * len(self.prices))
         return None
 
+    def _get_order_price(
+        self, order_type: OrderType, price: Optional[float], limit: bool = False
+    ) -> Optional[float]:
+        """
+        Prices an order against the current orderbook instead of the latest
+        candle. A limit `price` is kept unless the book offers a better one.
+        Without an orderbook `price` is used.
+        """
+        try:
+            best_price = orderbooks.get_limit_price(
+                self._get_api(), order_type, limit=price if limit else None
+            )
+        except APIError:
+            return price
+        return best_price if best_price is not None else price
+
     def _get_next_additional_buy_price(self) -> Optional[float]:
         latest_buy_order = self._get_latest_order(order_type=OrderType.BUY)
         return (
@@ -283,9 +493,43 @@ class Worker:
     def _get_api(self):
         if self._api:
             return self._api
-        self._api = EXCHANGE_APIS[self.exchange](market=self.market)
+        venues = self._get_venues()
+        if len(venues) > 1:
+            router = OrderRouter(
+                market=self.market,
+                venues={venue: self._make_api(venue) for venue in venues},
+            )
+            router.add_orders(self.orders)
+            self._api = router
+        else:
+            self._api = self._make_api(self.exchange)
         return self._api
 
+    def _make_api(self, exchange: str) -> AbstractExchangeAPI:
+        api = EXCHANGE_APIS[exchange](market=self.market)
+        if recording.recorder:
+            api = recording.RecordingExchangeAPI(api, recording.recorder, exchange)
+        api = CoalescingExchangeAPI(ResilientExchangeAPI(api))
+        if unwrap(api).resamplable_candles:
+            api = ResamplingExchangeAPI(api)
+        if not self.paper:
+            return api
+        # Paper accounts outlive the worker objects of a session.
+        key = (self.worker_id, exchange)
+        if key not in paper_accounts:
+            account = PaperExchangeAPI(api)
+            venue = getattr(exchange, "value", exchange)
+            account.restore(
+                order for order in self.orders if order.exchange in (None, venue)
+            )
+            paper_accounts[key] = account
+        return paper_accounts[key]
+
+    def _get_venues(self) -> List[str]:
+        venues = [venue for venue in (self.venues or "").split(",") if venue]
+        exchange = getattr(self.exchange, "value", self.exchange)
+        return [exchange] + [venue for venue in venues if venue != exchange]
+
     def __hash__(self):
         return hash(self.worker_id)
 
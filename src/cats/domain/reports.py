@@ -0,0 +1,85 @@
+"""
+Read model of trading results. A report of a worker is written whenever its
+orders change, so dashboards read these rows instead of workers and orders.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from cats.domain.constants import OrderType
+
+if TYPE_CHECKING:
+    from cats.domain.models.worker import Worker
+
+
+@dataclass
+class WorkerReport:
+    worker_id: str
+    market: str
+    status: int
+    # KRW paid for bought coins with fees, and received for sold ones.
+    bought: float = 0.0
+    sold: float = 0.0
+    fees: float = 0.0
+    bought_volume: float = 0.0
+    sold_volume: float = 0.0
+    # Orders executed at least partially.
+    fills: int = 0
+    # Cost of the coins held, and profit of the sold ones at the average cost.
+    exposure: float = 0.0
+    realized_pnl: float = 0.0
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def of(cls, worker: Worker, updated_at: Optional[datetime] = None) -> WorkerReport:
+        report = cls(
+            worker_id=worker.worker_id,
+            market=str(getattr(worker.market, "value", worker.market)),
+            status=int(worker.status),
+            updated_at=updated_at or datetime.now(),
+        )
+        for order in worker.orders:
+            funds = order.price * order.executed_volume
+            if order.type == OrderType.BUY:
+                report.bought += funds + order.paid_fee
+                report.bought_volume += order.executed_volume
+            else:
+                report.sold += funds - order.paid_fee
+                report.sold_volume += order.executed_volume
+            report.fees += order.paid_fee
+            report.fills += order.executed_volume > 0
+        if report.bought_volume:
+            average_cost = report.bought / report.bought_volume
+            held = max(report.bought_volume - report.sold_volume, 0.0)
+            report.exposure = held * average_cost
+            report.realized_pnl = report.sold - report.sold_volume * average_cost
+        return report
+
+
+@dataclass
+class MarketReport:
+    market: str
+    workers: int = 0
+    bought: float = 0.0
+    sold: float = 0.0
+    fees: float = 0.0
+    fills: int = 0
+    exposure: float = 0.0
+    realized_pnl: float = 0.0
+
+
+def summarize(reports: Iterable[WorkerReport]) -> List[MarketReport]:
+    """Reports of every market, from the reports of its workers."""
+    markets: Dict[str, MarketReport] = dict()
+    for report in reports:
+        market = markets.setdefault(report.market, MarketReport(report.market))
+        market.workers += 1
+        market.bought += report.bought
+        market.sold += report.sold
+        market.fees += report.fees
+        market.fills += report.fills
+        market.exposure += report.exposure
+        market.realized_pnl += report.realized_pnl
+    return sorted(markets.values(), key=lambda market: market.market)
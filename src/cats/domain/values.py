@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from array import array
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from cats.domain.constants import MIN_ORDER_BUDGET
 
 
 @dataclass(frozen=True)
@@ -26,3 +30,159 @@ class Price:
         if isinstance(other, Price):
             return self.date_time > other.date_time
         raise TypeError
+
+
+@dataclass
+class PriceColumns:
+    """
+    Candles as columns, from the latest one. Bulk downloads are kept in this
+    form instead of one `Price` per candle; indexing builds a `Price`.
+    """
+
+    date_times: List[datetime] = field(default_factory=list)
+    high_prices: array = field(default_factory=lambda: array("d"))
+    low_prices: array = field(default_factory=lambda: array("d"))
+    trade_prices: array = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[Price]) -> PriceColumns:
+        columns = cls()
+        for price in prices:
+            columns.append(
+                price.date_time, price.high_price, price.low_price, price.trade_price
+            )
+        return columns
+
+    def append(
+        self,
+        date_time: datetime,
+        high_price: float,
+        low_price: float,
+        trade_price: float,
+    ) -> None:
+        self.date_times.append(date_time)
+        self.high_prices.append(high_price)
+        self.low_prices.append(low_price)
+        self.trade_prices.append(trade_price)
+
+    def extend(self, other: PriceColumns) -> None:
+        self.date_times.extend(other.date_times)
+        self.high_prices.extend(other.high_prices)
+        self.low_prices.extend(other.low_prices)
+        self.trade_prices.extend(other.trade_prices)
+
+    def select(self, start: datetime, end: datetime) -> PriceColumns:
+        """Candles from `start` to `end`, both included."""
+        indexes = [i for i, d in enumerate(self.date_times) if start <= d <= end]
+        return PriceColumns(
+            date_times=[self.date_times[i] for i in indexes],
+            high_prices=array("d", (self.high_prices[i] for i in indexes)),
+            low_prices=array("d", (self.low_prices[i] for i in indexes)),
+            trade_prices=array("d", (self.trade_prices[i] for i in indexes)),
+        )
+
+    def to_prices(self) -> List[Price]:
+        return list(
+            map(
+                Price,
+                self.date_times,
+                self.high_prices,
+                self.low_prices,
+                self.trade_prices,
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.date_times)
+
+    def __getitem__(self, index: int) -> Price:
+        return Price(
+            date_time=self.date_times[index],
+            high_price=self.high_prices[index],
+            low_price=self.low_prices[index],
+            trade_price=self.trade_prices[index],
+        )
+
+    def __iter__(self) -> Iterator[Price]:
+        return iter(self.to_prices())
+
+
+@dataclass(frozen=True)
+class Quote:
+    date_time: datetime
+    bid_price: float
+    ask_price: float
+
+
+@dataclass(frozen=True)
+class Orderbook:
+    date_time: datetime
+    # (price, size) levels from the best price.
+    bids: Tuple[Tuple[float, float], ...]
+    asks: Tuple[Tuple[float, float], ...]
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids[0][0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks[0][0] if self.asks else None
+
+    def to_quote(self) -> Quote:
+        if not self.bids or not self.asks:
+            raise ValueError("Orderbook has an empty side.")
+        return Quote(
+            date_time=self.date_time,
+            bid_price=self.bids[0][0],
+            ask_price=self.asks[0][0],
+        )
+
+
+@dataclass(frozen=True)
+class BudgetLadder:
+    """
+    KRW budgets of the buy orders of a worker, the current tranche first.
+    Spending returns a new ladder, so a budget is swapped in one assignment.
+    """
+
+    tranches: Tuple[int, ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> BudgetLadder:
+        """From the "10000:20000:30000" form, ValueError when it is invalid."""
+        units = text.split(":") if text else []
+        if not all(unit.isdigit() for unit in units):
+            raise ValueError(f"Invalid budget.({text})")
+        return cls(tuple(int(unit) for unit in units))
+
+    @property
+    def current(self) -> int:
+        if self.tranches and self.tranches[0] >= MIN_ORDER_BUDGET:
+            return self.tranches[0]
+        return 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.tranches)
+
+    def spend(self, amount: float) -> BudgetLadder:
+        """Spends from the current tranche, dropped once too little is left."""
+        if not self.tranches:
+            return self
+        remaining = self.tranches[0] - math.ceil(amount)
+        if remaining > MIN_ORDER_BUDGET:
+            return BudgetLadder((remaining,) + self.tranches[1:])
+        return BudgetLadder(self.tranches[1:])
+
+    def refund(self, amount: float) -> BudgetLadder:
+        refunded = math.floor(amount)
+        if not self.tranches:
+            return BudgetLadder((refunded,))
+        return BudgetLadder((self.tranches[0] + refunded,) + self.tranches[1:])
+
+    def __bool__(self) -> bool:
+        return bool(self.tranches)
+
+    def __str__(self) -> str:
+        return ":".join(str(tranche) for tranche in self.tranches)
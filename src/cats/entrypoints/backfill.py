@@ -0,0 +1,155 @@
+"""
+Bulk historical candle backfill.
+
+    python -m cats.entrypoints.backfill --markets ETH,BTC --unit HOUR \
+        --since 2019-01-01 --output-dir candles
+
+Chunks of the period are downloaded in parallel. Clients of the same exchange
+share its rate limiters, so the workers wait for each other instead of going
+over the limits.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cats.domain.constants import Exchange, Market, PriceUnit
+from cats.domain.models.exchange_api import (
+    AbstractExchangeAPI,
+    PRICE_UNIT_DELTAS,
+    floor_datetime,
+)
+from cats.domain.models.exchange_registry import exchange_apis
+from cats.domain.models.resilience import ResilientExchangeAPI
+from cats.domain.values import PriceColumns
+
+CSV_FIELDS = ("date_time", "high_price", "low_price", "trade_price")
+
+Chunk = Tuple[datetime, datetime]
+
+
+def plan_chunks(
+    since: datetime, until: datetime, price_unit: PriceUnit, size: int
+) -> List[Chunk]:
+    """(first, last) candle times of every chunk, from the latest chunk."""
+    delta = PRICE_UNIT_DELTAS[price_unit]
+    first = floor_datetime(since, price_unit)
+    last = floor_datetime(until, price_unit)
+    chunks = list()
+    while last >= first:
+        start = max(first, last - delta * (size - 1))
+        chunks.append((start, last))
+        last = start - delta
+    return chunks
+
+
+def fetch_chunk(
+    api: AbstractExchangeAPI, price_unit: PriceUnit, chunk: Chunk
+) -> PriceColumns:
+    start, end = chunk
+    counts = (end - start) // PRICE_UNIT_DELTAS[price_unit] + 1
+    columns = api.get_price_columns(price_unit=price_unit, counts=counts, to=end)
+    return columns.select(start, end)
+
+
+def backfill(
+    api_factory: Callable[[Market], AbstractExchangeAPI],
+    markets: List[Market],
+    price_unit: PriceUnit,
+    since: datetime,
+    until: datetime,
+    workers: int = 4,
+) -> Dict[Market, PriceColumns]:
+    apis = {market: api_factory(market) for market in markets}
+    jobs = [
+        (market, chunk)
+        for market, api in apis.items()
+        for chunk in plan_chunks(since, until, price_unit, api.max_candles)
+    ]
+    results = {market: PriceColumns() for market in markets}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = executor.map(
+            lambda job: fetch_chunk(apis[job[0]], price_unit, job[1]), jobs
+        )
+        # Chunks of a market are planned from the latest one and do not
+        # overlap, so they are joined in order.
+        for (market, _), page in zip(jobs, pages):
+            results[market].extend(page)
+    return results
+
+
+def write_prices(path: str, prices: PriceColumns) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(
+            zip(
+                (date_time.isoformat() for date_time in prices.date_times),
+                prices.high_prices,
+                prices.low_prices,
+                prices.trade_prices,
+            )
+        )
+
+
+def read_prices(path: str) -> PriceColumns:
+    """Prices of a backfill file, from the latest one. They can be replayed with
+    `FakeExchangeAPI(history=...)`."""
+    prices = PriceColumns()
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            prices.append(
+                datetime.fromisoformat(row["date_time"]),
+                float(row["high_price"]),
+                float(row["low_price"]),
+                float(row["trade_price"]),
+            )
+    return prices
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill historical candles")
+    parser.add_argument("--exchange", default=Exchange.UPBIT.value)
+    parser.add_argument(
+        "--markets", default=",".join(market.value for market in Market)
+    )
+    parser.add_argument(
+        "--unit", choices=[unit.name for unit in PriceUnit], default="HOUR"
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, required=True)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output-dir", default="candles")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    price_unit = PriceUnit[args.unit]
+    markets = [Market(market) for market in args.markets.split(",") if market]
+    api_class = exchange_apis[args.exchange]
+
+    results = backfill(
+        lambda market: ResilientExchangeAPI(api_class(market=market)),
+        markets,
+        price_unit,
+        since=args.since,
+        until=args.until or datetime.now(),
+        workers=args.workers,
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for market, prices in results.items():
+        path = os.path.join(
+            args.output_dir, f"{args.exchange}_{market.value}_{price_unit.name}.csv"
+        )
+        write_prices(path, prices)
+        print(f"{path}: {len(prices)} candles")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
-import threading
+import json
+import queue
+from dataclasses import asdict
+from typing import Any, Dict
 
-from flask import Flask, request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from flask import Flask, Response, request, stream_with_context
 
-from cats.config import get_postgres_uri
+from cats.domain.constants import PriceUnit, WorkerStatus
+from cats.domain.models import single_flight
 from cats.domain.models.worker import Worker
+from cats.domain.reports import WorkerReport
 from cats.adapters.orm import start_mappers
-from cats.service_layer import services, unit_of_work
+from cats.service_layer import services, unit_of_work, views
+from cats.service_layer.runners import RunnerRegistry, RunnersStillAlive
+
+SSE_HEARTBEAT_SECONDS = 15
 
 start_mappers()
-get_session = sessionmaker(bind=create_engine(get_postgres_uri()))
 app = Flask(__name__)
+runners = RunnerRegistry(uow_factory=unit_of_work.SqlAlchemyUnitOfWork)
 
 
 @app.route("/add_worker", methods=["POST"])
@@ -20,21 +26,190 @@ def add_worker_endpoint():
         market=request.json["market"],  # type: ignore
         budget=request.json["budget"],  # type: ignore
         exchange=request.json["exchange"],  # type: ignore
+        venues=request.json.get("venues", ""),  # type: ignore
+        **_get_strategy_options(request.json),  # type: ignore
     )
 
     try:
         services.add_worker(worker, unit_of_work.SqlAlchemyUnitOfWork())
-    except services.WorkerDuplicated as e:
+    except (services.WorkerDuplicated, services.InvalidWorker) as e:
         return {"message": str(e)}, 400
 
     return {"worker_id": worker.worker_id}, 201
 
 
+@app.route("/add_workers", methods=["POST"])
+def add_workers_endpoint():
+    items = (request.json or {}).get("workers")  # type: ignore
+    if not isinstance(items, list) or not items:
+        return {"message": "workers must be a non-empty list."}, 400
+
+    workers = [
+        Worker(
+            market=item.get("market", ""),
+            budget=item.get("budget", ""),
+            exchange=item.get("exchange", ""),
+            venues=item.get("venues", ""),
+            **_get_strategy_options(item),
+        )
+        for item in items
+    ]
+    results = services.add_workers(workers, unit_of_work.SqlAlchemyUnitOfWork())
+    status = 201 if all(result.ok for result in results) else 207
+    return {"results": [asdict(result) for result in results]}, status
+
+
+def _get_strategy_options(data: dict) -> dict:
+    options: Dict[str, Any] = dict()
+    if "price_unit" in data:
+        price_unit = data["price_unit"]
+        options["price_unit"] = (
+            PriceUnit.__members__.get(price_unit, price_unit)
+            if isinstance(price_unit, str)
+            else price_unit
+        )
+    if "price_counts" in data:
+        options["price_counts"] = data["price_counts"]
+    if "tick_interval" in data:
+        options["tick_interval"] = data["tick_interval"]
+    if "adaptive_tick" in data:
+        options["adaptive_tick"] = bool(data["adaptive_tick"])
+    if "paper" in data:
+        options["paper"] = bool(data["paper"])
+    if "strategy" in data:
+        options["strategy"] = data["strategy"]
+    return options
+
+
 @app.route("/start_work", methods=["GET"])
 def start_work_endpoint():
-    t = threading.Thread(
-        target=services.stat_work,
-        kwargs=dict(uow=unit_of_work.SqlAlchemyUnitOfWork()),
-    )
-    t.start()
+    if not runners.start():
+        return {"message": "already working."}, 200
     return {"message": "start work!"}, 201
+
+
+@app.route("/runners", methods=["GET"])
+def list_runners_endpoint():
+    return {"runners": [runner.as_dict() for runner in runners.list_runners()]}
+
+
+@app.route("/runners/start", methods=["POST"])
+def start_runners_endpoint():
+    count = int((request.json or {}).get("count", 1))  # type: ignore
+    started = runners.start(count)
+    if not started:
+        return {"message": "runners are already running."}, 400
+    return {"runners": [runner.as_dict() for runner in started]}, 201
+
+
+@app.route("/runners/scale", methods=["POST"])
+def scale_runners_endpoint():
+    count = int(request.json["count"])  # type: ignore
+    if count < 0:
+        return {"message": "count must not be negative."}, 400
+    try:
+        runners.scale(count)
+    except RunnersStillAlive as e:
+        return {"message": str(e)}, 409
+    return {"runners": [runner.as_dict() for runner in runners.list_runners()]}
+
+
+@app.route("/runners/stop", methods=["POST"])
+def stop_runners_endpoint():
+    stopped = runners.stop()
+    return {"stopped": [runner.runner_id for runner in stopped]}
+
+
+@app.route("/workers", methods=["GET"])
+def list_workers_endpoint():
+    results = list()
+    with unit_of_work.SqlAlchemyUnitOfWork() as uow:
+        for status in WorkerStatus:
+            for worker in uow.workers.list_by_status(status=status):
+                tick = runners.get_tick(worker.worker_id)
+                results.append(
+                    dict(
+                        worker_id=worker.worker_id,
+                        market=worker.market,
+                        exchange=worker.exchange,
+                        status=WorkerStatus(worker.status).name,
+                        budget=str(worker.budget),
+                        paper=bool(worker.paper),
+                        strategy=worker.strategy,
+                        tick_interval=worker.get_tick_interval(),
+                        last_ticked_at=tick.ticked_at.isoformat() if tick else None,
+                        last_tick_latency=tick.latency if tick else None,
+                    )
+                )
+    return {"workers": results}
+
+
+@app.route("/workers/archive", methods=["POST"])
+def archive_workers_endpoint():
+    archived = services.archive_finished_workers(unit_of_work.SqlAlchemyUnitOfWork())
+    return {"archived": archived}
+
+
+@app.route("/reports/workers", methods=["GET"])
+def worker_reports_endpoint():
+    reports = views.worker_reports(market=request.args.get("market"))
+    return {"workers": [_report_dict(report) for report in reports]}
+
+
+@app.route("/reports/workers/<worker_id>", methods=["GET"])
+def worker_report_endpoint(worker_id: str):
+    report = views.worker_report(worker_id)
+    if report is None:
+        return {"message": f"No report of worker.({worker_id})"}, 404
+    return _report_dict(report)
+
+
+@app.route("/reports/markets", methods=["GET"])
+def market_reports_endpoint():
+    return {"markets": [asdict(report) for report in views.market_reports()]}
+
+
+def _report_dict(report: WorkerReport) -> Dict[str, Any]:
+    data = asdict(report)
+    data["status"] = WorkerStatus(report.status).name
+    data["updated_at"] = report.updated_at.isoformat() if report.updated_at else None
+    return data
+
+
+@app.route("/coalescing", methods=["GET"])
+def coalescing_stats_endpoint():
+    return {
+        "stats": {
+            method: asdict(stats)
+            for method, stats in single_flight.single_flight.stats().items()
+        }
+    }
+
+
+@app.route("/runners/events", methods=["GET"])
+def runner_events_endpoint():
+    subscriber = runners.subscribe()
+
+    def stream():
+        try:
+            for runner in runners.list_runners():
+                yield _sse("runner", runner.as_dict())
+            for tick in runners.list_ticks():
+                data = asdict(tick)
+                data["ticked_at"] = tick.ticked_at.isoformat()
+                yield _sse("tick", data)
+            while True:
+                try:
+                    event = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield _sse(event["event"], event["data"])
+        finally:
+            runners.unsubscribe(subscriber)
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
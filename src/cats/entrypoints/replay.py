@@ -0,0 +1,94 @@
+"""
+Replays exchange traffic recorded with RECORD_EXCHANGE_PATH through the
+workers and the scheduler, offline.
+
+    python -m cats.entrypoints.replay traffic.jsonl.gz --speed 10
+
+Workers are copied from the database into memory, so nothing is written back.
+The latency of ticks and the final state of every worker are printed as JSON,
+to be compared between code versions.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from cats.domain.constants import WorkerStatus
+from cats.domain.models.recording import Recording, replaying
+from cats.domain.models.worker import Worker
+from cats.service_layer import services
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork
+
+# Tick interval of the workers when the recording is replayed at once.
+INSTANT_TICK_INTERVAL = 0.001
+
+
+def replay(
+    recording: Recording, uow: InMemoryUnitOfWork, speed: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Ticks the workers of `uow` until the recording runs out. `speed` divides
+    both the recorded call durations and the tick intervals of the workers.
+    """
+    for worker in uow.workers.list_all():
+        worker.tick_interval = (
+            worker.get_tick_interval() / speed if speed else INSTANT_TICK_INTERVAL
+        )
+    latencies: List[float] = []
+    stop_event = threading.Event()
+
+    def on_tick(worker: Worker, latency: float):
+        latencies.append(latency)
+        if not len(recording):
+            stop_event.set()
+
+    with replaying(recording, speed=speed):
+        services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+    return dict(
+        ticks=len(latencies),
+        latency=_percentiles(latencies),
+        unused_calls=len(recording),
+        workers={
+            worker.worker_id: dict(
+                status=WorkerStatus(worker.status).name,
+                budget=str(worker.budget),
+                balance=worker.balance,
+                orders=sorted(order.order_id for order in worker.orders),
+            )
+            for worker in uow.workers.list_all()
+        },
+    )
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+        for p in (50, 90, 99)
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded exchange traffic")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    from cats.adapters.orm import start_mappers
+    from cats.service_layer.unit_of_work import SqlAlchemyUnitOfWork
+
+    start_mappers()
+    uow = InMemoryUnitOfWork.load(SqlAlchemyUnitOfWork())
+    report = replay(Recording.load(args.path), uow, speed=args.speed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Soak test harness. Runs the Flask app and its work runners against the local
+Upbit stub server and periodically reports throughput and resource growth.
+
+    python -m cats.entrypoints.soak --duration 14400 --report-interval 60
+
+The database is taken from `cats.config.get_engine()`.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import requests  # type: ignore
+from werkzeug.serving import make_server, BaseWSGIServer
+
+from cats import config
+from cats.domain.constants import Exchange, Market, DEFAULT_BUDGET
+from cats.entrypoints import upbit_stub
+
+
+def serve(app, port: int) -> BaseWSGIServer:
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class SoakReport:
+    def __init__(self, stub: upbit_stub.StubExchange, top: int = 5):
+        self.stub = stub
+        self.top = top
+        self.started_at = time.monotonic()
+        self.base_rss = get_rss_kb()
+        self.base_threads = threading.active_count()
+        self.base_objects = len(gc.get_objects())
+        self.base_snapshot = tracemalloc.take_snapshot()
+        self._last_requests: Dict[str, int] = dict()
+        self._last_at = self.started_at
+
+    def report(self) -> str:
+        now = time.monotonic()
+        stats = self.stub.stats.as_dict()
+        total = sum(stats["requests"].values())
+        last_total = sum(self._last_requests.values())
+        interval_rps = (total - last_total) / max(now - self._last_at, 1e-9)
+        self._last_requests, self._last_at = stats["requests"], now
+
+        threads = threading.active_count()
+        lines = [
+            f"[{now - self.started_at:8.0f}s] requests={total} "
+            f"rps={interval_rps:.2f} avg_rps={total / (now - self.started_at):.2f} "
+            f"responses={stats['responses']}",
+            f"  rss_growth={get_rss_kb() - self.base_rss}kB "
+            f"threads={threads} (+{threads - self.base_threads}) "
+            f"gc_objects_growth={len(gc.get_objects()) - self.base_objects}",
+        ]
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.compare_to(self.base_snapshot, "lineno")[: self.top]:
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Soak test against the Upbit stub")
+    parser.add_argument("--duration", type=float, default=4 * 60 * 60)
+    parser.add_argument("--report-interval", type=float, default=60.0)
+    parser.add_argument("--runners", type=int, default=1)
+    parser.add_argument("--app-port", type=int, default=5006)
+    parser.add_argument("--stub-port", type=int, default=5100)
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--stub-latency", type=float, default=0.0)
+    parser.add_argument("--stub-fill-delay", type=float, default=5.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    tracemalloc.start()
+
+    stub_app = upbit_stub.create_app(
+        upbit_stub.StubConfig(
+            latency=args.stub_latency,
+            fill_delay=args.stub_fill_delay,
+            error_rate=args.stub_error_rate,
+        )
+    )
+    stub_server = serve(stub_app, args.stub_port)
+    os.environ["UPBIT_HOST"] = f"http://127.0.0.1:{args.stub_port}/v1"
+
+    from cats.adapters.orm import metadata
+    from cats.entrypoints.flask_app import app
+
+    metadata.create_all(config.get_engine())
+    app_server = serve(app, args.app_port)
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    for market in Market:
+        r = requests.post(
+            f"{app_url}/add_worker",
+            json=dict(market=market, budget=args.budget, exchange=Exchange.UPBIT),
+        )
+        print(f"add_worker {market.value}: {r.status_code} {r.json()}")
+    requests.post(f"{app_url}/runners/scale", json=dict(count=args.runners))
+
+    report = SoakReport(stub_app.config["STUB_EXCHANGE"])
+    deadline = time.monotonic() + args.duration
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(min(args.report_interval, max(deadline - time.monotonic(), 0)))
+            print(report.report(), flush=True)
+    finally:
+        app_server.shutdown()
+        stub_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Local Upbit compatible stub server.
+
+    python -m cats.entrypoints.upbit_stub --port 5100 --latency 0.05
+
+Point `UpbitExchangeAPI` at it with `UPBIT_HOST=http://localhost:5100/v1`.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import jwt  # type: ignore
+from flask import Flask, Response, jsonify, request
+
+from cats.domain.constants import Market, OrderStatus, OrderType, PriceUnit
+from cats.domain.models.exchange_api import KST, APIError, to_kst
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.order import Order
+from cats.domain.models.rate_limit import RateLimiter
+from cats.domain.models.upbit_api import (
+    DEFAULT_UPBIT_ACCESS_KEY,
+    DEFAULT_UPBIT_SECRET_KEY,
+    UPBIT_RATE_LIMITS,
+)
+from cats.domain.values import Price
+
+SIDES = {OrderType.BUY: "bid", OrderType.SELL: "ask"}
+STATES = {
+    OrderStatus.WAIT: "wait",
+    OrderStatus.DONE: "done",
+    OrderStatus.CANCEL: "cancel",
+}
+MINUTE_UNITS = {1: PriceUnit.MINUTE, 60: PriceUnit.HOUR}
+DEFAULT_RATE_LIMITS = UPBIT_RATE_LIMITS
+
+
+@dataclass
+class StubConfig:
+    access_key: str = DEFAULT_UPBIT_ACCESS_KEY
+    secret_key: str = DEFAULT_UPBIT_SECRET_KEY
+    rate_limits: Dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_RATE_LIMITS)
+    )
+    latency: float = 0.0
+    seed: int = 0
+    initial_balance: float = 10.0
+    fill_delay: float = 0.0
+    fill_ratio: float = 1.0
+    error_rate: float = 0.0
+
+
+class StubStats:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.requests: Counter = Counter()
+        self.responses: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, status_code: int) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.responses[status_code] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(
+                elapsed=time.monotonic() - self.started_at,
+                requests=dict(self.requests),
+                responses={str(k): v for k, v in self.responses.items()},
+            )
+
+
+class StubExchange:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.stats = StubStats()
+        self._apis: Dict[str, FakeExchangeAPI] = dict()
+        self._order_markets: Dict[str, str] = dict()
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = dict()
+        self._lock = threading.RLock()
+
+    def get_api(self, market: str) -> FakeExchangeAPI:
+        with self._lock:
+            if market not in self._apis:
+                try:
+                    fiat, code = market.split("-")
+                    coin = Market(code)
+                except ValueError:
+                    raise StubError(404, "market_does_not_exist", market)
+                self._apis[market] = FakeExchangeAPI(
+                    coin,
+                    seed=self.config.seed,
+                    initial_balance=self.config.initial_balance,
+                    fill_delay=self.config.fill_delay,
+                    fill_ratio=self.config.fill_ratio,
+                    error_rate=self.config.error_rate,
+                )
+            return self._apis[market]
+
+    def get_api_by_order(self, order_id: str) -> FakeExchangeAPI:
+        with self._lock:
+            if order_id not in self._order_markets:
+                raise StubError(404, "order_not_found", order_id)
+            return self._apis[self._order_markets[order_id]]
+
+    def add_order(self, market: str, order: Order) -> None:
+        with self._lock:
+            self._order_markets[order.order_id] = market
+
+    def acquire(self, group: str, client: str) -> None:
+        rate = self.config.rate_limits.get(group)
+        if not rate:
+            return
+        with self._lock:
+            key = (group, client)
+            if key not in self._limiters:
+                self._limiters[key] = RateLimiter(rate=rate)
+            limiter = self._limiters[key]
+        if not limiter.try_acquire():
+            raise StubError(429, "too_many_requests", f"{group} rate limit exceeded")
+
+
+class StubError(Exception):
+    def __init__(self, status_code: int, name: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.name = name
+        self.message = message
+
+
+def create_app(config: Optional[StubConfig] = None) -> Flask:
+    exchange = StubExchange(config or StubConfig())
+    app = Flask(__name__)
+    app.config["STUB_EXCHANGE"] = exchange
+
+    @app.before_request
+    def simulate_latency():
+        if exchange.config.latency:
+            time.sleep(exchange.config.latency)
+
+    @app.after_request
+    def record_stats(response: Response):
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        exchange.stats.record(f"{request.method} {endpoint}", response.status_code)
+        return response
+
+    @app.errorhandler(StubError)
+    def handle_stub_error(e: StubError):
+        return {"error": {"name": e.name, "message": e.message}}, e.status_code
+
+    @app.errorhandler(APIError)
+    def handle_api_error(e: APIError):
+        return {"error": {"name": "server_error", "message": str(e)}}, 500
+
+    def authorize(group: str) -> None:
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Bearer "):
+            raise StubError(401, "jwt_verification", "Authorization is required.")
+        try:
+            payload = jwt.decode(
+                header.replace("Bearer ", "", 1),
+                exchange.config.secret_key,
+                algorithms=["HS256"],
+            )
+        except jwt.InvalidTokenError as e:
+            raise StubError(401, "jwt_verification", str(e))
+        if payload.get("access_key") != exchange.config.access_key:
+            raise StubError(401, "invalid_access_key", "Unknown access key.")
+
+        query_string = request.query_string
+        if query_string:
+            candidates = {
+                hashlib.sha512(query_string).hexdigest(),
+                hashlib.sha512(unquote(query_string.decode()).encode()).hexdigest(),
+            }
+            if payload.get("query_hash") not in candidates:
+                raise StubError(401, "invalid_query_payload", "Query hash mismatch.")
+        exchange.acquire(group, payload["access_key"])
+
+    @app.route("/v1/orders", methods=["POST"], strict_slashes=False)
+    def post_orders():
+        authorize("order")
+        market = request.args["market"]
+        side = request.args["side"]
+        volume = float(request.args["volume"])
+        price = float(request.args["price"])
+        api = exchange.get_api(market)
+        if side == "bid":
+            order = api.buy_order(
+                price=price, budget=volume * price / (1 - api.fee_rate)  # type: ignore
+            )
+        elif side == "ask":
+            if api.get_balance() < volume:
+                raise StubError(400, "insufficient_funds_ask", "Not enough balance.")
+            order = api.sell_order(price=price, volume=volume)
+        else:
+            raise StubError(400, "invalid_side", side)
+        exchange.add_order(market, order)
+        return _order_to_json(market, order), 201
+
+    @app.route("/v1/orders", methods=["GET"], strict_slashes=False)
+    def get_orders():
+        authorize("default")
+        market = request.args["market"]
+        uuids = request.args.getlist("uuids[]")
+        states = set(request.args.getlist("states[]") or ["wait"])
+        limit = int(request.args.get("limit", 100))
+        orders = exchange.get_api(market).get_orders(uuids)
+        results = [
+            _order_to_json(market, order)
+            for order in orders
+            if STATES[order.status] in states
+        ]
+        return jsonify(results[:limit])
+
+    @app.route("/v1/order", methods=["DELETE"], strict_slashes=False)
+    def delete_order():
+        authorize("order")
+        order_id = request.args["uuid"]
+        api = exchange.get_api_by_order(order_id)
+        order = api.get_orders([order_id])[0]
+        if order.status != OrderStatus.WAIT:
+            raise StubError(400, "order_not_found", "Order is not waiting.")
+        api.cancel_order(order_id)
+        market = f"KRW-{api.market}"
+        return _order_to_json(market, order)
+
+    @app.route("/v1/orders/chance", methods=["GET"])
+    def get_orders_chance():
+        authorize("default")
+        market = request.args["market"]
+        api = exchange.get_api(market)
+        locked = api.get_locked_balance()
+        balance = api.get_balance() + locked
+        return dict(
+            bid_fee=str(api.fee_rate),
+            ask_fee=str(api.fee_rate),
+            market=dict(id=market, name=market.split("-")[1], state="active"),
+            bid_account=dict(currency="KRW", balance="0.0", locked="0.0"),
+            ask_account=dict(
+                currency=market.split("-")[1],
+                balance=str(balance),
+                locked=str(locked),
+            ),
+        )
+
+    @app.route("/v1/candles/minutes/<int:unit>", methods=["GET"])
+    def get_candles_minutes(unit: int):
+        exchange.acquire("quotation", request.remote_addr or "")
+        if unit not in MINUTE_UNITS:
+            raise StubError(400, "invalid_unit", str(unit))
+        return _candles(MINUTE_UNITS[unit], unit)
+
+    @app.route("/v1/candles/days", methods=["GET"], strict_slashes=False)
+    def get_candles_days():
+        exchange.acquire("quotation", request.remote_addr or "")
+        return _candles(PriceUnit.DAY, None)
+
+    @app.route("/v1/orderbook", methods=["GET"])
+    def get_orderbook():
+        exchange.acquire("quotation", request.remote_addr or "")
+        market = request.args["markets"]
+        book = exchange.get_api(market).get_orderbook()
+        return jsonify(
+            [
+                dict(
+                    market=market,
+                    timestamp=_to_timestamp(book.date_time),
+                    total_ask_size=sum(size for _, size in book.asks),
+                    total_bid_size=sum(size for _, size in book.bids),
+                    orderbook_units=[
+                        dict(
+                            ask_price=ask[0],
+                            bid_price=bid[0],
+                            ask_size=ask[1],
+                            bid_size=bid[1],
+                        )
+                        for ask, bid in zip(book.asks, book.bids)
+                    ],
+                )
+            ]
+        )
+
+    @app.route("/_stats", methods=["GET"])
+    def get_stats():
+        return exchange.stats.as_dict()
+
+    def _candles(price_unit: PriceUnit, unit: Optional[int]):
+        market = request.args["market"]
+        count = min(int(request.args.get("count", 1)), 200)
+        to = _parse_to(request.args.get("to"))
+        prices = exchange.get_api(market).get_prices(price_unit, count, to)
+        return jsonify([_price_to_json(market, price, unit) for price in prices])
+
+    return app
+
+
+def _to_timestamp(kst: datetime) -> int:
+    return int((kst - KST).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _parse_to(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        to = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise StubError(400, "validation_error", f"invalid to.({value})")
+    if to.tzinfo:
+        to = to_kst(to)
+    else:
+        to += KST
+    # `to` is exclusive while the fake exchange includes it.
+    return to - timedelta(seconds=1)
+
+
+def _order_to_json(market: str, order: Order) -> dict:
+    return dict(
+        uuid=order.order_id,
+        side=SIDES[order.type],
+        ord_type="limit",
+        price=str(order.price),
+        state=STATES[order.status],
+        market=market,
+        created_at=order.ordered_time.isoformat(),
+        volume=str(order.ordered_volume),
+        remaining_volume=str(order.ordered_volume - order.executed_volume),
+        paid_fee=str(order.paid_fee),
+        executed_volume=str(order.executed_volume),
+        trades_count=1 if order.executed_volume else 0,
+    )
+
+
+def _price_to_json(market: str, price: Price, unit: Optional[int]) -> dict:
+    candle = dict(
+        market=market,
+        candle_date_time_utc=(price.date_time - KST).isoformat(),
+        candle_date_time_kst=price.date_time.isoformat(),
+        opening_price=price.trade_price,
+        high_price=price.high_price,
+        low_price=price.low_price,
+        trade_price=price.trade_price,
+        timestamp=int(price.date_time.timestamp() * 1000),
+    )
+    if unit is not None:
+        candle["unit"] = unit
+    return candle
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upbit compatible stub server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument(
+        "--order-rate", type=float, default=DEFAULT_RATE_LIMITS["order"]
+    )
+    parser.add_argument(
+        "--default-rate", type=float, default=DEFAULT_RATE_LIMITS["default"]
+    )
+    parser.add_argument(
+        "--quotation-rate", type=float, default=DEFAULT_RATE_LIMITS["quotation"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fill-delay", type=float, default=0.0)
+    parser.add_argument("--fill-ratio", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+def make_config(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        rate_limits=dict(
+            order=args.order_rate,
+            default=args.default_rate,
+            quotation=args.quotation_rate,
+        ),
+        latency=args.latency,
+        seed=args.seed,
+        fill_delay=args.fill_delay,
+        fill_ratio=args.fill_ratio,
+        error_rate=args.error_rate,
+    )
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    create_app(make_config(arguments)).run(
+        host=arguments.host, port=arguments.port, threaded=True
+    )
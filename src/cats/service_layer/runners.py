@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from cats.domain.models.worker import Worker
+from cats.service_layer import services
+from cats.service_layer.unit_of_work import AbstractUnitOfWork
+
+DEFAULT_TICK_INTERVAL = 1.0
+STOP_TIMEOUT = 10.0
+
+
+class RunnersStillAlive(Exception):
+    """Runners did not stop in time, so new runners would tick their workers too."""
+
+
+@dataclass
+class WorkerTick:
+    worker_id: str
+    market: str
+    status: int
+    runner_id: str
+    ticked_at: datetime
+    latency: float
+
+
+@dataclass
+class Runner:
+    runner_id: str
+    shard_index: int
+    shard_count: int
+    started_at: datetime
+    thread: threading.Thread
+    stop_event: threading.Event
+    ticks: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.thread.is_alive()
+
+    def as_dict(self) -> dict:
+        return dict(
+            runner_id=self.runner_id,
+            shard_index=self.shard_index,
+            shard_count=self.shard_count,
+            started_at=self.started_at.isoformat(),
+            ticks=self.ticks,
+            alive=self.alive,
+            stopping=self.stop_event.is_set(),
+        )
+
+
+class RunnerRegistry:
+    """
+    Tracks the work runner threads of this process. Every runner works on its
+    own shard of the workers, so scaling restarts the runners with new shards.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], AbstractUnitOfWork],
+        tick_interval: float = DEFAULT_TICK_INTERVAL,
+        stop_timeout: float = STOP_TIMEOUT,
+    ):
+        self.uow_factory = uow_factory
+        self.tick_interval = tick_interval
+        self.stop_timeout = stop_timeout
+        self._runners: Dict[str, Runner] = dict()
+        self._ticks: Dict[str, WorkerTick] = dict()
+        self._subscribers: List[queue.Queue] = list()
+        self._lock = threading.Lock()
+        # Serializes start, scale and stop. Runners never take this lock.
+        self._control_lock = threading.Lock()
+
+    def list_runners(self) -> List[Runner]:
+        with self._lock:
+            self._runners = {k: r for k, r in self._runners.items() if r.alive}
+            return list(self._runners.values())
+
+    def list_ticks(self) -> List[WorkerTick]:
+        with self._lock:
+            return list(self._ticks.values())
+
+    def get_tick(self, worker_id: str) -> Optional[WorkerTick]:
+        return self._ticks.get(worker_id)
+
+    def start(self, count: int = 1) -> List[Runner]:
+        with self._control_lock:
+            if self.list_runners():
+                return list()
+            return self._start(count)
+
+    def scale(self, count: int) -> List[Runner]:
+        with self._control_lock:
+            if count == len(self.list_runners()):
+                return list()
+            alive = [runner.runner_id for runner in self._stop() if runner.alive]
+            if alive:
+                # Runners of the old and new shards would place duplicate
+                # orders for the same workers.
+                raise RunnersStillAlive(
+                    f"Runners did not stop in time.({', '.join(alive)})"
+                )
+            return self._start(count)
+
+    def stop(self) -> List[Runner]:
+        with self._control_lock:
+            return self._stop()
+
+    def subscribe(self, maxsize: int = 1000) -> queue.Queue:
+        subscriber: queue.Queue = queue.Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, event: str, data: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(dict(event=event, data=data))
+            except queue.Full:
+                # Slow subscribers lose events instead of blocking runners.
+                pass
+
+    def _stop(self) -> List[Runner]:
+        runners = self.list_runners()
+        for runner in runners:
+            runner.stop_event.set()
+        for runner in runners:
+            runner.thread.join(timeout=self.stop_timeout)
+            self.publish("runner_stopped", runner.as_dict())
+        return runners
+
+    def _start(self, count: int) -> List[Runner]:
+        runners = [self._start_runner(index, count) for index in range(count)]
+        for runner in runners:
+            self.publish("runner_started", runner.as_dict())
+        return runners
+
+    def _start_runner(self, shard_index: int, shard_count: int) -> Runner:
+        runner_id = str(uuid4())
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=self._run,
+            args=(runner_id,),
+            name=f"runner-{shard_index}/{shard_count}",
+            daemon=True,
+        )
+        runner = Runner(
+            runner_id=runner_id,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            started_at=datetime.now(),
+            thread=thread,
+            stop_event=stop_event,
+        )
+        with self._lock:
+            self._runners[runner_id] = runner
+        thread.start()
+        return runner
+
+    def _run(self, runner_id: str) -> None:
+        runner = self._runners[runner_id]
+
+        def on_tick(worker: Worker, latency: float) -> None:
+            runner.ticks += 1
+            tick = WorkerTick(
+                worker_id=worker.worker_id,
+                market=str(getattr(worker.market, "value", worker.market)),
+                status=int(worker.status),
+                runner_id=runner_id,
+                ticked_at=datetime.now(),
+                latency=latency,
+            )
+            self._ticks[worker.worker_id] = tick
+            data = asdict(tick)
+            data["ticked_at"] = tick.ticked_at.isoformat()
+            self.publish("tick", data)
+
+        services.stat_work(
+            uow=self.uow_factory(),
+            stop_event=runner.stop_event,
+            interval=self.tick_interval,
+            shard=(runner.shard_index, runner.shard_count),
+            on_tick=on_tick,
+            until_stopped=True,
+        )
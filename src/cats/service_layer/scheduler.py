@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from cats.domain.constants import WorkerStatus
+from cats.domain.models.worker import Worker
+
+ACTIVE_STATUSES = (WorkerStatus.WATCHING, WorkerStatus.BUYING, WorkerStatus.SELLING)
+# Lower goes first when workers are due at the same time. Every status has its
+# own urgency, so `sync` notices any status change made elsewhere.
+URGENCIES = {
+    WorkerStatus.BUYING: 0,
+    WorkerStatus.SELLING: 1,
+    WorkerStatus.WATCHING: 2,
+}
+
+# (due time, urgency, sequence, worker id)
+Entry = Tuple[float, int, int, str]
+
+
+class WorkerScheduler:
+    """
+    Priority queue of workers by the time they are due next. A worker is due
+    again a tick interval after its last tick, so workers holding live orders,
+    whose interval is capped, come back sooner than watching workers and go
+    first on ties. Finished workers leave the queue.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Entry] = list()
+        # Latest entry of every worker. Older heap entries are skipped.
+        self._entries: Dict[str, Entry] = dict()
+        self._workers: Dict[str, Worker] = dict()
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync(self, workers: Iterable[Worker]) -> None:
+        """Schedules new workers now and drops the ones not given."""
+        workers = {worker.worker_id: worker for worker in workers}
+        for worker_id in set(self._entries) - set(workers):
+            self._remove(worker_id)
+        now = self.clock()
+        for worker_id, worker in workers.items():
+            self._workers[worker_id] = worker
+            entry = self._entries.get(worker_id)
+            urgency = get_urgency(worker)
+            if urgency is None:
+                self._remove(worker_id)
+            elif entry is None:
+                self._push(worker, now)
+            elif entry[1] != urgency:
+                # The status changed elsewhere, the new deadline may be sooner.
+                self._push(worker, min(entry[0], now + worker.get_tick_interval()))
+
+    def pop_due(self) -> List[Worker]:
+        """Workers due now, the most overdue and urgent first."""
+        now = self.clock()
+        due = list()
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._entries.get(entry[3]) is entry:
+                del self._entries[entry[3]]
+                due.append(self._workers[entry[3]])
+        return due
+
+    def next_due(self) -> Optional[float]:
+        while self._heap and self._entries.get(self._heap[0][3]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def reschedule(self, worker: Worker) -> None:
+        """Schedules the next tick of a worker that has just ticked."""
+        if get_urgency(worker) is None:
+            self._remove(worker.worker_id)
+            return
+        self._push(worker, self.clock() + worker.get_tick_interval())
+
+    def _push(self, worker: Worker, due: float) -> None:
+        self._sequence += 1
+        entry = (due, get_urgency(worker) or 0, self._sequence, worker.worker_id)
+        self._entries[worker.worker_id] = entry
+        self._workers[worker.worker_id] = worker
+        heapq.heappush(self._heap, entry)
+
+    def _remove(self, worker_id: str) -> None:
+        self._entries.pop(worker_id, None)
+        self._workers.pop(worker_id, None)
+
+
+def get_urgency(worker: Worker) -> Optional[int]:
+    return URGENCIES.get(WorkerStatus(worker.status))
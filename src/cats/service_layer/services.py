@@ -1,28 +1,231 @@
+import logging
+import threading
 import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from cats.domain.constants import WorkerStatus
-from cats.domain.models.worker import Worker, work
+from cats.domain.constants import Market, PriceUnit, WorkerStatus
+from cats.domain.events import WorkerState
+from cats.domain.models.exchange_registry import exchange_apis
+from cats.domain.models.portfolio import portfolio
+from cats.domain.models.strategy import evaluate_workers, strategies
+from cats.domain.models.worker import Worker, prepare, work
+from cats.domain.reports import WorkerReport
+from cats.domain.values import BudgetLadder
+from cats.service_layer.scheduler import ACTIVE_STATUSES, WorkerScheduler
 from cats.service_layer.unit_of_work import AbstractUnitOfWork
 
+logger = logging.getLogger(__name__)
+
 
 class WorkerDuplicated(Exception):
     pass
 
 
+class InvalidWorker(Exception):
+    pass
+
+
 def add_worker(worker: Worker, uow: AbstractUnitOfWork):
+    message = validate_worker(worker)
+    if message:
+        raise InvalidWorker(message)
     with uow:
         if uow.workers.check_duplicate(market=worker.market):
             raise WorkerDuplicated(f"{worker.market} is already working.")
         uow.workers.add(worker=worker)
+        if uow.events:
+            uow.events.save_snapshot(WorkerState.of(worker))
         uow.commit()
 
 
-def stat_work(uow: AbstractUnitOfWork) -> None:
+@dataclass
+class AddWorkerResult:
+    index: int
+    market: str
+    worker_id: Optional[str]
+    ok: bool
+    message: str = ""
+
+
+def add_workers(
+    workers: List[Worker], uow: AbstractUnitOfWork
+) -> List[AddWorkerResult]:
+    results = [
+        AddWorkerResult(
+            index=index,
+            market=_market_value(worker.market),
+            worker_id=worker.worker_id,
+            ok=True,
+        )
+        for index, worker in enumerate(workers)
+    ]
+    first_indexes: Dict[str, int] = dict()
+    for worker, result in zip(workers, results):
+        message = validate_worker(worker)
+        if not message and result.market in first_indexes:
+            index = first_indexes[result.market]
+            message = f"{result.market} is duplicated with item {index}."
+        if message:
+            _reject(result, message)
+        else:
+            first_indexes[result.market] = result.index
+
     with uow:
-        while watching_workers := uow.workers.list_by_status(
-            status=WorkerStatus.WATCHING
-        ):
-            for worker in watching_workers:
-                work(worker)
+        valid = [worker for worker, result in zip(workers, results) if result.ok]
+        duplicates = uow.workers.find_duplicates(
+            markets=[worker.market for worker in valid]
+        )
+        for worker, result in zip(workers, results):
+            if result.ok and result.market in duplicates:
+                _reject(result, f"{result.market} is already working.")
+        created = [worker for worker, result in zip(workers, results) if result.ok]
+        if created:
+            uow.workers.add_all(created)
+            if uow.events:
+                for worker in created:
+                    uow.events.save_snapshot(WorkerState.of(worker))
+            uow.commit()
+    return results
+
+
+def validate_worker(worker: Worker) -> str:
+    if _market_value(worker.market) not in Market.__members__:
+        return f"Invalid market.({_market_value(worker.market)})"
+    for exchange in [worker.exchange] + worker.venues.split(","):
+        if exchange and exchange not in exchange_apis:
+            return f"Unsupported exchange.({_market_value(exchange)})"
+    if not isinstance(worker.budget, BudgetLadder) or not worker.budget:
+        return f"Invalid budget.({worker.budget})"
+    if worker.price_unit not in list(PriceUnit):
+        return f"Invalid price unit.({worker.price_unit})"
+    if not isinstance(worker.price_counts, int) or worker.price_counts <= 0:
+        return f"Invalid price counts.({worker.price_counts})"
+    tick_interval = worker.tick_interval
+    if not isinstance(tick_interval, (int, float)) or tick_interval <= 0:
+        return f"Invalid tick interval.({worker.tick_interval})"
+    if worker.strategy not in strategies:
+        return f"Unknown strategy.({worker.strategy})"
+    return ""
+
+
+def _reject(result: AddWorkerResult, message: str) -> None:
+    result.ok = False
+    result.worker_id = None
+    result.message = message
+
+
+def _market_value(market: object) -> str:
+    return str(getattr(market, "value", market))
+
+
+def stat_work(
+    uow: AbstractUnitOfWork,
+    stop_event: Optional[threading.Event] = None,
+    interval: float = 1.0,
+    shard: Tuple[int, int] = (0, 1),
+    on_tick: Optional[Callable[[Worker, float], None]] = None,
+    until_stopped: bool = False,
+) -> None:
+    stop_event = stop_event or threading.Event()
+    scheduler = WorkerScheduler()
+    with uow:
+        # Exposure of every stored worker counts from the first tick on, not
+        # only once each of them ticked in this process.
+        portfolio.seed(
+            worker
+            for status in ACTIVE_STATUSES
+            for worker in uow.workers.list_by_status(status=status)
+        )
+        while not stop_event.is_set():
+            scheduler.sync(
+                worker
+                for status in ACTIVE_STATUSES
+                for worker in uow.workers.list_by_status(status=status)
+                if in_shard(worker, shard) and not worker.is_quarantined()
+            )
+            if not len(scheduler):
+                if not until_stopped:
+                    return
                 uow.commit()
-                time.sleep(1)
+                stop_event.wait(interval)
+                continue
+            due_workers = scheduler.pop_due()
+            if not due_workers:
+                uow.commit()
+                next_due = scheduler.next_due() or time.monotonic()
+                if stop_event.wait(next_due - time.monotonic()):
+                    return
+                continue
+            # Workers are refreshed first, so that the signals of all of
+            # them are evaluated in one batch per strategy.
+            latencies: Dict[str, float] = dict()
+            prepared = list()
+            for worker in due_workers:
+                started_at = time.perf_counter()
+                if _tick(uow, worker, prepare):
+                    prepared.append(worker)
+                latencies[worker.worker_id] = time.perf_counter() - started_at
+            signals = dict(zip(prepared, evaluate_workers(prepared)))
+            # Orders are placed right after the evaluation, so the batch runs
+            # without pauses and no worker acts on stale signals and prices.
+            for worker in due_workers:
+                started_at = time.perf_counter()
+                if worker in signals:
+                    _tick(uow, worker, lambda w: work(w, signals[w]))
+                scheduler.reschedule(worker)
+                if on_tick:
+                    latency = latencies[worker.worker_id]
+                    on_tick(worker, latency + time.perf_counter() - started_at)
+                if stop_event.is_set():
+                    return
+            # Batches are paced by `interval`, but never past the next due
+            # worker, so workers holding orders keep their tick interval.
+            next_due = scheduler.next_due()
+            if next_due is not None:
+                interval_left = min(interval, next_due - time.monotonic())
+            else:
+                interval_left = interval
+            if stop_event.wait(max(interval_left, 0.0)):
+                return
+
+
+def _tick(uow: AbstractUnitOfWork, worker: Worker, func: Callable[[Worker], Any]):
+    before = WorkerState.of(worker) if uow.events else None
+    try:
+        result = func(worker)
+        if uow.events and before:
+            events = uow.events.record(before, worker)
+            if events and uow.reports:
+                uow.reports.save(WorkerReport.of(worker))
+    except Exception as e:
+        # A broken worker must not stop the other workers.
+        logger.exception("work failed worker_id=%s", worker.worker_id)
+        uow.rollback()
+        worker.record_failure(e)
+        result = False
+    uow.commit()
+    return result
+
+
+def archive_finished_workers(
+    uow: AbstractUnitOfWork, archived_at: Optional[datetime] = None
+) -> int:
+    """Moves finished workers and their orders to the archive of `uow`."""
+    archived_at = archived_at or datetime.now()
+    with uow:
+        if uow.archive is None:
+            return 0
+        workers = uow.workers.list_by_status(status=WorkerStatus.FINISHED)
+        for worker in workers:
+            uow.archive.add(worker, archived_at)
+            uow.workers.remove(worker.worker_id)
+        uow.commit()
+    return len(workers)
+
+
+def in_shard(worker: Worker, shard: Tuple[int, int]) -> bool:
+    index, count = shard
+    return count <= 1 or zlib.crc32(worker.worker_id.encode()) % count == index
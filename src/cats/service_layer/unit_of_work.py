@@ -1,16 +1,41 @@
 from __future__ import annotations
+import time
 from abc import ABC, abstractmethod
-from typing import Callable
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Set
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from cats import config
-from cats.adapters.repository import AbstractRepository, SqlAlchemyRepository
+from cats.adapters.archive import AbstractArchive, InMemoryArchive, SqlAlchemyArchive
+from cats.adapters.event_store import (
+    AbstractEventStore,
+    InMemoryEventStore,
+    SqlAlchemyEventStore,
+)
+from cats.adapters.reporting import (
+    AbstractReportStore,
+    InMemoryReportStore,
+    SqlAlchemyReportStore,
+)
+from cats.adapters.repository import (
+    AbstractRepository,
+    InMemoryRepository,
+    SqlAlchemyRepository,
+    copy_worker,
+)
+from cats.domain.constants import WorkerStatus
+from cats.domain.models.worker import Worker
 
 
 class AbstractUnitOfWork(ABC):
     workers: AbstractRepository
+    # Log of worker events, None when the events are not recorded.
+    events: Optional[AbstractEventStore] = None
+    # History of finished workers, None when they are not archived.
+    archive: Optional[AbstractArchive] = None
+    # Read model of trading results, None when it is not maintained.
+    reports: Optional[AbstractReportStore] = None
 
     def __enter__(self) -> AbstractUnitOfWork:
         return self
@@ -27,11 +52,24 @@ class AbstractUnitOfWork(ABC):
         raise NotImplementedError
 
 
-DEFAULT_SESSION_FACTORY: Callable[..., Session] = sessionmaker(
-    bind=create_engine(
-        config.get_postgres_uri(),
-    )
-)
+@lru_cache(maxsize=None)
+def _get_default_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=config.get_engine())
+
+
+def DEFAULT_SESSION_FACTORY() -> Session:
+    # The engine is created on the first session, not at import time.
+    return _get_default_sessionmaker()()
+
+
+@lru_cache(maxsize=None)
+def _get_read_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=config.get_read_engine())
+
+
+def READ_SESSION_FACTORY() -> Session:
+    # Sessions of the read model, on the replica when one is configured.
+    return _get_read_sessionmaker()()
 
 
 class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
@@ -43,6 +81,9 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
     def __enter__(self):
         self.session: Session = self.session_factory()
         self.workers = SqlAlchemyRepository(self.session)
+        self.events = SqlAlchemyEventStore(self.session)
+        self.archive = SqlAlchemyArchive(self.session)
+        self.reports = SqlAlchemyReportStore(self.session)
         return super().__enter__()
 
     def __exit__(self, *args):
@@ -54,3 +95,72 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
 
     def rollback(self):
         self.session.rollback()
+
+
+class InMemoryUnitOfWork(AbstractUnitOfWork):
+    """
+    Unit of work over workers kept in memory, for simulations and load tests.
+    Workers are live objects, so a rollback only drops the workers added since
+    the last commit.
+
+    With `flush_to`, committed workers are written to that unit of work at
+    most every `flush_interval` seconds, and on `flush()`.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[InMemoryRepository] = None,
+        flush_to: Optional[Callable[[], AbstractUnitOfWork]] = None,
+        flush_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.workers: InMemoryRepository = workers or InMemoryRepository()
+        self.events = InMemoryEventStore()
+        self.archive = InMemoryArchive()
+        self.reports = InMemoryReportStore()
+        self.flush_to = flush_to
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.flushed_at = clock()
+        self._committed = self._get_worker_ids()
+
+    def commit(self):
+        self.workers.reindex()
+        self._committed = self._get_worker_ids()
+        if self.flush_to and self.clock() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def rollback(self):
+        for worker in self.workers.list_all():
+            if worker.worker_id not in self._committed:
+                self.workers.remove(worker.worker_id)
+
+    def flush(self):
+        if not self.flush_to:
+            return
+        snapshot = self.workers.snapshot()
+        with self.flush_to() as uow:
+            uow.workers.save_all(snapshot.values())
+            uow.commit()
+        self.flushed_at = self.clock()
+
+    def snapshot(self) -> Dict[str, Worker]:
+        return self.workers.snapshot()
+
+    def restore(self, snapshot: Dict[str, Worker]):
+        self.workers.restore(snapshot)
+        self._committed = set(snapshot)
+
+    @classmethod
+    def load(cls, uow: AbstractUnitOfWork, **kwargs) -> InMemoryUnitOfWork:
+        """Copies every worker of `uow` into memory."""
+        with uow:
+            workers = InMemoryRepository(
+                copy_worker(worker)
+                for status in WorkerStatus
+                for worker in uow.workers.list_by_status(status)
+            )
+        return cls(workers=workers, **kwargs)
+
+    def _get_worker_ids(self) -> Set[str]:
+        return {worker.worker_id for worker in self.workers.list_all()}
@@ -0,0 +1,34 @@
+"""
+Read-only queries of the reporting model. They never load workers or orders,
+so dashboards do not compete with the trading loop.
+"""
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from cats.adapters.reporting import SqlAlchemyReportStore
+from cats.domain.reports import MarketReport, WorkerReport
+from cats.service_layer.unit_of_work import READ_SESSION_FACTORY
+
+SessionFactory = Callable[[], Session]
+
+
+def worker_reports(
+    market: Optional[str] = None, session_factory: SessionFactory = READ_SESSION_FACTORY
+) -> List[WorkerReport]:
+    with session_factory() as session:
+        return SqlAlchemyReportStore(session).list_workers(market=market)
+
+
+def worker_report(
+    worker_id: str, session_factory: SessionFactory = READ_SESSION_FACTORY
+) -> Optional[WorkerReport]:
+    with session_factory() as session:
+        return SqlAlchemyReportStore(session).get(worker_id)
+
+
+def market_reports(
+    session_factory: SessionFactory = READ_SESSION_FACTORY,
+) -> List[MarketReport]:
+    with session_factory() as session:
+        return SqlAlchemyReportStore(session).list_markets()
@@ -0,0 +1,68 @@
+"""
+Benchmark of exchange response parsing on recorded Upbit responses.
+
+    python tests/benchmarks/bench_parsing.py --repeat 200
+
+The baseline is the former path: the standard library decoder and one `Price`
+per candle.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from cats.domain.constants import Market
+from cats.domain.models.parsing import loads, orjson, parse_candles
+from cats.domain.models.upbit_api import UPBIT_CANDLE_KEYS, UpbitExchangeAPI
+from cats.domain.values import Price
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def baseline_candles(data: bytes) -> List[Price]:
+    return [
+        Price(
+            date_time=datetime.fromisoformat(candle["candle_date_time_kst"]),
+            high_price=float(candle["high_price"]),
+            low_price=float(candle["low_price"]),
+            trade_price=float(candle["trade_price"]),
+        )
+        for candle in json.loads(data)
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response parsing")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    candles = read_fixture("upbit_candles.json")
+    orders = read_fixture("upbit_orders.json")
+    api = UpbitExchangeAPI(Market.ETH)
+    cases: Dict[str, Callable[[], object]] = {
+        "candles baseline": lambda: baseline_candles(candles),
+        "candles columns": lambda: parse_candles(loads(candles), *UPBIT_CANDLE_KEYS),
+        "candles prices": lambda: parse_candles(
+            loads(candles), *UPBIT_CANDLE_KEYS
+        ).to_prices(),
+        "orders baseline": lambda: [api._make_order(o) for o in json.loads(orders)],
+        "orders": lambda: [api._make_order(o) for o in loads(orders)],
+    }
+
+    print(f"decoder: {'orjson' if orjson is not None else 'json'}")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=3))
+        print(f"{name:<20} {seconds / args.repeat * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -137,7 +137,7 @@ def add_worker(postgres_session: Session):
                     worker_id=w.worker_id,
                     market=w.market,
                     status=w.status,
-                    budget=w.budget,
+                    budget=str(w.budget),
                     exchange=w.exchange,
                 ),
             )
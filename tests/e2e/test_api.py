@@ -17,7 +17,7 @@ def test_add_worker_endpoint_returns_400_and_error_message(
 
     data = dict(
         market=worker.market,
-        budget=worker.budget,
+        budget=str(worker.budget),
         exchange=worker.exchange,
     )
     url = config.get_api_url()
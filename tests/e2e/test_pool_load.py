@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pytest
+import requests  # type: ignore
+from sqlalchemy.engine import Engine
+
+from cats import config
+from cats.domain.constants import Exchange
+from cats.domain.models.worker import Worker
+
+
+@pytest.mark.usefixtures("restart_api")
+def test_add_worker_burst_with_runners_stays_within_pool(
+    postgres_db: Engine, get_worker: Callable[..., Worker],
+):
+    url = config.get_api_url()
+    options = config.get_engine_options()
+    pool_limit = options["pool_size"] + options["max_overflow"]
+
+    def add(worker: Worker) -> int:
+        data = dict(
+            market=worker.market, budget=str(worker.budget), exchange=Exchange.FAKE
+        )
+        return requests.post(f"{url}/add_worker", json=data).status_code
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        runners = [executor.submit(requests.get, f"{url}/start_work") for _ in range(5)]
+        codes = list(executor.map(add, [get_worker() for _ in range(100)]))
+
+    assert all(runner.result().status_code in (200, 201) for runner in runners)
+    assert set(codes) <= {201, 400}
+    connections = postgres_db.execute(
+        "SELECT count(*) FROM pg_stat_activity WHERE application_name = 'cats'"
+    ).scalar()
+    assert connections <= pool_limit
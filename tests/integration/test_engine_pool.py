@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, clear_mappers
+from sqlalchemy.pool import QueuePool
+
+from cats.adapters.orm import metadata, start_mappers
+from cats.domain.constants import WorkerStatus
+from cats.domain.models.worker import Worker
+from cats.service_layer import services, unit_of_work
+
+POOL_SIZE = 2
+
+
+def test_concurrent_units_of_work_stay_within_pool(
+    tmp_path, get_worker: Callable[..., Worker]
+):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'cats.db'}",
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=10,
+        connect_args=dict(check_same_thread=False, timeout=10),
+    )
+    metadata.create_all(engine)
+    checked_out, max_checked_out = [0], [0]
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(*args):
+        with lock:
+            checked_out[0] += 1
+            max_checked_out[0] = max(max_checked_out[0], checked_out[0])
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(*args):
+        with lock:
+            checked_out[0] -= 1
+
+    start_mappers()
+    try:
+        session_factory = sessionmaker(bind=engine)
+
+        def add_worker(_):
+            worker = get_worker(status=WorkerStatus.WATCHING)
+            worker.worker_id = f"{worker.worker_id}-{_}"
+            try:
+                services.add_worker(
+                    worker, unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+                )
+            except services.WorkerDuplicated:
+                pass
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(add_worker, range(50)))
+    finally:
+        clear_mappers()
+
+    assert max_checked_out[0] <= POOL_SIZE
+    assert checked_out[0] == 0
@@ -50,7 +50,24 @@ def test_saving_workers(session: Session, get_worker: Callable[..., Worker]):
     session.add(w)
     session.commit()
     rows = session.execute('SELECT * FROM "workers"')
-    assert list(rows) == [(w.worker_id, w.market, w.status, w.budget, w.exchange)]
+    assert list(rows) == [
+        (
+            w.worker_id,
+            w.market,
+            w.status,
+            str(w.budget),
+            w.exchange,
+            w.venues,
+            w.price_unit,
+            w.price_counts,
+            w.tick_interval,
+            w.adaptive_tick,
+            w.failures,
+            w.quarantined_until,
+            w.paper,
+            w.strategy,
+        )
+    ]
 
 
 def test_updating_workers(session: Session, get_worker: Callable[..., Worker]):
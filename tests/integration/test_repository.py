@@ -1,10 +1,19 @@
+from dataclasses import replace
+from datetime import datetime
 from typing import Callable
 
 from sqlalchemy.orm import Session
 
+from cats.adapters.event_store import SqlAlchemyEventStore
+from cats.adapters.orm import order_history, worker_history
+from cats.domain.constants import Market, OrderStatus, WorkerStatus
+from cats.domain.events import WorkerState
+from cats.domain.reports import WorkerReport
 from cats.domain.models.order import Order
 from cats.domain.models.worker import Worker
-from cats.adapters.repository import SqlAlchemyRepository
+from cats.adapters.repository import InMemoryRepository, SqlAlchemyRepository
+from cats.service_layer import services, views
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork, SqlAlchemyUnitOfWork
 
 
 def test_repository_can_save_a_worker(
@@ -17,7 +26,24 @@ def test_repository_can_save_a_worker(
     session.commit()
 
     rows = session.execute('SELECT * FROM "workers"')
-    assert list(rows) == [(w.worker_id, w.market, w.status, w.budget, w.exchange)]
+    assert list(rows) == [
+        (
+            w.worker_id,
+            w.market,
+            w.status,
+            str(w.budget),
+            w.exchange,
+            w.venues,
+            w.price_unit,
+            w.price_counts,
+            w.tick_interval,
+            w.adaptive_tick,
+            w.failures,
+            w.quarantined_until,
+            w.paper,
+            w.strategy,
+        )
+    ]
 
 
 def test_repository_can_retrieve_a_worker_with_orders(
@@ -35,3 +61,129 @@ def test_repository_can_retrieve_a_worker_with_orders(
 
     assert retrieved == w
     assert retrieved.orders == {o}
+
+
+def test_repository_adds_workers_and_finds_duplicates_at_once(
+    session: Session, get_worker: Callable[..., Worker]
+):
+    workers = [
+        get_worker(market=Market.ETH, status=WorkerStatus.WATCHING),
+        get_worker(market=Market.BTC, status=WorkerStatus.FINISHED),
+    ]
+    repo = SqlAlchemyRepository(session)
+    repo.add_all(workers)
+    session.commit()
+
+    assert repo.find_duplicates([Market.ETH, Market.BTC, Market.EOS]) == {"ETH"}
+    assert repo.find_duplicates([]) == set()
+
+
+def test_in_memory_uow_flushes_to_and_loads_from_sql(
+    session_factory, get_worker: Callable[..., Worker], get_order: Callable[..., Order]
+):
+    worker = get_worker(status=WorkerStatus.WATCHING, orders={get_order()})
+    uow = InMemoryUnitOfWork(
+        InMemoryRepository([worker]),
+        flush_to=lambda: SqlAlchemyUnitOfWork(session_factory),
+    )
+
+    uow.flush()
+    worker.status = WorkerStatus.BUYING
+    uow.flush()
+
+    session = session_factory()
+    assert list(session.execute("SELECT status FROM workers")) == [(2,)]
+    assert list(session.execute("SELECT count(*) FROM orders")) == [(1,)]
+
+    loaded = InMemoryUnitOfWork.load(SqlAlchemyUnitOfWork(session_factory))
+    copy = loaded.workers.list_by_status(WorkerStatus.BUYING)[0]
+    assert copy.worker_id == worker.worker_id
+    assert copy.orders == worker.orders
+
+
+def test_worker_events_are_stored_and_rebuilt_from_sql(
+    monkeypatch,
+    session_factory,
+    get_worker: Callable[..., Worker],
+    get_order: Callable[..., Order],
+):
+    monkeypatch.setattr(SqlAlchemyEventStore, "snapshot_events", 2)
+    order = get_order(status=OrderStatus.WAIT)
+    worker = get_worker(status=WorkerStatus.BUYING, orders={order})
+    worker_id, order_id = worker.worker_id, order.order_id
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        uow.workers.add(worker)
+        uow.commit()
+        before = WorkerState.of(worker)
+        order.status = OrderStatus.DONE
+        worker.status = WorkerStatus.SELLING
+        uow.events.record(before, worker)
+        uow.commit()
+        before = WorkerState.of(worker)
+        worker.balance = 1.0
+        uow.events.record(before, worker)
+        uow.commit()
+
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        assert uow.events.get_version(worker_id) == 3
+        assert uow.events.get_snapshot(worker_id).version == 2
+        state = uow.events.rebuild(worker_id)
+
+    assert (state.version, state.status, state.balance) == (3, 3, 1.0)
+    assert state.orders[order_id].status == OrderStatus.DONE
+
+
+def test_finished_workers_are_moved_to_history_tables(
+    session_factory, get_worker: Callable[..., Worker], get_order: Callable[..., Order]
+):
+    finished = get_worker(status=WorkerStatus.FINISHED, orders={get_order()})
+    active = get_worker(status=WorkerStatus.BUYING, orders={get_order()})
+    finished_id, active_id = finished.worker_id, active.worker_id
+    finished_orders = {order.order_id for order in finished.orders}
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        uow.workers.add_all([finished, active])
+        uow.commit()
+
+    archived = services.archive_finished_workers(
+        SqlAlchemyUnitOfWork(session_factory), archived_at=datetime(2021, 3, 1)
+    )
+
+    assert archived == 1
+    session = session_factory()
+    assert list(session.execute("SELECT worker_id FROM workers")) == [(active_id,)]
+    assert list(session.execute("SELECT count(*) FROM orders")) == [(1,)]
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        history = uow.archive.list_workers(period="2021-03")
+        assert [worker.worker_id for worker in history] == [finished_id]
+        assert {order.order_id for order in history[0].orders} == finished_orders
+        assert uow.archive.get(finished_id).status == WorkerStatus.FINISHED
+        assert uow.archive.list_workers(period="2021-04") == []
+        orders = uow.archive.list_orders(worker_id=finished_id)
+        assert {order.order_id for order in orders} == finished_orders
+
+
+def test_history_tables_can_be_partitioned_on_their_period():
+    # Postgres partitions a table only on columns of its primary key.
+    assert set(worker_history.primary_key.columns.keys()) == {"worker_id", "period"}
+    assert set(order_history.primary_key.columns.keys()) == {"order_id", "period"}
+
+
+def test_reports_are_read_without_loading_workers(session_factory):
+    reports = [
+        WorkerReport("a", "ETH", 2, bought=100.0, fills=1, exposure=100.0),
+        WorkerReport("b", "ETH", 3, bought=50.0, fills=2, exposure=20.0),
+        WorkerReport("c", "BTC", 4, bought=10.0, sold=12.0, realized_pnl=2.0),
+    ]
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        for report in reports:
+            uow.reports.save(report)
+        uow.reports.save(replace(reports[0], fills=3))
+        uow.commit()
+
+    assert views.worker_report("a", session_factory).fills == 3
+    assert views.worker_report("x", session_factory) is None
+    eth = views.worker_reports(market="ETH", session_factory=session_factory)
+    assert [report.worker_id for report in eth] == ["a", "b"]
+    btc, eth = views.market_reports(session_factory)
+    assert (btc.market, btc.workers, btc.realized_pnl) == ("BTC", 1, 2.0)
+    assert (eth.market, eth.workers, eth.fills, eth.exposure) == ("ETH", 2, 5, 120.0)
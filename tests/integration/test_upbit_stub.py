@@ -0,0 +1,114 @@
+import threading
+from datetime import timedelta
+from typing import Callable
+
+import pytest
+from werkzeug.serving import make_server
+
+from cats.domain.constants import Market, OrderStatus, PriceUnit
+from cats.domain.models.exchange_api import APIError
+from cats.domain.models.upbit_api import UpbitExchangeAPI
+from cats.entrypoints.backfill import backfill, read_prices, write_prices
+from cats.entrypoints.upbit_stub import StubConfig, create_app
+
+
+@pytest.fixture
+def upbit_stub() -> Callable[..., str]:
+    servers = []
+
+    def _upbit_stub(config: StubConfig = StubConfig()) -> str:
+        server = make_server("127.0.0.1", 0, create_app(config), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/v1"
+
+    yield _upbit_stub
+
+    for server in servers:
+        server.shutdown()
+
+
+def test_upbit_api_trades_against_stub(upbit_stub: Callable[..., str]):
+    api = UpbitExchangeAPI(Market.ETH, host=upbit_stub())
+
+    prices = api.get_prices(price_unit=PriceUnit.HOUR, counts=24)
+    assert len(prices) == 24
+
+    order = api.sell_order(price=prices[0].trade_price, volume=1.0)
+    assert order.status == OrderStatus.WAIT
+
+    orders = api.get_orders([order.order_id])
+    assert [o.status for o in orders] == [OrderStatus.DONE]
+    assert api.get_balance() == 9.0
+
+
+def test_upbit_api_cancels_order_on_stub(upbit_stub: Callable[..., str]):
+    api = UpbitExchangeAPI(Market.ETH, host=upbit_stub(StubConfig(fill_delay=60)))
+    order = api.buy_order(price=1000.0, budget=10000)
+
+    assert api.cancel_order(order.order_id) == order.order_id
+    assert api.get_orders([order.order_id])[0].status == OrderStatus.CANCEL
+
+
+def test_stub_rejects_invalid_jwt(upbit_stub: Callable[..., str]):
+    api = UpbitExchangeAPI(Market.ETH, secret_key="wrong-key", host=upbit_stub())
+    with pytest.raises(APIError, match="jwt_verification"):
+        api.get_balance()
+
+
+def test_stub_enforces_rate_limits(upbit_stub: Callable[..., str]):
+    host = upbit_stub(StubConfig(rate_limits=dict(default=1.0)))
+    api = UpbitExchangeAPI(Market.ETH, host=host)
+
+    api.get_balance()
+    with pytest.raises(APIError, match="too_many_requests"):
+        api.get_balance()
+
+
+def test_upbit_api_pages_candles_with_to_cursor(upbit_stub: Callable[..., str]):
+    api = UpbitExchangeAPI(Market.ETH, host=upbit_stub())
+
+    prices = api.get_prices(price_unit=PriceUnit.MINUTE, counts=450)
+    assert len(prices) == 450
+    assert len({price.date_time for price in prices}) == 450
+    assert prices[0].date_time - prices[-1].date_time == timedelta(minutes=449)
+
+    to = prices[10].date_time
+    assert api.get_prices(price_unit=PriceUnit.MINUTE, counts=5, to=to) == (
+        prices[10:15]
+    )
+
+
+def test_backfill_downloads_candles_from_stub(
+    upbit_stub: Callable[..., str], tmp_path
+):
+    host = upbit_stub()
+    latest = UpbitExchangeAPI(Market.ETH, host=host).get_prices(PriceUnit.HOUR, 1)
+    until = latest[0].date_time
+    since = until - timedelta(hours=499)
+
+    results = backfill(
+        lambda market: UpbitExchangeAPI(market, host=host),
+        [Market.ETH, Market.BTC],
+        PriceUnit.HOUR,
+        since=since,
+        until=until,
+    )
+
+    assert [len(prices) for prices in results.values()] == [500, 500]
+    assert results[Market.ETH][-1].date_time == since
+    path = str(tmp_path / "eth.csv")
+    write_prices(path, results[Market.ETH])
+    assert read_prices(path) == results[Market.ETH]
+
+
+def test_upbit_api_gets_orderbook_from_stub(upbit_stub: Callable[..., str]):
+    api = UpbitExchangeAPI(Market.ETH, host=upbit_stub())
+
+    book = api.get_orderbook(depth=5)
+    price = api.get_prices(price_unit=PriceUnit.MINUTE, counts=1)[0]
+
+    assert len(book.asks) == len(book.bids) == 5
+    assert book.best_bid < price.trade_price < book.best_ask  # type: ignore
+    assert book.date_time - price.date_time < timedelta(minutes=1)
+    assert api.get_quote().ask_price == book.best_ask
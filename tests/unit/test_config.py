@@ -0,0 +1,28 @@
+from sqlalchemy.pool import NullPool, QueuePool
+
+from cats import config
+
+
+def test_engine_options_are_read_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    engine = config.make_engine()
+    options = config.get_engine_options()
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+    assert options["max_overflow"] == 2
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["options"] == "-c statement_timeout=5000"
+
+
+def test_pgbouncer_mode_leaves_pooling_to_pgbouncer(monkeypatch):
+    monkeypatch.setenv("DB_PGBOUNCER", "true")
+
+    engine = config.make_engine()
+    options = config.get_engine_options()
+
+    assert isinstance(engine.pool, NullPool)
+    assert "options" not in options["connect_args"]
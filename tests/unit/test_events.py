@@ -0,0 +1,166 @@
+import json
+from dataclasses import replace
+from datetime import timedelta
+from typing import Callable, List
+
+from cats.adapters.event_store import InMemoryEventStore
+from cats.adapters.repository import InMemoryRepository
+from cats.domain.constants import Exchange, OrderStatus, WorkerStatus
+from cats.domain.events import (
+    BalanceChanged,
+    BudgetSpent,
+    OrderFilled,
+    OrderPlaced,
+    StatusChanged,
+    WorkerState,
+    event_from_dict,
+    event_to_dict,
+    get_events,
+)
+from cats.domain.models.order import Order
+from cats.domain.models.worker import Worker
+from cats.domain.values import BudgetLadder
+from cats.service_layer import services
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork
+
+
+def _fields(state: WorkerState):
+    orders = {
+        order_id: (order.status, order.executed_volume, order.paid_fee)
+        for order_id, order in state.orders.items()
+    }
+    return state.status, state.budget, state.balance, orders
+
+
+def test_events_describe_the_changes_of_a_worker(
+    get_worker: Callable[..., Worker], get_order: Callable[..., Order]
+):
+    filled = get_order(status=OrderStatus.WAIT)
+    worker = get_worker(status=WorkerStatus.BUYING, orders={filled})
+    worker.budget = BudgetLadder((10000, 20000))
+    before = WorkerState.of(worker, version=3)
+
+    filled.status = OrderStatus.DONE
+    placed = get_order(status=OrderStatus.WAIT)
+    placed.executed_volume = placed.paid_fee = 0.0
+    placed.ordered_time = filled.ordered_time + timedelta(minutes=1)
+    worker.orders.add(placed)
+    worker.budget = worker.budget.spend(10000)
+    worker.balance = 1.5
+    worker.status = WorkerStatus.SELLING
+    events = get_events(before, worker)
+
+    assert [type(event) for event in events] == [
+        OrderFilled,
+        OrderPlaced,
+        BudgetSpent,
+        BalanceChanged,
+        StatusChanged,
+    ]
+    assert [event.version for event in events] == [4, 5, 6, 7, 8]
+    assert events[2] == replace(events[2], spent=10000.0, budget="20000")
+    assert get_events(WorkerState.of(worker), worker) == []
+
+    # Events survive serialization and replay to the state of the worker.
+    events = [
+        event_from_dict(json.loads(json.dumps(event_to_dict(event))))
+        for event in events
+    ]
+    state = replace(before, orders={k: replace(o) for k, o in before.orders.items()})
+    for event in events:
+        state.apply(event)
+    assert state.version == 8
+    assert _fields(state) == _fields(WorkerState.of(worker))
+
+
+def test_state_is_rebuilt_from_the_latest_snapshot(
+    get_worker: Callable[..., Worker], get_order: Callable[..., Order]
+):
+    store = InMemoryEventStore()
+    store.snapshot_events = 4
+    worker = get_worker(status=WorkerStatus.WATCHING)
+    for _ in range(5):
+        before = WorkerState.of(worker)
+        order = get_order(status=OrderStatus.WAIT)
+        order.executed_volume = order.paid_fee = 0.0
+        worker.orders.add(order)
+        store.record(before, worker)
+        before = WorkerState.of(worker)
+        order.status = OrderStatus.DONE
+        order.executed_volume = order.ordered_volume
+        store.record(before, worker)
+
+    assert store.get_version(worker.worker_id) == 10
+    snapshot = store.get_snapshot(worker.worker_id)
+    assert snapshot and snapshot.version == 8
+    snapshot = WorkerState.from_dict(json.loads(json.dumps(snapshot.to_dict())))
+    assert len(store.load(worker.worker_id, snapshot.version)) == 2
+
+    state = store.rebuild(worker.worker_id)
+    assert state.version == 10
+    assert _fields(state) == _fields(WorkerState.of(worker))
+    # Rebuilding leaves the snapshot as it was.
+    assert store.rebuild(worker.worker_id) == state
+    assert store.get_snapshot(worker.worker_id).version == 8
+
+
+def test_state_of_a_worker_recorded_late_is_rebuilt(
+    get_worker: Callable[..., Worker], get_order: Callable[..., Order]
+):
+    # The worker already held an order and spent a tranche when recording
+    # started.
+    store = InMemoryEventStore()
+    held = get_order(status=OrderStatus.WAIT)
+    held.executed_volume = held.paid_fee = 0.0
+    worker = get_worker(status=WorkerStatus.BUYING, orders={held})
+    worker.budget = BudgetLadder((20000, 30000))
+
+    before = WorkerState.of(worker)
+    held.status = OrderStatus.DONE
+    held.executed_volume = held.ordered_volume
+    worker.status = WorkerStatus.SELLING
+    store.record(before, worker)
+
+    state = store.rebuild(worker.worker_id)
+    assert state.version == 2
+    assert _fields(state) == _fields(WorkerState.of(worker))
+    assert state.budget == "20000:30000"
+
+
+def test_added_workers_are_rebuilt_before_any_event(
+    get_worker: Callable[..., Worker]
+):
+    uow = InMemoryUnitOfWork()
+    worker = get_worker(status=WorkerStatus.WATCHING)
+    worker.budget = BudgetLadder((10000, 20000))
+    services.add_worker(worker, uow)
+
+    state = uow.events.rebuild(worker.worker_id)
+    assert _fields(state) == _fields(WorkerState.of(worker))
+
+
+def test_stat_work_records_the_events_of_workers(
+    get_worker: Callable[..., Worker]
+):
+    worker = get_worker(status=WorkerStatus.WATCHING)
+    worker.exchange = Exchange.FAKE
+    worker.tick_interval = 0.01
+    uow = InMemoryUnitOfWork(InMemoryRepository([worker]))
+    stop_event = services.threading.Event()
+    ticks: List[Worker] = []
+
+    def execute(signals):
+        worker.balance = (worker.balance or 0.0) + 1.0
+
+    def on_tick(worker: Worker, latency: float):
+        ticks.append(worker)
+        if len(ticks) == 2:
+            stop_event.set()
+
+    worker.refresh = lambda: None  # type: ignore
+    worker.execute = execute  # type: ignore
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    events = uow.events.load(worker.worker_id)
+    assert [type(event) for event in events] == [BalanceChanged, BalanceChanged]
+    assert [event.balance for event in events] == [1.0, 2.0]
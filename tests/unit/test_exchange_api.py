@@ -0,0 +1,237 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from cats.domain.constants import (
+    Market,
+    PriceUnit,
+    OrderStatus,
+    OrderType,
+    WorkerStatus,
+)
+from cats.domain.events import WorkerState, get_events
+from cats.domain.models.bithumb_api import BithumbExchangeAPI
+from cats.domain.models.coinone_api import CoinoneExchangeAPI
+from cats.domain.models.exchange_api import APIError
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.order import Order
+from cats.domain.models.upbit_api import UpbitExchangeAPI
+from cats.domain.models.worker import Worker
+from cats.domain.values import Price
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2021, 10, 1, 12, 30)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def test_fake_exchange_prices_are_deterministic_for_same_seed():
+    clock = FakeClock()
+    api1 = FakeExchangeAPI(Market.ETH, seed=7, clock=clock)
+    api2 = FakeExchangeAPI(Market.ETH, seed=7, clock=clock)
+
+    prices = api1.get_prices(price_unit=PriceUnit.HOUR, counts=24)
+    assert prices == api2.get_prices(price_unit=PriceUnit.HOUR, counts=24)
+    assert len(prices) == 24
+    assert prices[0].date_time == datetime(2021, 10, 1, 12)
+    assert prices[1].date_time == datetime(2021, 10, 1, 11)
+
+
+def test_fake_exchange_prices_keep_history_when_time_passes():
+    clock = FakeClock()
+    api = FakeExchangeAPI(Market.ETH, seed=7, clock=clock)
+    before = api.get_prices(price_unit=PriceUnit.MINUTE, counts=10)
+
+    clock.now += timedelta(minutes=3)
+    after = api.get_prices(price_unit=PriceUnit.MINUTE, counts=13)
+
+    assert after[3:] == before
+    assert after[0].date_time == datetime(2021, 10, 1, 12, 33)
+
+
+def test_fake_exchange_replays_history():
+    history = [
+        Price(datetime(2021, 10, 1, hour), 1100.0, 900.0, 1000.0 + hour)
+        for hour in range(5)
+    ]
+    api = FakeExchangeAPI(Market.ETH, history=history)
+
+    prices = api.get_prices(
+        price_unit=PriceUnit.HOUR, counts=2, to=datetime(2021, 10, 1, 3)
+    )
+    assert [p.trade_price for p in prices] == [1003.0, 1002.0]
+
+
+def test_get_price_history_pages_past_max_candles():
+    clock = FakeClock()
+    api = FakeExchangeAPI(Market.ETH, seed=7, clock=clock)
+    api.max_candles = 10
+
+    prices = api.get_price_history(price_unit=PriceUnit.HOUR, counts=25)
+
+    assert len(prices) == 25
+    assert prices == api.get_prices(price_unit=PriceUnit.HOUR, counts=25)
+
+
+def test_get_prices_since_returns_only_newer_candles():
+    clock = FakeClock()
+    api = FakeExchangeAPI(Market.ETH, seed=7, clock=clock)
+    api.max_candles = 4
+
+    prices = api.get_prices_since(
+        price_unit=PriceUnit.HOUR, since=datetime(2021, 10, 1, 2)
+    )
+    assert [p.date_time.hour for p in prices] == list(range(12, 2, -1))
+
+    prices = api.get_prices_since(
+        price_unit=PriceUnit.HOUR, since=datetime(2021, 10, 1, 2), limit=3
+    )
+    assert [p.date_time.hour for p in prices] == [12, 11, 10]
+
+
+def test_fake_exchange_fills_orders_partially_after_fill_delay():
+    clock = FakeClock()
+    api = FakeExchangeAPI(Market.ETH, fill_delay=10, fill_ratio=0.5, clock=clock)
+    order = api.sell_order(price=1000.0, volume=2.0)
+
+    assert api.get_orders([order.order_id])[0].executed_volume == 0.0
+
+    clock.now += timedelta(seconds=10)
+    assert api.get_orders([order.order_id])[0].status == OrderStatus.WAIT
+    assert order.executed_volume == 1.0
+
+    assert api.get_orders([order.order_id])[0].status == OrderStatus.DONE
+    assert order.executed_volume == 2.0
+
+
+def test_fake_exchange_cancel_order():
+    api = FakeExchangeAPI(Market.ETH)
+    order = api.buy_order(price=1000.0, budget=10000)
+
+    assert api.cancel_order(order.order_id) == order.order_id
+    assert api.get_orders([order.order_id])[0].status == OrderStatus.CANCEL
+
+
+def test_fake_exchange_raises_injected_errors():
+    api = FakeExchangeAPI(Market.ETH, error_rate=1.0)
+    with pytest.raises(APIError):
+        api.get_balance()
+
+
+def test_bithumb_makes_order_from_order_detail():
+    api = BithumbExchangeAPI(Market.ETH)
+    order = api._make_order(
+        "C0101000000001",
+        {
+            "order_date": "1633059000000000",
+            "type": "bid",
+            "order_status": "Completed",
+            "order_price": "4000000",
+            "order_qty": "0.5",
+            "contract": [
+                {"units": "0.3", "fee_currency": "ETH", "fee": "0.00075"},
+                {"units": "0.2", "fee_currency": "ETH", "fee": "0.0005"},
+            ],
+        },
+    )
+    assert order.type == OrderType.BUY
+    assert order.status == OrderStatus.DONE
+    assert order.executed_volume == pytest.approx(0.5)
+    assert order.paid_fee == pytest.approx(5000.0)
+    assert order.ordered_time == datetime(2021, 10, 1, 12, 30)
+
+
+def test_bithumb_make_valid_order_price():
+    api = BithumbExchangeAPI(Market.ETH)
+    assert api.make_valid_order_price(OrderType.BUY, 4000350.0) == 4000000.0
+    assert api.make_valid_order_price(OrderType.SELL, 4350.5) == 4351.0
+
+
+def test_coinone_makes_order_and_price():
+    api = CoinoneExchangeAPI(Market.ETH)
+    order = api._make_order(
+        {
+            "result": "success",
+            "status": "partially_filled",
+            "info": {
+                "orderId": "0e3019f2-1e4d-11e9-9ec7-00e04c3600d7",
+                "type": "ask",
+                "price": "4000000",
+                "qty": "1.0",
+                "remainQty": "0.25",
+                "fee": "1500",
+                "timestamp": "1633059000",
+            },
+        }
+    )
+    assert order.type == OrderType.SELL
+    assert order.status == OrderStatus.WAIT
+    assert order.executed_volume == 0.75
+
+    price = api._make_price(
+        {"timestamp": 1633059000000, "high": "11", "low": "9", "close": "10"}
+    )
+    assert price == Price(datetime(2021, 10, 1, 12, 30), 11.0, 9.0, 10.0)
+
+
+def test_upbit_order_times_are_naive_kst_like_persisted_ones():
+    # Orders loaded from the database have naive times.
+    persisted = Order(
+        order_id="persisted",
+        type=OrderType.BUY,
+        status=OrderStatus.DONE,
+        price=4000000.0,
+        ordered_volume=0.01,
+        executed_volume=0.01,
+        paid_fee=20.0,
+        ordered_time=datetime(2021, 10, 1, 12, 0),
+    )
+    worker = Worker(status=WorkerStatus.SELLING, orders={persisted})
+    before = WorkerState.of(worker)
+    placed = UpbitExchangeAPI(Market.ETH)._make_order(
+        {
+            "uuid": "placed",
+            "side": "ask",
+            "state": "wait",
+            "price": "4400000.0",
+            "volume": "0.01",
+            "executed_volume": "0.0",
+            "paid_fee": "0.0",
+            "created_at": "2021-10-01T03:30:00+00:00",
+        }
+    )
+    worker.orders.add(placed)
+
+    assert placed.ordered_time == datetime(2021, 10, 1, 12, 30)
+    assert worker._get_latest_order() == placed
+    assert [event.order_id for event in get_events(before, worker)] == ["placed"]
+
+
+@pytest.fixture
+def new_york_host(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize(
+    "api, response",
+    [
+        (BithumbExchangeAPI(Market.ETH), dict(order_id="C0101000000001")),
+        (CoinoneExchangeAPI(Market.ETH), dict(orderId="0e3019f2")),
+    ],
+)
+def test_placed_orders_are_stamped_in_kst_on_any_host(new_york_host, api, response):
+    api._private = MagicMock(return_value=response)  # type: ignore
+
+    order = api.buy_order(price=4000000.0, budget=100000)
+
+    kst_now = datetime.utcnow() + timedelta(hours=9)
+    assert abs(order.ordered_time - kst_now) < timedelta(minutes=1)
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+from cats.domain.constants import Exchange, Market
+from cats.domain.models.bithumb_api import BithumbExchangeAPI
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.exchange_api import unwrap
+from cats.domain.models.exchange_registry import (
+    ExchangeAPIRegistry,
+    UnsupportedExchange,
+    BUILTIN_EXCHANGE_APIS,
+)
+from cats.domain.models.worker import Worker
+
+
+def test_worker_gets_api_of_every_builtin_exchange():
+    worker = Worker(market=Market.ETH, exchange=Exchange.BITHUMB)
+    assert isinstance(unwrap(worker._get_api()), BithumbExchangeAPI)
+
+    worker = Worker(market=Market.ETH, exchange="FAKE")  # type: ignore
+    assert isinstance(unwrap(worker._get_api()), FakeExchangeAPI)
+
+
+def test_registry_registers_plugin_exchange_api():
+    registry = ExchangeAPIRegistry(BUILTIN_EXCHANGE_APIS)
+    registry.register("SIMULATION", FakeExchangeAPI)
+
+    assert registry["SIMULATION"] is FakeExchangeAPI
+    assert "SIMULATION" in registry
+    with pytest.raises(UnsupportedExchange):
+        registry["UNKNOWN"]
+
+
+def test_registry_does_not_import_unused_exchange_apis():
+    code = (
+        "import sys; from cats.domain.models.worker import EXCHANGE_APIS;"
+        "EXCHANGE_APIS['UPBIT'];"
+        "print('cats.domain.models.bithumb_api' in sys.modules)"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    assert output.strip() == "False"
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from typing import Dict
+
+# Cumulative import time budgets in microseconds. They are generous on
+# purpose, the heavy module checks below are the real regression guards.
+WORKER_IMPORT_BUDGET = 1000000
+SERVICES_IMPORT_BUDGET = 2000000
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line.replace("import time:", "", 1).split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_worker_import_does_not_import_exchange_clients():
+    times = _import_times("import cats.domain.models.worker")
+
+    assert not {"jwt", "requests", "faker", "arrow", "sqlalchemy"} & set(times)
+    assert times["cats.domain.models.worker"] < WORKER_IMPORT_BUDGET
+
+
+def test_service_layer_import_does_not_create_engine():
+    times = _import_times("import cats.service_layer.services")
+
+    assert "psycopg2" not in times
+    assert "requests" not in times
+    assert times["cats.service_layer.services"] < SERVICES_IMPORT_BUDGET
@@ -0,0 +1,98 @@
+from typing import Callable, List
+
+from cats.domain.constants import Exchange, Market, WorkerStatus
+from cats.domain.models.worker import Worker
+from cats.domain.values import BudgetLadder
+from cats.adapters.repository import InMemoryRepository
+from cats.service_layer import services
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork
+
+
+def test_in_memory_repository_indexes_status_and_market(
+    get_worker: Callable[..., Worker]
+):
+    watching = get_worker(market=Market.ETH, status=WorkerStatus.WATCHING)
+    finished = get_worker(market=Market.BTC, status=WorkerStatus.FINISHED)
+    uow = InMemoryUnitOfWork(InMemoryRepository([watching, finished]))
+
+    with uow:
+        assert uow.workers.list_by_status(WorkerStatus.WATCHING) == [watching]
+        assert uow.workers.find_duplicates([Market.ETH, Market.BTC]) == {"ETH"}
+
+        watching.status = WorkerStatus.BUYING
+        assert uow.workers.list_by_status(WorkerStatus.WATCHING) == []
+        uow.commit()
+        assert uow.workers.list_by_status(WorkerStatus.BUYING) == [watching]
+        assert not uow.workers.check_duplicate(Market.ETH)
+
+
+def test_in_memory_uow_rolls_back_added_workers(get_worker: Callable[..., Worker]):
+    kept = get_worker()
+    uow = InMemoryUnitOfWork(InMemoryRepository([kept]))
+    with uow:
+        uow.workers.add(get_worker())
+    assert uow.workers.list_all() == [kept]
+
+
+def test_in_memory_uow_restores_snapshots(get_worker: Callable[..., Worker]):
+    worker = get_worker(status=WorkerStatus.WATCHING)
+    worker.budget = BudgetLadder((10000,))
+    uow = InMemoryUnitOfWork(InMemoryRepository([worker]))
+
+    snapshot = uow.snapshot()
+    worker.budget = BudgetLadder()
+    worker.status = WorkerStatus.FINISHED
+    uow.commit()
+
+    uow.restore(snapshot)
+    restored = uow.workers.get(worker.worker_id)
+    assert restored is not worker
+    assert restored.budget == BudgetLadder((10000,))
+    assert uow.workers.list_by_status(WorkerStatus.WATCHING) == [restored]
+
+
+def test_in_memory_uow_flushes_periodically(get_worker: Callable[..., Worker]):
+    now = [0.0]
+    target = InMemoryUnitOfWork()
+    worker = get_worker()
+    uow = InMemoryUnitOfWork(
+        InMemoryRepository([worker]),
+        flush_to=lambda: target,
+        flush_interval=10,
+        clock=lambda: now[0],
+    )
+
+    uow.commit()
+    assert target.workers.list_all() == []
+    now[0] = 10.0
+    uow.commit()
+    assert target.workers.get(worker.worker_id) == worker
+    assert target.workers.get(worker.worker_id) is not worker
+
+
+def test_stat_work_runs_on_in_memory_uow(get_worker: Callable[..., Worker]):
+    workers = [get_worker(status=WorkerStatus.WATCHING) for _ in range(3)]
+    for worker in workers:
+        worker.exchange = Exchange.FAKE
+    uow = InMemoryUnitOfWork(InMemoryRepository(workers))
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 3:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    assert set(ticked) == set(workers)
+
+
+def test_finished_workers_are_archived(get_worker: Callable[..., Worker]):
+    finished = get_worker(status=WorkerStatus.FINISHED)
+    active = get_worker(status=WorkerStatus.SELLING)
+    uow = InMemoryUnitOfWork(InMemoryRepository([finished, active]))
+
+    assert services.archive_finished_workers(uow) == 1
+    assert uow.workers.list_all() == [active]
+    assert uow.archive.list_workers(market=finished.market) == [finished]
@@ -0,0 +1,167 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from cats.domain.constants import Exchange, Market, OrderType
+from cats.domain.models.exchange_api import APIError
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.order_router import OrderRouter
+from cats.domain.models.transport import HttpTransport
+from cats.domain.models.worker import Worker
+from cats.domain.values import Price
+
+
+def _venue(
+    trade_price: float, fee_rate: float = 0.0005, balance: float = 0.0
+) -> FakeExchangeAPI:
+    api = FakeExchangeAPI(
+        Market.ETH,
+        history=[Price(datetime(2021, 10, 1), trade_price, trade_price, trade_price)],
+        initial_balance=balance,
+    )
+    api.fee_rate = fee_rate
+    return api
+
+
+def test_router_sends_buy_order_to_cheapest_venue_after_fees():
+    router = OrderRouter(
+        Market.ETH,
+        venues=dict(
+            UPBIT=_venue(1000.0, fee_rate=0.01),
+            BITHUMB=_venue(1005.0, fee_rate=0.0),
+        ),
+    )
+
+    order = router.buy_order(price=1010.0, budget=10000)
+
+    assert order.exchange == "BITHUMB"
+    assert router.decisions[-1].venue == "BITHUMB"
+    assert router.get_orders([order.order_id]) == [order]
+
+
+def test_router_sends_sell_order_to_highest_bid_venue():
+    router = OrderRouter(
+        Market.ETH,
+        venues=dict(
+            UPBIT=_venue(1000.0, balance=1.0), BITHUMB=_venue(990.0, balance=1.0)
+        ),
+    )
+
+    order = router.sell_order(price=900.0, volume=1.0)
+
+    assert order.exchange == "UPBIT"
+    assert router.decisions[-1].order_type == OrderType.SELL
+
+
+def test_router_splits_sell_by_the_balance_of_every_venue():
+    router = OrderRouter(
+        Market.ETH,
+        venues=dict(
+            UPBIT=_venue(1000.0, balance=0.25),
+            BITHUMB=_venue(990.0, balance=0.75),
+            COINONE=_venue(995.0),
+        ),
+    )
+    assert router.get_balance() == 1.0
+    # No single venue holds the whole volume.
+    with pytest.raises(APIError):
+        router.sell_order(price=900.0, volume=1.0)
+
+    orders = router.sell_orders(price=900.0, volume=1.0)
+
+    assert [(o.exchange, o.ordered_volume) for o in orders] == [
+        ("UPBIT", 0.25),
+        ("BITHUMB", 0.75),
+    ]
+    assert router.get_balance() == 0.0
+
+
+def test_router_returns_placed_sell_orders_when_a_later_venue_fails():
+    failing = _venue(990.0, balance=0.75)
+    failing.sell_order = MagicMock(side_effect=APIError("down"))  # type: ignore
+    router = OrderRouter(
+        Market.ETH,
+        venues=dict(UPBIT=_venue(1000.0, balance=0.25), BITHUMB=failing),
+    )
+
+    orders = router.sell_orders(price=900.0, volume=1.0)
+
+    assert [(o.exchange, o.ordered_volume) for o in orders] == [("UPBIT", 0.25)]
+    with pytest.raises(APIError):
+        OrderRouter(Market.ETH, venues=dict(BITHUMB=failing)).sell_orders(
+            price=900.0, volume=0.75
+        )
+
+
+def test_router_leaves_out_venues_whose_share_is_below_their_minimum_order():
+    dust = _venue(1000.0, balance=0.001)
+    dust.min_order_amount = 5000.0
+    router = OrderRouter(
+        Market.ETH,
+        venues=dict(UPBIT=dust, BITHUMB=_venue(990.0, balance=1.0)),
+    )
+
+    orders = router.sell_orders(price=900.0, volume=1.0)
+
+    assert [(o.exchange, o.ordered_volume) for o in orders] == [("BITHUMB", 1.0)]
+    with pytest.raises(APIError):
+        OrderRouter(Market.ETH, venues=dict(UPBIT=dust)).sell_orders(
+            price=900.0, volume=0.001
+        )
+
+
+def test_router_routes_orders_placed_before_a_restart_by_their_venue():
+    bithumb = _venue(990.0, balance=1.0)
+    order = bithumb.sell_order(price=1100.0, volume=1.0)
+    order.exchange = "BITHUMB"
+    upbit = _venue(1000.0)
+    upbit.get_orders = MagicMock(side_effect=AssertionError)  # type: ignore
+    upbit.cancel_order = MagicMock(side_effect=AssertionError)  # type: ignore
+    router = OrderRouter(Market.ETH, venues=dict(UPBIT=upbit, BITHUMB=bithumb))
+
+    router.add_orders([order])
+
+    assert router.get_orders([order.order_id])[0].exchange == "BITHUMB"
+    assert router.cancel_order(order.order_id) == order.order_id
+
+
+def test_router_skips_venue_without_rate_headroom():
+    cheapest = _venue(900.0)
+    cheapest.transport = HttpTransport(  # type: ignore
+        "http://localhost", rate_limits=dict(order=1.0)
+    )
+    cheapest.transport.limiters["order"].try_acquire()  # type: ignore
+    router = OrderRouter(
+        Market.ETH, venues=dict(UPBIT=cheapest, BITHUMB=_venue(1000.0))
+    )
+
+    order = router.buy_order(price=1000.0, budget=10000)
+
+    assert order.exchange == "BITHUMB"
+    assert router.decisions[-1].skipped == ("UPBIT",)
+
+
+def test_router_raises_api_error_when_no_venue_is_available():
+    router = OrderRouter(
+        Market.ETH, venues=dict(FAKE=FakeExchangeAPI(Market.ETH, error_rate=1.0))
+    )
+    with pytest.raises(APIError):
+        router.buy_order(price=1000.0, budget=10000)
+
+
+def test_worker_with_venues_gets_router():
+    worker = Worker(exchange=Exchange.FAKE, venues="FAKE,BITHUMB")
+    api = worker._get_api()
+
+    assert isinstance(api, OrderRouter)
+    assert list(api.venues) == ["FAKE", "BITHUMB"]
+
+
+def test_worker_routes_its_stored_orders_by_their_venue():
+    order = _venue(990.0, balance=1.0).sell_order(price=1100.0, volume=1.0)
+    order.exchange = "BITHUMB"
+    worker = Worker(exchange=Exchange.FAKE, venues="FAKE,BITHUMB", orders={order})
+    api = worker._get_api()
+
+    assert api._order_venues == {order.order_id: "BITHUMB"}
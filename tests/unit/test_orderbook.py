@@ -0,0 +1,93 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from cats.domain.constants import (
+    Exchange,
+    Market,
+    OrderType,
+    PriceUnit,
+    WorkerStatus,
+)
+from cats.domain.models.exchange_api import get_venue_key, unwrap
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.orderbook import OrderbookCache
+from cats.domain.models.worker import Worker
+from cats.domain.values import Orderbook
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _book() -> Orderbook:
+    return Orderbook(
+        date_time=datetime(2021, 10, 1),
+        bids=((990.0, 1.0), (980.0, 2.0)),
+        asks=((1010.0, 1.0), (1020.0, 2.0)),
+    )
+
+
+def test_orderbook_cache_polls_once_per_ttl():
+    clock = FakeClock()
+    api = FakeExchangeAPI(Market.ETH)
+    api.get_orderbook = MagicMock(return_value=_book())  # type: ignore
+    cache = OrderbookCache(ttl=1.0, clock=clock)
+
+    assert cache.get(api) == cache.get(api) == _book()
+    assert api.get_orderbook.call_count == 1
+
+    clock.now += 1.0
+    cache.get(api)
+    assert api.get_orderbook.call_count == 2
+
+
+def test_orderbook_of_a_collected_api_is_not_served_to_a_new_one():
+    cache = OrderbookCache(ttl=60.0)
+    for _ in range(10):
+        api = FakeExchangeAPI(Market.ETH)
+        api.get_orderbook = MagicMock(return_value=_book())  # type: ignore
+        assert get_venue_key(api) == get_venue_key(api)
+        cache.get(api)
+        # A new API may get the id of this one once it is collected.
+        assert api.get_orderbook.call_count == 1
+        del api
+
+
+def test_limit_price_is_best_price_not_worse_than_limit():
+    api = FakeExchangeAPI(Market.ETH)
+    api.get_orderbook = MagicMock(return_value=_book())  # type: ignore
+    cache = OrderbookCache()
+
+    assert cache.get_limit_price(api, OrderType.BUY) == 1010.0
+    assert cache.get_limit_price(api, OrderType.BUY, limit=1000.0) == 1000.0
+    assert cache.get_limit_price(api, OrderType.BUY, limit=1100.0) == 1010.0
+    assert cache.get_limit_price(api, OrderType.SELL) == 990.0
+    assert cache.get_limit_price(api, OrderType.SELL, limit=1100.0) == 1100.0
+    assert cache.get_limit_price(api, OrderType.SELL, limit=900.0) == 990.0
+
+
+def test_fake_orderbook_spreads_around_latest_price():
+    api = FakeExchangeAPI(Market.ETH)
+    book = api.get_orderbook(depth=3)
+    price = api.get_prices(price_unit=PriceUnit.MINUTE, counts=1)[0].trade_price
+
+    assert len(book.bids) == len(book.asks) == 3
+    assert book.best_bid < price < book.best_ask  # type: ignore
+    assert book.to_quote().ask_price == book.best_ask
+
+
+def test_worker_buys_at_best_ask_instead_of_candle_close():
+    worker = Worker(exchange=Exchange.FAKE)
+    worker._is_buy_timing = MagicMock(return_value=True)  # type: ignore
+    unwrap(worker._get_api()).get_orderbook = MagicMock(  # type: ignore
+        return_value=_book()
+    )
+
+    worker.work_for_watching()
+
+    assert worker.status == WorkerStatus.BUYING
+    assert worker.orders.pop().price == 1010.0
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from cats.domain.constants import Exchange, Market, OrderStatus, WorkerStatus
+from cats.domain.models.exchange_api import APIError, unwrap
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.fill_model import FillModel
+from cats.domain.models.orderbook import OrderbookCache
+from cats.domain.models.paper_exchange_api import PaperExchangeAPI, paper_accounts
+from cats.domain.models.worker import Worker, work
+
+
+def _paper(live: FakeExchangeAPI, **kwargs) -> PaperExchangeAPI:
+    return PaperExchangeAPI(live, books=OrderbookCache(ttl=0), **kwargs)
+
+
+def _no_orders(live: FakeExchangeAPI) -> None:
+    for name in ("buy_order", "sell_order", "cancel_order", "get_orders"):
+        setattr(live, name, MagicMock(side_effect=AssertionError(name)))
+
+
+def test_paper_orders_fill_against_live_book_without_order_calls():
+    live = FakeExchangeAPI(Market.ETH)
+    book = live.get_orderbook()
+    _no_orders(live)
+    api = _paper(live)
+
+    below = api.buy_order(price=book.best_bid, budget=10000)  # type: ignore
+    at_ask = api.buy_order(price=book.best_ask, budget=10000)  # type: ignore
+    below, at_ask = api.get_orders([below.order_id, at_ask.order_id])
+
+    assert below.status == OrderStatus.WAIT
+    assert at_ask.status == OrderStatus.DONE
+    assert at_ask.paid_fee == pytest.approx(10000 * (1 - api.fee_rate) * api.fee_rate)
+    assert api.get_balance() == pytest.approx(at_ask.executed_volume)
+
+    sell = api.sell_order(price=book.best_ask * 2, volume=api.get_balance())
+    assert api.get_balance() == pytest.approx(0.0)
+    api.cancel_order(sell.order_id)
+    assert api.get_orders([sell.order_id])[0].status == OrderStatus.CANCEL
+    assert api.get_balance() == pytest.approx(at_ask.executed_volume)
+
+
+def test_paper_exchange_shares_fill_model_with_fake_exchange():
+    now = datetime(2021, 1, 1)
+    live = FakeExchangeAPI(Market.ETH, clock=lambda: now)
+    api = _paper(
+        live, fill_model=FillModel(fill_delay=10, fill_ratio=0.5), clock=lambda: now
+    )
+    order = api.buy_order(price=live.get_orderbook().best_ask * 2, budget=10000)
+
+    [order] = api.get_orders([order.order_id])
+    assert order.executed_volume == 0.0
+
+    now += timedelta(seconds=10)
+    [order] = api.get_orders([order.order_id])
+    assert order.executed_volume == pytest.approx(order.ordered_volume / 2)
+
+
+def test_paper_exchange_rejects_selling_more_than_paper_balance():
+    api = _paper(FakeExchangeAPI(Market.ETH))
+    with pytest.raises(APIError):
+        api.sell_order(price=10000.0, volume=1.0)
+
+
+def test_paper_worker_trades_only_on_paper():
+    worker = Worker(exchange=Exchange.FAKE, paper=True)
+    worker._is_buy_timing = MagicMock(return_value=True)  # type: ignore
+    live = unwrap(worker._get_api())
+
+    worker.work_for_watching()
+
+    assert worker.status == WorkerStatus.BUYING
+    assert isinstance(worker._get_api(), PaperExchangeAPI)
+    assert live._orders == {}  # type: ignore
+    assert worker.orders.pop().order_id.startswith("paper-")
+    # A new object of the same worker keeps trading on the same paper account.
+    assert Worker(
+        exchange=Exchange.FAKE, paper=True, worker_id=worker.worker_id
+    )._get_api() is worker._get_api()
+
+
+def test_paper_account_is_rebuilt_from_stored_orders_after_a_restart():
+    worker = Worker(exchange=Exchange.FAKE, paper=True)
+    api = worker._get_api()
+    ask = api.get_orderbook().best_ask
+    bought = api.buy_order(price=ask, budget=10000)
+    waiting = api.buy_order(price=ask / 2, budget=10000)
+    worker.orders = set(api.get_orders([bought.order_id, waiting.order_id]))
+    balance = api.get_balance()
+    assert balance > 0
+
+    paper_accounts.clear()
+    restarted = Worker(
+        exchange=Exchange.FAKE,
+        paper=True,
+        worker_id=worker.worker_id,
+        orders=set(worker.orders),
+    )
+    api = restarted._get_api()
+
+    assert api.get_balance() == pytest.approx(balance)
+    orders = api.get_orders([waiting.order_id])
+    assert [order.status for order in orders] == [OrderStatus.WAIT]
+
+
+def test_paper_account_keeps_its_own_orders():
+    api = _paper(FakeExchangeAPI(Market.ETH))
+    ask = api.get_orderbook().best_ask
+    order = api.buy_order(price=ask, budget=10000)
+    # As the session of the worker does to its orders on a rollback.
+    order.status = OrderStatus.CANCEL
+
+    [filled] = api.get_orders([order.order_id])
+
+    assert filled is not order
+    assert filled.status == OrderStatus.DONE
+    assert api.get_balance() == pytest.approx(filled.executed_volume)
+    assert api.get_orders([order.order_id]) == [filled]
+    assert api.get_orders([order.order_id])[0] is not filled
+
+
+def test_paper_account_is_dropped_when_its_worker_finishes():
+    worker = Worker(exchange=Exchange.FAKE, paper=True)
+    worker._get_api()
+    assert (worker.worker_id, Exchange.FAKE) in paper_accounts
+
+    worker.status = WorkerStatus.FINISHED
+    work(worker)
+
+    assert not any(key[0] == worker.worker_id for key in paper_accounts)
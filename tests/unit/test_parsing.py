@@ -0,0 +1,49 @@
+import json
+import os
+from datetime import datetime
+
+from cats.domain.constants import Market, PriceUnit
+from cats.domain.models import parsing
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.upbit_api import UPBIT_CANDLE_KEYS
+from cats.domain.values import Price, PriceColumns
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def test_candles_parse_into_columns_of_the_same_prices(monkeypatch):
+    data = _fixture("upbit_candles.json")
+    expected = [
+        Price(
+            date_time=datetime.fromisoformat(candle["candle_date_time_kst"]),
+            high_price=candle["high_price"],
+            low_price=candle["low_price"],
+            trade_price=candle["trade_price"],
+        )
+        for candle in json.loads(data)
+    ]
+
+    columns = parsing.parse_candles(parsing.loads(data), *UPBIT_CANDLE_KEYS)
+    assert len(columns) == 200
+    assert columns.to_prices() == expected
+    assert columns[0] == expected[0] and list(columns) == expected
+
+    # Without orjson the standard library decodes the same values.
+    monkeypatch.setattr(parsing, "orjson", None)
+    assert parsing.loads(data) == json.loads(data)
+
+
+def test_price_columns_select_and_extend():
+    prices = FakeExchangeAPI(Market.ETH).get_prices(PriceUnit.HOUR, counts=10)
+    columns = PriceColumns.from_prices(prices)
+
+    selected = columns.select(prices[6].date_time, prices[2].date_time)
+    assert selected.to_prices() == prices[2:7]
+
+    selected.extend(columns.select(prices[9].date_time, prices[7].date_time))
+    assert selected.to_prices() == prices[2:]
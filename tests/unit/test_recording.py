@@ -0,0 +1,71 @@
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from cats.adapters.repository import InMemoryRepository, copy_worker
+from cats.domain.constants import Exchange, WorkerStatus
+from cats.domain.models import recording
+from cats.domain.models.recording import (
+    Recorder,
+    Recording,
+    ReplayExhausted,
+    replaying,
+)
+from cats.domain.models.worker import Worker, work
+from cats.entrypoints.replay import replay
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork
+
+
+def _state(worker: Worker):
+    orders = sorted((o.order_id, o.status, o.price) for o in worker.orders)
+    return worker.status, str(worker.budget), worker.balance, orders
+
+
+@pytest.fixture
+def record_traffic(monkeypatch, tmp_path) -> Callable[[Worker, int], str]:
+    def _record_traffic(worker: Worker, ticks: int) -> str:
+        path = str(tmp_path / "traffic.jsonl.gz")
+        recorder = Recorder(path)
+        monkeypatch.setattr(recording, "recorder", recorder)
+        for _ in range(ticks):
+            work(worker)
+        recorder.close()
+        monkeypatch.setattr(recording, "recorder", None)
+        return path
+
+    return _record_traffic
+
+
+def test_replayed_traffic_makes_the_same_decisions(record_traffic):
+    worker = Worker(exchange=Exchange.FAKE, budget="10000:20000")
+    worker._is_buy_timing = MagicMock(return_value=True)  # type: ignore
+    initial = copy_worker(worker)
+    path = record_traffic(worker, 5)
+    assert worker.orders
+
+    replayed = copy_worker(initial)
+    replayed._is_buy_timing = MagicMock(return_value=True)  # type: ignore
+    traffic = Recording.load(path)
+    with replaying(traffic):
+        for _ in range(5):
+            work(replayed)
+        assert len(traffic) == 0
+        with pytest.raises(ReplayExhausted):
+            replayed._get_api().get_balance()
+
+    assert _state(replayed) == _state(worker)
+
+
+def test_replay_runs_recorded_traffic_through_the_scheduler(record_traffic):
+    worker = Worker(exchange=Exchange.FAKE, status=WorkerStatus.WATCHING)
+    initial = copy_worker(worker)
+    traffic = Recording.load(record_traffic(worker, 3))
+
+    report = replay(traffic, InMemoryUnitOfWork(InMemoryRepository([initial])))
+
+    assert report["ticks"] >= 3 and report["unused_calls"] == 0
+    assert report["latency"]["p50"] >= 0
+    replayed = report["workers"][worker.worker_id]
+    assert replayed["status"] == WorkerStatus(worker.status).name
+    assert replayed["orders"] == sorted(order.order_id for order in worker.orders)
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Callable, List
+
+import pytest
+
+from cats.adapters.repository import InMemoryRepository
+from cats.domain.constants import Exchange, Market, OrderStatus, OrderType, WorkerStatus
+from cats.domain.models.order import Order
+from cats.domain.models.worker import Worker
+from cats.domain.reports import WorkerReport, summarize
+from cats.service_layer import services
+from cats.service_layer.unit_of_work import InMemoryUnitOfWork
+
+
+def _order(type: OrderType, price: float, volume: float, fee: float) -> Order:
+    return Order(
+        order_id=f"{type.name}-{price}-{volume}",
+        type=type,
+        status=OrderStatus.DONE,
+        price=price,
+        ordered_volume=volume,
+        executed_volume=volume,
+        paid_fee=fee,
+        ordered_time=datetime(2021, 1, 1),
+    )
+
+
+def test_worker_report_of_a_trade_cycle():
+    worker = Worker(
+        market=Market.BTC,
+        status=WorkerStatus.SELLING,
+        orders={
+            _order(OrderType.BUY, 1000.0, 10.0, 10.0),
+            _order(OrderType.BUY, 800.0, 10.0, 10.0),
+            _order(OrderType.SELL, 1100.0, 5.0, 5.0),
+        },
+    )
+
+    report = WorkerReport.of(worker)
+
+    assert (report.bought, report.sold, report.fees) == (18020.0, 5495.0, 25.0)
+    assert report.fills == 3
+    assert report.exposure == pytest.approx(15 * 901.0)
+    assert report.realized_pnl == pytest.approx(5495.0 - 5 * 901.0)
+
+    other = WorkerReport.of(Worker(market=Market.BTC))
+    (market,) = summarize([report, other])
+    assert (market.market, market.workers, market.fills) == ("BTC", 2, 3)
+    assert market.exposure == report.exposure
+
+
+def test_stat_work_maintains_reports_of_workers(get_worker: Callable[..., Worker]):
+    worker = get_worker(status=WorkerStatus.BUYING)
+    worker.exchange = Exchange.FAKE
+    worker.tick_interval = 0.01
+    uow = InMemoryUnitOfWork(InMemoryRepository([worker]))
+    stop_event = services.threading.Event()
+    ticks: List[Worker] = []
+
+    def execute(signals):
+        worker.orders.add(_order(OrderType.BUY, 1000.0, float(len(ticks) + 1), 1.0))
+
+    def on_tick(worker: Worker, latency: float):
+        ticks.append(worker)
+        if len(ticks) == 2:
+            stop_event.set()
+
+    worker.refresh = lambda: None  # type: ignore
+    worker.execute = execute  # type: ignore
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    report = uow.reports.get(worker.worker_id)
+    assert report and report.fills == 2
+    assert report.bought == 3002.0
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from cats.domain.constants import Market, OrderType, PriceUnit
+from cats.domain.models.exchange_api import AbstractExchangeAPI, floor_datetime
+from cats.domain.models.order import Order
+from cats.domain.models.resampling import (
+    CandleCache,
+    ResamplingExchangeAPI,
+    merge_minute,
+)
+from cats.domain.values import Price
+
+START = datetime(2021, 10, 1, 22, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class MinuteExchangeAPI(AbstractExchangeAPI):
+    """Candles of every unit aggregated from `minutes`, as an exchange does."""
+
+    host = "https://exchange"
+
+    def __init__(self, market: Market):
+        super().__init__(market)
+        self.minutes: List[Price] = []
+        self.calls: List[PriceUnit] = []
+
+    def add_minutes(self, counts: int) -> None:
+        for _ in range(counts):
+            i = len(self.minutes)
+            trade_price = 1000.0 + (i * 37) % 23 - (i * 11) % 7
+            self.minutes.append(
+                Price(
+                    date_time=START + timedelta(minutes=i),
+                    high_price=trade_price + i % 5,
+                    low_price=trade_price - i % 3,
+                    trade_price=trade_price,
+                )
+            )
+
+    def get_prices(
+        self, price_unit: PriceUnit, counts: int, to: Optional[datetime] = None
+    ) -> List[Price]:
+        self.calls.append(price_unit)
+        buckets: Dict[datetime, List[Price]] = dict()
+        for minute in self.minutes:
+            if to is None or minute.date_time <= to:
+                start = floor_datetime(minute.date_time, price_unit)
+                buckets.setdefault(start, []).append(minute)
+        candles = [
+            Price(
+                date_time=start,
+                high_price=max(minute.high_price for minute in minutes),
+                low_price=min(minute.low_price for minute in minutes),
+                trade_price=minutes[-1].trade_price,
+            )
+            for start, minutes in buckets.items()
+        ]
+        return sorted(candles, key=lambda price: price.date_time, reverse=True)[
+            :counts
+        ]
+
+    def buy_order(self, price: float, budget: int) -> Order:
+        raise NotImplementedError
+
+    def sell_order(self, price: float, volume: float) -> Order:
+        raise NotImplementedError
+
+    def cancel_order(self, order_id: str) -> str:
+        raise NotImplementedError
+
+    def get_orders(self, order_ids: List[str]) -> List[Order]:
+        raise NotImplementedError
+
+    def get_balance(self) -> float:
+        return 0.0
+
+    def make_valid_order_price(self, order_type: OrderType, price: float) -> float:
+        return price
+
+
+def _minute(minutes: int, high: float, low: float, trade: float) -> Price:
+    return Price(START + timedelta(minutes=minutes), high, low, trade)
+
+
+def test_merge_minute_updates_open_candle_and_opens_new_ones():
+    candles = [Price(START, 110.0, 90.0, 100.0)]
+
+    merge_minute(candles, _minute(5, 120.0, 95.0, 115.0), PriceUnit.HOUR)
+    assert candles == [Price(START, 120.0, 90.0, 115.0)]
+
+    merge_minute(candles, _minute(123, 1.0, 1.0, 1.0), PriceUnit.HOUR)
+    assert candles[0] == Price(START + timedelta(hours=2), 1.0, 1.0, 1.0)
+
+    # Minutes of closed candles are already in them.
+    merge_minute(candles, _minute(30, 999.0, 0.0, 0.0), PriceUnit.HOUR)
+    assert candles[1] == Price(START, 120.0, 90.0, 115.0)
+
+
+def test_candles_of_every_unit_are_kept_up_to_date_from_minutes():
+    clock = FakeClock()
+    cache = CandleCache(ttl=1.0, clock=clock)
+    exchange = MinuteExchangeAPI(Market.ETH)
+    exchange.add_minutes(90)
+    workers = [ResamplingExchangeAPI(exchange, cache) for _ in range(3)]
+
+    for api, price_unit in zip(workers, PriceUnit):
+        api.get_prices(price_unit, counts=5)
+    exchange.calls.clear()
+
+    # Past midnight, so the new minutes open hour and day candles.
+    exchange.add_minutes(100)
+    clock.now += 100 * 60
+    served = [
+        (api.get_prices(price_unit, counts=5), price_unit)
+        for api, price_unit in zip(workers, PriceUnit)
+    ]
+    # One fetch of the new minutes served every unit.
+    assert exchange.calls == [PriceUnit.MINUTE]
+    for prices, price_unit in served:
+        assert prices == exchange.get_prices(price_unit, counts=5)
+    columns = workers[0].get_price_columns(PriceUnit.HOUR, counts=5)
+    assert columns.to_prices() == exchange.get_prices(PriceUnit.HOUR, counts=5)
+
+
+def test_history_and_longer_requests_are_fetched_from_the_exchange():
+    cache = CandleCache(ttl=1.0, clock=FakeClock())
+    exchange = MinuteExchangeAPI(Market.ETH)
+    exchange.add_minutes(180)
+    api = ResamplingExchangeAPI(exchange, cache)
+
+    api.get_prices(PriceUnit.HOUR, counts=2)
+    api.get_prices(PriceUnit.HOUR, counts=2)
+    api.get_prices(PriceUnit.HOUR, counts=2, to=START + timedelta(hours=1))
+    assert api.get_prices(PriceUnit.HOUR, counts=3) == exchange.get_prices(
+        PriceUnit.HOUR, counts=3
+    )
+
+    assert exchange.calls[:-1] == [
+        PriceUnit.HOUR,
+        PriceUnit.MINUTE,
+        PriceUnit.HOUR,
+        PriceUnit.HOUR,
+    ]
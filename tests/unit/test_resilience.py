@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import pytest
+
+from cats.domain.constants import Exchange, Market, OrderType, WorkerStatus
+from cats.domain.models.exchange_api import APIError
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.order_router import OrderRouter
+from cats.domain.models.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientExchangeAPI,
+    RetryPolicy,
+    is_retryable,
+)
+from cats.domain.models.transport import TransportError
+from cats.domain.models.worker import Worker, work
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_api(api, clock=None, max_attempts=3) -> ResilientExchangeAPI:
+    breakers = dict()
+
+    def get_breaker(venue: str, endpoint: str) -> CircuitBreaker:
+        key = (venue, endpoint)
+        if key not in breakers:
+            breakers[key] = CircuitBreaker(
+                failure_threshold=2, reset_timeout=10.0, clock=clock or FakeClock()
+            )
+        return breakers[key]
+
+    delays: List[float] = []
+    policy = RetryPolicy(max_attempts=max_attempts, sleep=delays.append)
+    return ResilientExchangeAPI(api, retry_policy=policy, breakers=get_breaker)
+
+
+def test_errors_are_classified():
+    assert is_retryable(TransportError("timed out"))
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(APIError("{'error': {'name': 'too_many_requests'}}"))
+    assert not is_retryable(APIError("{'error': {'name': 'insufficient_funds'}}"))
+    assert not is_retryable(CircuitOpenError())
+
+
+def test_retry_policy_delays_are_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+    delays = [policy.get_delay(attempt) for attempt in range(10)]
+    assert all(0 <= delay <= 0.3 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_idempotent_calls_are_retried():
+    fake = FakeExchangeAPI(Market.ETH)
+    calls = iter([TransportError("reset"), 10.0])
+
+    def get_balance() -> float:
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    fake.get_balance = get_balance  # type: ignore
+    assert make_api(fake).get_balance() == 10.0
+
+
+def test_orders_are_not_retried():
+    api = make_api(FakeExchangeAPI(Market.ETH, error_rate=1.0))
+    with pytest.raises(APIError):
+        api.buy_order(price=1000.0, budget=10000)
+    assert api.breakers(api.venue, "buy_order").failures == 1
+
+
+def test_circuit_opens_and_half_opens_after_reset_timeout():
+    clock = FakeClock()
+    fake = FakeExchangeAPI(Market.ETH, error_rate=1.0)
+    api = make_api(fake, clock=clock, max_attempts=1)
+    for _ in range(2):
+        with pytest.raises(APIError):
+            api.get_balance()
+
+    with pytest.raises(CircuitOpenError):
+        api.get_balance()
+    assert api.is_open("get_balance")
+
+    clock.now += 10.0
+    fake.error_rate = 0.0
+    assert api.get_balance() == 0.0
+    assert not api.is_open("get_balance")
+
+
+def test_router_sheds_venue_with_open_order_circuit():
+    failing = make_api(FakeExchangeAPI(Market.ETH, error_rate=1.0), max_attempts=1)
+    healthy = FakeExchangeAPI(Market.ETH)
+    for _ in range(2):
+        with pytest.raises(APIError):
+            failing.buy_order(price=1000.0, budget=10000)
+    assert failing.is_order_open(OrderType.BUY)
+
+    router = OrderRouter(Market.ETH, venues=dict(UPBIT=failing, FAKE=healthy))
+    failing.api.error_rate = 0.0
+
+    assert router.buy_order(price=1000.0, budget=10000).exchange == "FAKE"
+    assert router.decisions[-1].skipped == ("UPBIT",)
+
+
+def test_worker_is_quarantined_after_repeated_failures():
+    now = datetime(2021, 10, 1)
+    worker = Worker()
+    for _ in range(5):
+        worker.record_failure(TransportError("reset"), now=now)
+    assert worker.quarantined_until == now + timedelta(seconds=60)
+    assert worker.is_quarantined(now=now)
+    assert not worker.is_quarantined(now=now + timedelta(seconds=60))
+
+    worker.record_failure(TransportError("reset"), now=now)
+    assert worker.quarantined_until == now + timedelta(seconds=120)
+
+
+def test_work_quarantines_worker_on_fatal_error(get_worker: Callable[..., Worker]):
+    worker = get_worker(status=WorkerStatus.WATCHING, market=Market.ETH)
+    worker.exchange = Exchange.FAKE
+
+    def fail() -> None:
+        raise APIError("{'error': {'name': 'invalid_access_key'}}")
+
+    worker.work_for_watching = fail  # type: ignore
+    work(worker)
+    assert worker.is_quarantined()
+
+    worker.work_for_watching = lambda: None  # type: ignore
+    worker.quarantined_until = None
+    work(worker)
+    assert worker.failures == 0
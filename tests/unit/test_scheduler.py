@@ -0,0 +1,69 @@
+from cats.domain.constants import WorkerStatus
+from cats.domain.models.worker import Worker
+from cats.service_layer.scheduler import URGENCIES, WorkerScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _worker(worker_id: str, status: WorkerStatus, tick_interval: float) -> Worker:
+    return Worker(worker_id=worker_id, status=status, tick_interval=tick_interval)
+
+
+def test_order_holding_workers_get_short_deadlines_and_go_first():
+    clock = Clock()
+    scheduler = WorkerScheduler(clock=clock)
+    watching = _worker("watching", WorkerStatus.WATCHING, 10.0)
+    buying = _worker("buying", WorkerStatus.BUYING, 10.0)
+    selling = _worker("selling", WorkerStatus.SELLING, 0.5)
+    finished = _worker("finished", WorkerStatus.FINISHED, 10.0)
+
+    scheduler.sync([watching, buying, selling, finished])
+    assert len(scheduler) == 3
+    assert scheduler.pop_due()[-1] is watching
+
+    for worker in (watching, buying, selling):
+        scheduler.reschedule(worker)
+    assert scheduler.next_due() == 100.5
+    clock.now = 101.0
+    assert set(scheduler.pop_due()) == {buying, selling}
+    assert scheduler.pop_due() == []
+
+    clock.now = 110.0
+    assert scheduler.pop_due() == [watching]
+
+
+def test_scheduler_follows_status_changes():
+    clock = Clock()
+    scheduler = WorkerScheduler(clock=clock)
+    worker = _worker("worker", WorkerStatus.WATCHING, 60.0)
+    scheduler.sync([worker])
+    scheduler.pop_due()
+    scheduler.reschedule(worker)
+
+    # Moved to buying by someone else, the worker is due within a second.
+    worker.status = WorkerStatus.BUYING
+    scheduler.sync([worker])
+    assert scheduler.next_due() == 101.0
+
+    # Buying and selling workers are told apart.
+    scheduler.pop_due()
+    clock.now = 101.0
+    scheduler.reschedule(worker)
+    buying_entry = scheduler._entries["worker"]
+    worker.status = WorkerStatus.SELLING
+    scheduler.sync([worker])
+    assert scheduler._entries["worker"] is not buying_entry
+    assert scheduler._entries["worker"][1] == URGENCIES[WorkerStatus.SELLING]
+
+    worker.status = WorkerStatus.FINISHED
+    scheduler.sync([worker])
+    assert len(scheduler) == 0 and scheduler.next_due() is None
+
+    scheduler.sync([])
+    assert scheduler.pop_due() == []
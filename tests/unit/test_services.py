@@ -1,9 +1,21 @@
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import List, Callable
 
 import pytest
 
 from cats.service_layer import services
-from cats.domain.constants import Market, WorkerStatus
+from cats.service_layer.runners import RunnerRegistry, RunnersStillAlive
+from cats.domain.constants import (
+    Exchange,
+    Market,
+    OrderStatus,
+    OrderType,
+    WorkerStatus,
+)
+from cats.domain.models.order import Order
+from cats.domain.models.portfolio import PortfolioAllocator
 from cats.domain.models.worker import Worker
 from cats.adapters.repository import AbstractRepository
 from cats.service_layer.unit_of_work import AbstractUnitOfWork
@@ -19,6 +31,9 @@ class FakeRepository(AbstractRepository):
     def get(self, worker_id: str) -> Worker:
         return next(w for w in self._workers if w.worker_id == worker_id)
 
+    def remove(self, worker_id: str):
+        self._workers.remove(self.get(worker_id))
+
     def check_duplicate(self, market: Market) -> bool:
         workers = [
             worker
@@ -58,3 +73,262 @@ def test_add_worker_with_duplicated_error(get_worker: Callable[..., Worker]):
     new_worker = get_worker(market=Market.ETH, status=WorkerStatus.WATCHING)
     with pytest.raises(services.WorkerDuplicated):
         services.add_worker(new_worker, uow)
+
+
+def test_add_worker_with_invalid_tick_interval(get_worker: Callable[..., Worker]):
+    worker = get_worker()
+    worker.tick_interval = 0
+    with pytest.raises(services.InvalidWorker, match="tick interval"):
+        services.add_worker(worker, FakeUnitOfWork())
+
+
+def test_add_workers_reports_per_item_results(get_worker: Callable[..., Worker]):
+    working = get_worker(market=Market.ETH, status=WorkerStatus.WATCHING)
+    uow = FakeUnitOfWork([working])
+    workers = [
+        Worker(market=Market.BTC, exchange=Exchange.UPBIT, budget="10000:20000"),
+        Worker(market=Market.BTC, exchange=Exchange.UPBIT),
+        Worker(market=Market.ETH, exchange=Exchange.UPBIT),
+        Worker(market="DOGE", exchange=Exchange.UPBIT),  # type: ignore
+        Worker(market=Market.EOS, exchange="NOWHERE"),  # type: ignore
+        Worker(market=Market.EOS, exchange=Exchange.UPBIT, budget="1000:x"),
+    ]
+
+    results = services.add_workers(workers, uow)
+
+    assert [result.ok for result in results] == [True] + [False] * 5
+    assert results[0].worker_id == workers[0].worker_id
+    assert "duplicated with item 0" in results[1].message
+    assert "already working" in results[2].message
+    assert "Invalid market" in results[3].message
+    assert "Unsupported exchange" in results[4].message
+    assert "Invalid budget" in results[5].message
+    assert uow.workers.get(workers[0].worker_id) == workers[0]
+    assert len(uow.workers.list_by_status(WorkerStatus.WATCHING)) == 2
+    assert uow.committed
+
+
+def test_workers_get_their_own_ids():
+    assert Worker(market=Market.ETH).worker_id != Worker(market=Market.ETH).worker_id
+
+
+def test_stat_work_works_only_on_its_shard_until_stopped(
+    get_worker: Callable[..., Worker]
+):
+    workers = [get_worker(status=WorkerStatus.WATCHING) for _ in range(10)]
+    for index, worker in enumerate(workers):
+        worker.worker_id = f"worker-{index}"
+        worker.exchange = Exchange.FAKE
+    uow = FakeUnitOfWork(workers)
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 3:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(
+        uow, stop_event=stop_event, interval=0, shard=(1, 2), on_tick=on_tick
+    )
+
+    assert len(ticked) == 3
+    assert all(services.in_shard(worker, (1, 2)) for worker in ticked)
+
+
+def test_stat_work_ticks_workers_at_their_own_interval(
+    get_worker: Callable[..., Worker]
+):
+    fast = get_worker(status=WorkerStatus.WATCHING)
+    slow = get_worker(status=WorkerStatus.WATCHING)
+    for worker, tick_interval in ((fast, 0.01), (slow, 60.0)):
+        worker.exchange = Exchange.FAKE
+        worker.tick_interval = tick_interval
+        worker.execute = lambda signals: None  # type: ignore
+    uow = FakeUnitOfWork([fast, slow])
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 5:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    assert ticked.count(slow) == 1
+    assert ticked.count(fast) == 4
+
+
+def test_stat_work_keeps_working_when_a_worker_breaks(
+    get_worker: Callable[..., Worker]
+):
+    broken = get_worker(status=WorkerStatus.WATCHING)
+    broken.refresh = lambda: 1 / 0  # type: ignore
+    healthy = get_worker(status=WorkerStatus.WATCHING)
+    healthy.refresh = lambda: None  # type: ignore
+    healthy.execute = lambda signals: None  # type: ignore
+    uow = FakeUnitOfWork([broken, healthy])
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 2:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    assert set(ticked) == {broken, healthy}
+    assert broken.is_quarantined()
+    assert not healthy.is_quarantined()
+
+
+def test_stat_work_ticks_workers_holding_orders(get_worker: Callable[..., Worker]):
+    buying = get_worker(status=WorkerStatus.BUYING)
+    buying.tick_interval = 0.01
+    buying.execute = lambda signals: None  # type: ignore
+    selling = get_worker(status=WorkerStatus.SELLING)
+    selling.tick_interval = 60.0
+
+    def finish(signals):
+        selling.status = WorkerStatus.FINISHED
+
+    selling.execute = finish  # type: ignore
+    for worker in (buying, selling):
+        worker.refresh = lambda: None  # type: ignore
+    uow = FakeUnitOfWork([buying, selling])
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 4:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(uow, stop_event=stop_event, interval=0, on_tick=on_tick)
+
+    assert ticked.count(selling) == 1
+    assert ticked.count(buying) == 3
+
+
+def test_runner_registry_scales_and_stops_runners(get_worker: Callable[..., Worker]):
+    worker = get_worker(status=WorkerStatus.WATCHING)
+    worker.exchange = Exchange.FAKE
+    worker._is_buy_timing = lambda: False  # type: ignore
+    uow = FakeUnitOfWork([worker])
+    registry = RunnerRegistry(uow_factory=lambda: uow, tick_interval=0.01)
+    events = registry.subscribe()
+
+    assert len(registry.start()) == 1
+    assert registry.start() == []
+    registry.scale(3)
+    assert len(registry.list_runners()) == 3
+
+    deadline = time.time() + 5
+    while registry.get_tick(worker.worker_id) is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert registry.get_tick(worker.worker_id).latency >= 0  # type: ignore
+
+    assert len(registry.stop()) == 3
+    assert registry.list_runners() == []
+    published = {events.get_nowait()["event"] for _ in range(events.qsize())}
+    assert published == {"runner_started", "tick", "runner_stopped"}
+
+
+def test_runner_registry_does_not_rescale_while_old_runners_are_alive():
+    release = threading.Event()
+
+    class SlowRegistry(RunnerRegistry):
+        def _run(self, runner_id: str) -> None:
+            # Stands for a tick stuck in a slow exchange call.
+            release.wait(5)
+
+    registry = SlowRegistry(uow_factory=lambda: FakeUnitOfWork([]), stop_timeout=0.01)
+    [runner] = registry.start()
+
+    with pytest.raises(RunnersStillAlive):
+        registry.scale(2)
+    assert len(registry.list_runners()) == 1
+
+    release.set()
+    runner.thread.join(5)
+    assert len(registry.scale(2)) == 2
+    registry.stop()
+
+
+def test_stat_work_executes_a_due_batch_without_pauses(
+    get_worker: Callable[..., Worker]
+):
+    workers = [get_worker(status=WorkerStatus.WATCHING) for _ in range(3)]
+    executed_at: List[float] = []
+    for worker in workers:
+        worker.refresh = lambda: None  # type: ignore
+        worker.execute = lambda signals: executed_at.append(  # type: ignore
+            time.monotonic()
+        )
+    uow = FakeUnitOfWork(workers)
+
+    def on_tick(worker: Worker, latency: float):
+        if len(executed_at) == len(workers):
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(uow, stop_event=stop_event, interval=0.5, on_tick=on_tick)
+
+    assert len(executed_at) == 3
+    assert executed_at[-1] - executed_at[0] < 0.25
+
+
+def test_stat_work_paces_batches_without_delaying_order_holders(
+    get_worker: Callable[..., Worker]
+):
+    buying = get_worker(status=WorkerStatus.BUYING)
+    buying.tick_interval = 0.05
+    buying.refresh = lambda: None  # type: ignore
+    buying.execute = lambda signals: None  # type: ignore
+    uow = FakeUnitOfWork([buying])
+    ticked: List[Worker] = []
+
+    def on_tick(worker: Worker, latency: float):
+        ticked.append(worker)
+        if len(ticked) == 4:
+            stop_event.set()
+
+    stop_event = services.threading.Event()
+    started_at = time.monotonic()
+    services.stat_work(uow, stop_event=stop_event, interval=5.0, on_tick=on_tick)
+
+    assert time.monotonic() - started_at < 1.0
+
+
+def test_stat_work_seeds_the_portfolio_before_the_first_tick(
+    get_worker: Callable[..., Worker], get_order: Callable[..., Order], monkeypatch
+):
+    allocator = PortfolioAllocator(cap=15000)
+    monkeypatch.setattr(services, "portfolio", allocator)
+    order = get_order(status=OrderStatus.WAIT)
+    order.type = OrderType.BUY
+    order.price, order.ordered_volume = 10000.0, 1.0
+    order.executed_volume = order.paid_fee = 0.0
+    # Holds an open buy order, but does not tick in this process for now.
+    holder = get_worker(status=WorkerStatus.BUYING, orders={order})
+    holder.quarantined_until = datetime.now() + timedelta(hours=1)
+    watcher = get_worker(status=WorkerStatus.WATCHING)
+    watcher.refresh = lambda: None  # type: ignore
+    watcher.execute = lambda signals: None  # type: ignore
+    allowed: List[bool] = []
+
+    def on_tick(worker: Worker, latency: float):
+        allowed.append(allocator.can_allocate(watcher, 10000))
+        stop_event.set()
+
+    stop_event = services.threading.Event()
+    services.stat_work(
+        FakeUnitOfWork([holder, watcher]),
+        stop_event=stop_event,
+        interval=0,
+        on_tick=on_tick,
+    )
+
+    assert allowed == [False]
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cats.domain.constants import Market, PriceUnit
+from cats.domain.models.exchange_api import APIError
+from cats.domain.models.fake_exchange_api import FakeExchangeAPI
+from cats.domain.models.single_flight import (
+    AsyncSingleFlight,
+    CoalescingExchangeAPI,
+    SingleFlight,
+)
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, ("get_balance", "ETH"), fetch)
+        started.wait(5)
+        followers = [
+            executor.submit(flight.do, ("get_balance", "ETH"), fetch)
+            for _ in range(3)
+        ]
+        while flight.stats()["get_balance"].calls < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == [42] * 4
+    assert len(calls) == 1
+    stats = flight.stats()["get_balance"]
+    assert (stats.executed, stats.coalesced) == (1, 3)
+
+    # Calls after the flight landed run again.
+    assert flight.do(("get_balance", "ETH"), lambda: 7) == 7
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+
+    def fail() -> None:
+        raise APIError("boom")
+
+    with pytest.raises(APIError):
+        flight.do(("get_balance",), fail)
+    assert flight.do(("get_balance",), lambda: 1) == 1
+
+
+def test_async_single_flight_coalesces_coroutines():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do(("get_prices", "ETH"), fetch) for _ in range(5))
+        )
+
+    assert asyncio.run(main()) == [42] * 5
+    assert len(calls) == 1
+    assert flight.stats()["get_prices"].coalesced == 4
+
+
+def test_coalescing_api_gives_every_caller_its_own_prices():
+    fake = FakeExchangeAPI(Market.ETH)
+    api = CoalescingExchangeAPI(fake, flight=SingleFlight())
+
+    prices1 = api.get_prices(price_unit=PriceUnit.HOUR, counts=3)
+    prices2 = api.get_prices(price_unit=PriceUnit.HOUR, counts=3)
+
+    assert prices1 == prices2
+    assert all(p1 is not p2 for p1, p2 in zip(prices1, prices2))
+
+
+def test_coalescing_api_keeps_in_process_venues_apart():
+    flight = SingleFlight()
+    api1 = CoalescingExchangeAPI(FakeExchangeAPI(Market.ETH), flight=flight)
+    api2 = CoalescingExchangeAPI(FakeExchangeAPI(Market.ETH), flight=flight)
+    assert api1.venue != api2.venue
@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from cats.domain.constants import OrderStatus, OrderType, WorkerStatus
+from cats.domain.models.order import Order
+from cats.domain.models.strategy import (
+    Decisions,
+    MeanReversionStrategy,
+    Signals,
+    Strategy,
+    WorkerStates,
+    evaluate_workers,
+    register_strategy,
+    strategies,
+)
+from cats.domain.models.worker import Worker
+from cats.domain.values import Price
+from cats.service_layer import services
+
+
+def _random_worker(rng: random.Random) -> Worker:
+    now = datetime(2021, 1, 1)
+    prices = [
+        Price(now - timedelta(hours=i), *sorted(rng.uniform(90, 110) for _ in "hlt"))
+        for i in range(rng.randint(0, 5))
+    ]
+    orders = {
+        Order(
+            order_id=f"order-{i}",
+            type=rng.choice(list(OrderType)),
+            status=rng.choice(list(OrderStatus)),
+            price=rng.uniform(90, 130),
+            ordered_volume=1.0,
+            executed_volume=rng.random(),
+            paid_fee=0.0,
+            ordered_time=now + timedelta(minutes=i),
+        )
+        for i in range(rng.randint(0, 3))
+    }
+    return Worker(
+        status=rng.choice(list(WorkerStatus)),
+        prices=prices,
+        orders=orders,
+        balance=rng.choice([0.0, rng.random()]),
+        budget=rng.choice(["", "10000", "10000:20000"]),
+    )
+
+
+def _legacy_signals(worker: Worker) -> Signals:
+    # Worker rules before strategies.
+    latest = worker._get_latest_order()
+    trade = worker._get_trade_price()
+    average = worker._calculate_price_average()
+    buy_average = worker._calculate_buy_price_average()
+    next_price = worker._get_next_additional_buy_price()
+    cancel_buy = False
+    if latest and trade:
+        has_balance = worker.balance > 0
+        rising = trade >= buy_average if buy_average else False
+        cancel_buy = (
+            worker.status == WorkerStatus.BUYING
+            and latest.status == OrderStatus.WAIT
+            and ((has_balance and rising) or (not has_balance and trade > latest.price))
+        )
+    cancel_sell = False
+    if latest and trade and next_price:
+        cancel_sell = (
+            worker.status == WorkerStatus.SELLING
+            and trade <= next_price
+            and worker._get_unit_budget() > 0
+        )
+    return Signals(
+        buy=bool(average and trade and trade < average),
+        cancel_buy=cancel_buy,
+        cancel_sell=cancel_sell,
+        sell_or_buy=bool(latest) and worker.balance > 0,
+    )
+
+
+def test_batched_signals_match_signals_of_each_worker():
+    rng = random.Random(0)
+    workers = [_random_worker(rng) for _ in range(300)]
+
+    signals = evaluate_workers(workers)
+
+    for worker, signal in zip(workers, signals):
+        assert signal == _legacy_signals(worker)
+        assert signal == Signals(
+            buy=worker._is_buy_timing(),
+            cancel_buy=worker._need_to_cancel_buy_order_due_to_trade_price_rising(),
+            cancel_sell=worker._need_to_cancel_sell_order_due_to_trade_price_drop(),
+            sell_or_buy=worker._need_to_sell_or_buy_order(),
+        )
+    assert any(signal.buy for signal in signals)
+    assert any(signal.cancel_buy for signal in signals)
+    assert any(signal.cancel_sell for signal in signals)
+
+
+class AlwaysBuy(Strategy):
+    def __init__(self):
+        self.batches = []
+
+    def evaluate(self, states: WorkerStates) -> Decisions:
+        self.batches.append(len(states))
+        rows = len(states)
+        return Decisions([True] * rows, [False] * rows, [False] * rows, [False] * rows)
+
+
+def test_workers_are_evaluated_in_one_batch_per_strategy(monkeypatch):
+    monkeypatch.setitem(strategies, "ALWAYS_BUY", None)
+    strategy = AlwaysBuy()
+    register_strategy("ALWAYS_BUY", strategy)
+    workers = [Worker(strategy="ALWAYS_BUY"), Worker(), Worker(strategy="ALWAYS_BUY")]
+
+    signals = evaluate_workers(workers)
+
+    assert strategy.batches == [2]
+    assert [signal.buy for signal in signals] == [True, False, True]
+    assert isinstance(strategies[workers[1].strategy], MeanReversionStrategy)
+
+
+def test_add_worker_rejects_unknown_strategy():
+    worker = Worker(strategy="NOWHERE")
+    with pytest.raises(services.InvalidWorker, match="Unknown strategy"):
+        services.add_worker(worker, None)  # type: ignore
@@ -0,0 +1,104 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from cats.domain.constants import Market, OrderType
+from cats.domain.models.bithumb_api import BITHUMB_TICK_SIZES
+from cats.domain.models.coinone_api import COINONE_TICK_SIZES
+from cats.domain.models.exchange_api import APIError, TickTable
+from cats.domain.models.upbit_api import UPBIT_TICK_SIZES, UpbitExchangeAPI
+
+TABLES = [UPBIT_TICK_SIZES, BITHUMB_TICK_SIZES, COINONE_TICK_SIZES]
+
+
+def _legacy_make_valid_order_price(order_type: OrderType, price: float) -> float:
+    # UpbitExchangeAPI.make_valid_order_price before tick tables.
+    if price >= 2000000:
+        bias = 1000.0
+    elif price >= 1000000:
+        bias = 500.0
+    elif price >= 500000:
+        bias = 100.0
+    elif price >= 100000:
+        bias = 50.0
+    elif price >= 10000:
+        bias = 10.0
+    elif price >= 1000:
+        bias = 5.0
+    elif price >= 100:
+        bias = 1.0
+    elif price >= 10:
+        bias = 0.1
+    else:
+        bias = 0.01
+
+    if order_type == OrderType.BUY:
+        return price - (price % bias)
+    return price + (bias - (price % bias))
+
+
+def _random_prices(seed: int, counts: int = 2000):
+    rng = random.Random(seed)
+    prices = []
+    for _ in range(counts):
+        # Log uniform from 0.01 to 10,000,000 KRW, half of them on a tick.
+        price = round(10 ** rng.uniform(-2, 7), rng.randint(0, 4))
+        if rng.random() < 0.5:
+            price = float(UPBIT_TICK_SIZES.round(OrderType.BUY, max(price, 0.01)))
+        prices.append(max(price, 0.01))
+    return prices
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_upbit_tick_table_matches_legacy_function(seed: int):
+    for price in _random_prices(seed):
+        tick = float(UPBIT_TICK_SIZES.get_tick_size(price))
+        for order_type in (OrderType.BUY, OrderType.SELL):
+            new = UPBIT_TICK_SIZES.round(order_type, price)
+            legacy = _legacy_make_valid_order_price(order_type, price)
+            if not UPBIT_TICK_SIZES.is_valid(price):
+                assert new == pytest.approx(legacy, abs=tick * 1e-6)
+                continue
+            # A valid price is kept. The legacy float modulo of a valid price
+            # is either about zero or about a tick, so the legacy function
+            # kept it, moved a buy a tick down or a sell a tick up.
+            assert new == price
+            off_by_tick = price - tick if order_type == OrderType.BUY else price + tick
+            assert legacy == pytest.approx(price, abs=tick * 1e-6) or (
+                legacy == pytest.approx(off_by_tick, abs=tick * 1e-6)
+            )
+
+
+@pytest.mark.parametrize("table", TABLES)
+@pytest.mark.parametrize("seed", range(3))
+def test_rounded_prices_are_valid_and_within_a_tick(table: TickTable, seed: int):
+    for price in _random_prices(seed):
+        tick = table.get_tick_size(price)
+        buy = table.round(OrderType.BUY, price)
+        sell = table.round(OrderType.SELL, price)
+
+        assert table.is_valid(buy) and table.is_valid(sell)
+        assert Decimal(repr(price)) - tick < Decimal(repr(buy)) <= Decimal(repr(price))
+        assert Decimal(repr(price)) <= Decimal(repr(sell)) < Decimal(repr(price)) + tick
+        assert table.round(OrderType.BUY, buy) == buy
+        assert table.round(OrderType.SELL, sell) == sell
+
+
+def test_batch_api_matches_single_prices():
+    prices = _random_prices(0, counts=100)
+    table = UPBIT_TICK_SIZES
+    assert table.round_many(OrderType.SELL, prices) == [
+        table.round(OrderType.SELL, price) for price in prices
+    ]
+    assert table.validate_many(prices) == [table.is_valid(price) for price in prices]
+
+
+def test_upbit_make_valid_order_price_keeps_exact_ticks():
+    api = UpbitExchangeAPI(Market.ETH)
+    assert api.make_valid_order_price(OrderType.SELL, 4000000.0) == 4000000.0
+    assert api.make_valid_order_price(OrderType.SELL, 4000001.0) == 4001000.0
+    assert api.make_valid_order_price(OrderType.BUY, 0.29) == 0.29
+    assert api.make_valid_order_price(OrderType.BUY, 1.0) == 1.0
+    with pytest.raises(APIError):
+        UPBIT_TICK_SIZES.round(OrderType.BUY, -1.0)
@@ -1,11 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Callable
 from unittest.mock import MagicMock
 
-from cats.domain.constants import Exchange, WorkerStatus, OrderStatus
+from cats.domain.constants import Exchange, PriceUnit, WorkerStatus, OrderStatus
+from cats.domain.models.exchange_api import unwrap
+from cats.domain.models import worker as worker_module
 from cats.domain.models.order import Order
+from cats.domain.models.portfolio import PortfolioAllocator
 from cats.domain.models.worker import Worker
-from cats.domain.values import Price
+from cats.domain.values import BudgetLadder, Price
 
 
 def test_is_buy_timing_return_true_when_trader_price_is_lower_then_average():
@@ -38,6 +41,37 @@ def test_get_unit_budget_gets_zero_when_budget_is_empty():
     assert unit_budget == 0
 
 
+def test_spend_budget_keeps_integer_tranches():
+    worker = Worker(budget="30000:20000")
+    worker._spend_budget(spent_budget=3333.5)
+    worker._spend_budget(spent_budget=3333.5)
+    assert worker.budget == BudgetLadder((23332, 20000))
+
+    worker.budget = worker.budget.refund(1000.7)
+    assert str(worker.budget) == "24332:20000"
+    worker._spend_budget(spent_budget=20000)
+    assert worker._get_unit_budget() == 20000
+
+
+def test_portfolio_cap_holds_back_buy_orders(monkeypatch):
+    allocator = PortfolioAllocator(cap=15000)
+    monkeypatch.setattr(worker_module, "portfolio", allocator)
+    first, second = (Worker(exchange=Exchange.FAKE, budget="10000") for _ in "12")
+    for worker in (first, second):
+        worker._is_buy_timing = MagicMock(return_value=True)  # type: ignore
+
+    first.work_for_watching()
+    second.work_for_watching()
+    assert first.status == WorkerStatus.BUYING
+    assert second.status == WorkerStatus.WATCHING and not second.orders
+
+    first.status = WorkerStatus.FINISHED
+    allocator.update(first)
+    second.work_for_watching()
+    assert second.status == WorkerStatus.BUYING
+    assert allocator.total <= 15000
+
+
 def test_work_for_watching_buy_order_when_is_buy_timing_is_true():
     worker = Worker(
         exchange=Exchange.FAKE,
@@ -88,3 +122,42 @@ def test_update_prices_from_api():
     )
     worker._update_prices_from_api()
     assert len(worker.prices) == 24
+
+
+def test_update_prices_from_api_uses_worker_candles():
+    worker = Worker(
+        exchange=Exchange.FAKE, price_unit=PriceUnit.MINUTE, price_counts=5
+    )
+    worker._update_prices_from_api()
+    assert len(worker.prices) == 5
+    assert worker.prices[0].date_time - worker.prices[1].date_time == timedelta(
+        minutes=1
+    )
+
+
+def test_adaptive_tick_interval_follows_distance_to_buy_timing():
+    now = datetime.now()
+    near = Price(now, 1000.0, 1000.0, 1000.0)
+    older = Price(now - timedelta(hours=1), 1000.0, 1000.0, 1000.0)
+    latest = Price(now, 1200.0, 1200.0, 1200.0)
+
+    assert Worker(prices=[near], tick_interval=4.0).get_tick_interval() == 4.0
+    worker = Worker(prices=[near], tick_interval=4.0, adaptive_tick=True)
+    assert worker.get_tick_interval() == 1.0
+    worker = Worker(prices=[latest, older], tick_interval=4.0, adaptive_tick=True)
+    assert worker.get_tick_interval() == 16.0
+    assert Worker(tick_interval=4.0, adaptive_tick=True).get_tick_interval() == 4.0
+
+
+def test_update_prices_from_api_fetches_only_new_candles():
+    worker = Worker(exchange=Exchange.FAKE, price_counts=5)
+    worker._update_prices_from_api()
+    before = list(worker.prices)
+    fake = unwrap(worker._get_api())
+    fake.clock = lambda: datetime.now() + timedelta(hours=2)  # type: ignore
+
+    worker._update_prices_from_api()
+
+    assert len(worker.prices) == 5
+    assert worker.prices[2:] == before[:3]
+    assert worker.prices[0].date_time - before[0].date_time == timedelta(hours=2)